@@ -48,27 +48,38 @@ try:
 except ImportError:
     __all__.remove('fork')
 
-# if PY3:
-#   socket = __import__('gevent.py3.socket')
-#   ssl = __import__('gevent.py3.ssl')
-# else:
-#   socket = __import__('gevent.py2.socket')
-#   ssl = __import__('gevent.py2.ssl')
-
-
-if PY3:
-    from gevent.py3 import socket
-    sys.modules['gevent.socket'] = socket
-    from gevent.py3 import ssl
-    sys.modules['gevent.ssl'] = ssl
-else:
-    from gevent.py2 import socket
-    sys.modules['gevent.socket'] = socket
-    from gevent.py2 import ssl
-    sys.modules['gevent.ssl'] = ssl
+
+class _LazyModule(type(sys)):
+    """Stands for a submodule of gevent and imports it when one of its attributes is used.
+
+    Importing the submodule replaces this object in the gevent namespace, but ``from gevent import socket``
+    executed before that binds this object: it forwards getting and setting attributes to the module.
+    """
+
+    def _load(self):
+        return __import__(self.__name__, None, None, ['__name__'])
+
+    def __getattr__(self, item):
+        return getattr(self._load(), item)
+
+    def __setattr__(self, item, value):
+        setattr(self._load(), item, value)
+
+    def __delattr__(self, item):
+        delattr(self._load(), item)
+
+    def __repr__(self):
+        return repr(self._load())
+
+
+# gevent.socket and gevent.ssl are imported on first use; see gevent/socket.py
+socket = _LazyModule('gevent.socket')
+ssl = _LazyModule('gevent.ssl')
+
 
 del sys
 
+
 def reinit():
     return get_hub().loop.reinit()
 
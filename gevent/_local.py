@@ -0,0 +1,117 @@
+# Copyright (c) 2009-2012 Denis Bilenko. See LICENSE for details.
+"""The implementation of :class:`gevent.local.local`.
+
+This module is also compiled with Cython into the ``gevent._local`` extension,
+which takes precedence over this file when it is available.
+
+Each local object keeps a plain dict mapping ``id(greenlet)`` to that greenlet's
+attribute dict, so a lookup is a single dict access. The entries are removed by weak
+reference callbacks: when a greenlet goes away its dict is dropped from every local it
+used, and when a local goes away it drops the reference each greenlet holds to it.
+"""
+from copy import copy
+from weakref import ref
+from gevent.hub import getcurrent
+from gevent.lock import RLock
+
+__all__ = ['local']
+
+
+class _localimpl(object):
+    """A class managing greenlet-local dicts"""
+    __slots__ = ('key', 'dicts', 'localargs', 'locallock', '__weakref__')
+
+    def __init__(self, args, kw):
+        # The key used in the greenlet's __dict__ to keep this object's weakref alive
+        self.key = '_gevent_local._localimpl.' + str(id(self))
+        # {id(greenlet) -> (ref(greenlet), greenlet-local dict)}
+        self.dicts = {}
+        self.localargs = (args, kw)
+        self.locallock = RLock()
+
+    def create_dict(self):
+        """Create a new dict for the current greenlet, and return it."""
+        localdict = {}
+        key = self.key
+        greenlet = getcurrent()
+        idt = id(greenlet)
+
+        def local_deleted(_, key=key):
+            # When the localimpl is deleted, remove the greenlet attribute.
+            greenlet = wrgreenlet()
+            if greenlet is not None:
+                greenlet.__dict__.pop(key, None)
+
+        def greenlet_deleted(_, idt=idt):
+            # When the greenlet is deleted, remove the local dict.
+            impl = wrlocal()
+            if impl is not None:
+                impl.dicts.pop(idt, None)
+
+        wrlocal = ref(self, local_deleted)
+        wrgreenlet = ref(greenlet, greenlet_deleted)
+        greenlet.__dict__[key] = wrlocal
+        self.dicts[idt] = wrgreenlet, localdict
+        return localdict
+
+
+def _get_dict(self):
+    impl = object.__getattribute__(self, '_local__impl')
+    try:
+        localdict = impl.dicts[id(getcurrent())][1]
+    except KeyError:
+        # subclassed __init__ might switch, so we need the lock for the rest
+        impl.locallock.acquire()
+        try:
+            localdict = impl.create_dict()
+            object.__setattr__(self, '__dict__', localdict)
+            cls = type(self)
+            if cls.__init__ is not object.__init__:
+                args, kw = impl.localargs
+                cls.__init__(self, *args, **kw)
+        finally:
+            impl.locallock.release()
+    object.__setattr__(self, '__dict__', localdict)
+    return localdict
+
+
+class local(object):
+    """An object whose attributes are local to the greenlet that sets them."""
+    __slots__ = ('_local__impl', '__dict__')
+
+    def __new__(cls, *args, **kw):
+        if (args or kw) and (cls.__init__ is object.__init__):
+            raise TypeError("Initialization arguments are not supported")
+        self = object.__new__(cls)
+        impl = _localimpl(args, kw)
+        object.__setattr__(self, '_local__impl', impl)
+        # We need to create the greenlet dict in anticipation of
+        # __init__ being called, to make sure we don't call it again ourselves.
+        object.__setattr__(self, '__dict__', impl.create_dict())
+        return self
+
+    def __getattribute__(self, name):
+        _get_dict(self)
+        return object.__getattribute__(self, name)
+
+    def __setattr__(self, name, value):
+        if name == '__dict__':
+            raise AttributeError("%r object attribute '__dict__' is read-only" % self.__class__.__name__)
+        _get_dict(self)
+        return object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        if name == '__dict__':
+            raise AttributeError("%r object attribute '__dict__' is read-only" % self.__class__.__name__)
+        _get_dict(self)
+        return object.__delattr__(self, name)
+
+    def __copy__(self):
+        impl = object.__getattribute__(self, '_local__impl')
+        duplicate = copy(_get_dict(self))
+        args, kw = impl.localargs
+        instance = type(self)(*args, **kw)
+        localdict = _get_dict(instance)
+        localdict.clear()
+        localdict.update(duplicate)
+        return instance
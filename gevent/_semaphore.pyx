@@ -21,8 +21,10 @@ class Semaphore(object):
             raise ValueError("semaphore initial value must be >= 0")
         self._links = []
         self.counter = value
-        self.hub = get_hub()
-        self._notifier = self.hub.loop.callback()
+        # the hub is looked up by the first rawlink(), so that creating a lock (for example, when
+        # the patched threading module is imported) does not create the hub
+        self.hub = None
+        self._notifier = None
 
     def __str__(self):
         params = (self.__class__.__name__, self.counter, len(self._links))
@@ -62,6 +64,9 @@ class Semaphore(object):
         """
         if not callable(callback):
             raise TypeError('Expected callable: %r' % (callback, ))
+        if self._notifier is None:
+            self.hub = get_hub()
+            self._notifier = self.hub.loop.callback()
         self._links.append(callback)
         self._dirty = True
 
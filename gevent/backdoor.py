@@ -25,13 +25,18 @@
 # THE SOFTWARE.
 
 import sys
+import gc
 from code import InteractiveConsole
 
 from gevent import socket
+from gevent.hub import get_hub, _get_greenlet_name
 from gevent.greenlet import Greenlet
+from gevent.pool import Group, Pool
+from gevent.threadpool import ThreadPool
 from gevent.server import StreamServer
+from gevent.profiler import profile
 
-__all__ = ['BackdoorServer']
+__all__ = ['BackdoorServer', 'get_status', 'format_status']
 
 try:
     sys.ps1
@@ -72,6 +77,8 @@ class SocketConsole(Greenlet):
                 # useless stuff
                 import __builtin__
                 console.locals["__builtins__"] = __builtin__
+                console.locals.setdefault('profile', profile)
+                console.locals.setdefault('status', _status_command(console.locals))
                 console.interact(banner=self.banner)
             except SystemExit:  # raised by quit()
                 sys.exc_clear()
@@ -81,6 +88,18 @@ class SocketConsole(Greenlet):
 
 
 class BackdoorServer(StreamServer):
+    """Serve an interactive Python console over TCP.
+
+    Besides *locals*, the console provides the following commands:
+
+    - ``status(json=False, fds=False, sockets=False)`` prints the state of the hub: the active watchers by type,
+      the pending callbacks, the file descriptors waited for, the threadpool, the resolver and the
+      :class:`gevent.pool.Group`, :class:`gevent.pool.Pool` and :class:`gevent.threadpool.ThreadPool` instances
+      found in the console's locals. With ``sockets=True`` it also lists the open gevent sockets and the greenlets
+      waiting to read from or write to them. With ``json=True`` it prints a single line of JSON instead, so
+      ``echo 'status(json=True)' | nc HOST PORT`` can be used to poll a process.
+    - ``profile(seconds)`` runs :func:`gevent.profiler.profile`.
+    """
 
     def __init__(self, listener, locals=None, banner=None, **server_args):
         StreamServer.__init__(self, listener, spawn=None, **server_args)
@@ -92,6 +111,144 @@ class BackdoorServer(StreamServer):
         SocketConsole.spawn(self.locals, conn, banner=self.banner)
 
 
+def get_status(hub=None, objects=None, fds=False, sockets=False):
+    """Return a dictionary that describes the state of *hub* and of the pools found among the values of *objects*.
+
+    If *fds* is true, also include a mapping of file descriptors to the events ('read', 'write' or 'read|write')
+    that the active io watchers are waiting for. The watcher counts and *fds* need libev to be embedded (the
+    default build); otherwise the loop section says so in its ``unavailable`` item.
+
+    If *sockets* is true, also include the list of the open gevent sockets of *hub*, one item per file
+    descriptor, with the greenlets waiting to read from or write to it. There is no registry of sockets, so
+    they are found among the objects tracked by the garbage collector, which takes a while in a big process.
+    """
+    if hub is None:
+        hub = get_hub()
+    status = {'hub': repr(hub)}
+    loop = hub.loop
+    if loop is not None:
+        status['loop'] = info = {'backend': loop.backend, 'default': loop.default, 'iteration': loop.iteration,
+                                 'io_collect_interval': loop.io_collect_interval,
+                                 'timeout_collect_interval': loop.timeout_collect_interval}
+        try:
+            info['backend_fd'] = loop.fileno()
+            info['activecnt'] = loop.activecnt
+            info['pending'] = loop.pendingcnt
+            info['watchers'] = loop.watcher_counts()
+            events = loop.io_events()
+        except AttributeError:
+            # only available if libev is embedded
+            info['unavailable'] = 'watcher counts: libev is not embedded'
+        else:
+            info['waiting_read'] = len([x for x in events.values() if x & 1])
+            info['waiting_write'] = len([x for x in events.values() if x & 2])
+            if fds:
+                info['fds'] = dict((str(fd), _format_events(x)) for (fd, x) in events.items())
+    if sockets:
+        status['sockets'] = _get_sockets_status(hub)
+    if hub._threadpool is not None:
+        status['threadpool'] = _get_pool_status(hub._threadpool)
+    resolver = hub._resolver
+    if resolver is not None:
+        status['resolver'] = info = {'type': '%s.%s' % (type(resolver).__module__, type(resolver).__name__)}
+        if hasattr(resolver, 'inflight'):
+            info['inflight'] = resolver.inflight
+        if hasattr(resolver, 'ares'):
+            info['sockets'] = len(resolver.ares._watchers)
+    if objects:
+        pools = {}
+        for name, value in objects.items():
+            if isinstance(value, (Group, ThreadPool)):
+                pools[name] = _get_pool_status(value)
+        if pools:
+            status['pools'] = pools
+    return status
+
+
+def _get_sockets_status(hub):
+    result = {}
+    for obj in gc.get_objects():
+        if not isinstance(obj, socket.socket) or getattr(obj, 'hub', None) is not hub:
+            continue
+        try:
+            fileno = obj.fileno()
+        except Exception:
+            continue  # closed
+        info = result.get(fileno)
+        if info is None:
+            # dup() and makefile() objects of the same hub share the watchers, so one item is enough
+            result[fileno] = info = {'fd': fileno, 'socket': str(obj), 'waiting': {}}
+        for name, watcher in (('read', obj._read_event), ('write', obj._write_event)):
+            switch = watcher.callback
+            if switch is not None:
+                glet = getattr(switch, '__self__', None)
+                info['waiting'][name] = repr(switch) if glet is None else _get_greenlet_name(glet)
+    return [result[fileno] for fileno in sorted(result)]
+
+
+def _format_events(events):
+    return '|'.join(name for (flag, name) in ((1, 'read'), (2, 'write')) if events & flag)
+
+
+def _get_pool_status(pool):
+    if isinstance(pool, ThreadPool):
+        return {'type': 'ThreadPool', 'tasks': len(pool), 'size': pool.size, 'maxsize': pool.maxsize}
+    info = {'type': type(pool).__name__, 'greenlets': len(pool)}
+    if isinstance(pool, Pool):
+        info['size'] = pool.size
+        info['free'] = pool.free_count()
+        # the greenlets blocked in spawn() and the callbacks waiting for a free slot
+        info['waiters'] = len(getattr(pool._semaphore, '_links', ()))
+    return info
+
+
+def format_status(status):
+    """Format the result of :func:`get_status` for humans."""
+    lines = [status['hub']]
+    loop = status.get('loop')
+    if loop is not None:
+        line = 'loop: %s iteration=%s' % (loop['backend'], loop['iteration'])
+        for name in ('io_collect_interval', 'timeout_collect_interval'):
+            if loop[name]:
+                line += ' %s=%s' % (name, loop[name])
+        if 'watchers' in loop:
+            line += ' pending=%s waiting_read=%s waiting_write=%s' % (loop['pending'], loop['waiting_read'], loop['waiting_write'])
+            line += '\nwatchers: ' + ' '.join('%s=%s' % item for item in sorted(loop['watchers'].items()))
+        lines.append(line)
+        if 'unavailable' in loop:
+            lines.append('unavailable: ' + loop['unavailable'])
+        if 'fds' in loop:
+            lines.append('fds: ' + ' '.join('%s:%s' % item for item in sorted(loop['fds'].items(), key=lambda item: int(item[0]))))
+    for info in status.get('sockets', ()):
+        waiting = ' '.join('%s=%s' % item for item in sorted(info['waiting'].items()))
+        lines.append('%s %s' % (info['socket'], waiting or 'idle'))
+    if 'threadpool' in status:
+        lines.append('threadpool: ' + _format_dict(status['threadpool']))
+    if 'resolver' in status:
+        lines.append('resolver: ' + _format_dict(status['resolver']))
+    for name, info in sorted(status.get('pools', {}).items()):
+        lines.append('%s: %s' % (name, _format_dict(info)))
+    return '\n'.join(lines)
+
+
+def _format_dict(info):
+    return ' '.join('%s=%s' % item for item in sorted(info.items()))
+
+
+def _status_command(locals):
+
+    def status(json=False, fds=False, sockets=False):
+        """Print the state of the hub and of the pools in the console's locals."""
+        result = get_status(objects=locals, fds=fds, sockets=sockets)
+        if json:
+            import json as jsonmodule
+            print (jsonmodule.dumps(result, sort_keys=True))
+        else:
+            print (format_status(result))
+
+    return status
+
+
 class _fileobject(socket._fileobject):
 
     def write(self, data):
@@ -0,0 +1,3 @@
+"""Tools for measuring the performance of gevent-based servers."""
+
+__all__ = []
@@ -0,0 +1,267 @@
+"""HTTP load generator for benchmarking WSGI servers over loopback.
+
+Usage::
+
+    python -m gevent.bench.http [options] [host:port]
+
+Without an address, a hello world application is served by :class:`gevent.pywsgi.WSGIServer`
+in a forked child process, so that the server and the load generator do not share a process.
+
+Three workloads are supported:
+
+* ``keepalive`` -- each connection sends a request and waits for the response before sending the next one;
+* ``pipeline`` -- each connection sends *pipeline* requests at once and then reads the responses;
+* ``connect`` -- each request is sent over a new connection.
+
+For each workload, the throughput and the 50th, 99th and 99.9th percentiles of the latency are reported.
+"""
+import os
+import sys
+import errno
+import signal
+from time import time
+from io import BufferedReader
+import gevent
+from gevent import socket
+from gevent.baseserver import parse_address
+from gevent.hub import string_types
+
+
+__all__ = ['MODES', 'Result', 'run', 'fork_server', 'kill_server', 'hello_world']
+
+MODES = ('keepalive', 'pipeline', 'connect')
+
+
+def hello_world(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain'), ('Content-Length', '12')])
+    return ['Hello world\n']
+
+
+class Result(object):
+    """The outcome of :func:`run`: the latencies of the successful requests and the number of errors."""
+
+    def __init__(self, mode, concurrency, latencies, errors, elapsed):
+        self.mode = mode
+        self.concurrency = concurrency
+        self.latencies = sorted(latencies)
+        self.errors = errors
+        self.elapsed = elapsed
+
+    @property
+    def requests(self):
+        return len(self.latencies)
+
+    @property
+    def requests_per_second(self):
+        if self.elapsed <= 0:
+            return 0.0
+        return self.requests / self.elapsed
+
+    def percentile(self, percent):
+        """Return the latency (in seconds) below which *percent* percent of the requests completed."""
+        if not self.latencies:
+            return None
+        index = int(round(percent / 100.0 * len(self.latencies) + 0.5)) - 1
+        return self.latencies[max(0, min(index, len(self.latencies) - 1))]
+
+    def __repr__(self):
+        return '<%s %s requests=%s errors=%s>' % (self.__class__.__name__, self.mode, self.requests, self.errors)
+
+    def __str__(self):
+        result = '%s (concurrency %s): %s requests in %.2fs, %.0f requests/s' % (
+            self.mode, self.concurrency, self.requests, self.elapsed, self.requests_per_second)
+        if self.latencies:
+            result += ', latency p50 %s, p99 %s, p999 %s' % tuple(_format_latency(self.percentile(p)) for p in (50, 99, 99.9))
+        if self.errors:
+            result += ', %s errors' % self.errors
+        return result
+
+
+def _format_latency(seconds):
+    if seconds >= 0.001:
+        return '%.2fms' % (seconds * 1000.0)
+    return '%.0fus' % (seconds * 1000000.0)
+
+
+def _read_response(rfile):
+    """Read one response from *rfile*. Return True if the connection can be used for the next request."""
+    status = rfile.readline()
+    if not status:
+        raise IOError('Connection closed')
+    parts = status.split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+        raise IOError('Invalid status line: %r' % status)
+    keepalive = parts[0] == 'HTTP/1.1'
+    length = None
+    chunked = False
+    while True:
+        line = rfile.readline()
+        if line in ('\r\n', '\n'):
+            break
+        if not line:
+            raise IOError('Connection closed while reading the headers')
+        name, _, value = line.partition(':')
+        name = name.strip().lower()
+        value = value.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'transfer-encoding':
+            chunked = value == 'chunked'
+        elif name == 'connection':
+            keepalive = value == 'keep-alive'
+    if chunked:
+        while True:
+            size = int(rfile.readline().split(';', 1)[0], 16)
+            _read_exactly(rfile, size + 2)
+            if not size:
+                break
+    elif length is not None:
+        _read_exactly(rfile, length)
+    else:
+        rfile.read()
+        keepalive = False
+    if not parts[1].startswith('2'):
+        raise IOError('Unexpected status: %r' % status.strip())
+    return keepalive
+
+
+def _read_exactly(rfile, length):
+    if len(rfile.read(length)) != length:
+        raise IOError('Connection closed while reading the body')
+
+
+def _connect(address):
+    sock = socket.socket(socket.AF_INET6 if ':' in address[0] else socket.AF_INET)
+    # not sock.connect(): it passes even numeric addresses through the resolver
+    result = sock._sock.connect_ex(address)
+    if result in (errno.EINPROGRESS, errno.EWOULDBLOCK):
+        socket.wait_write(sock.fileno())
+        result = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+    if result:
+        sock.close()
+        raise socket.error(result, os.strerror(result))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock, BufferedReader(socket.SocketIO(sock))
+
+
+def _close(connection):
+    if connection is not None:
+        connection[1].close()
+        connection[0].close()
+
+
+def _worker(address, request, count, batch, reuse, latencies, errors):
+    connection = None
+    while count > 0:
+        size = min(batch, count)
+        count -= size
+        try:
+            if connection is None:
+                start = time()
+                connection = _connect(address)
+            else:
+                start = time()
+            connection[0].sendall(request * size)
+            for _ in range(size):
+                keepalive = _read_response(connection[1])
+                latencies.append(time() - start)
+        except (socket.error, IOError, ValueError):
+            errors[0] += 1
+            keepalive = False
+        if not (reuse and keepalive):
+            _close(connection)
+            connection = None
+    _close(connection)
+
+
+def run(address, mode='keepalive', requests=10000, concurrency=10, pipeline=10, path='/'):
+    """Send *requests* requests to the HTTP server at *address* and return a :class:`Result`.
+
+    The requests are sent over *concurrency* connections at once. *mode* is one of :data:`MODES`;
+    *pipeline* is the number of requests sent at once in ``pipeline`` mode.
+    """
+    if mode not in MODES:
+        raise ValueError('mode must be one of %s: %r' % (', '.join(MODES), mode))
+    if isinstance(address, string_types):
+        address = parse_address(address)[1]
+    host = '%s:%s' % address[:2]
+    if mode == 'connect':
+        request = 'GET %s HTTP/1.1\r\nHost: %s\r\nConnection: close\r\n\r\n' % (path, host)
+    else:
+        request = 'GET %s HTTP/1.1\r\nHost: %s\r\n\r\n' % (path, host)
+    batch = pipeline if mode == 'pipeline' else 1
+    latencies = []
+    errors = [0]
+    greenlets = []
+    start = time()
+    for index in range(concurrency):
+        count = requests // concurrency + (index < requests % concurrency)
+        greenlets.append(gevent.spawn(_worker, address, request, count, batch, mode != 'connect', latencies, errors))
+    gevent.joinall(greenlets, raise_error=True)
+    return Result(mode, concurrency, latencies, errors[0], time() - start)
+
+
+def fork_server(application=hello_world, listener=('127.0.0.1', 0), **kwargs):
+    """Serve *application* with :class:`gevent.pywsgi.WSGIServer` in a child process.
+
+    The listening socket is created before forking, so the server accepts connections as soon
+    as this function returns. Return the address of the server and the pid of the child.
+    Stop the server with :func:`kill_server`.
+    """
+    from gevent.pywsgi import WSGIServer
+    kwargs.setdefault('log', None)
+    if isinstance(listener, tuple):
+        # otherwise the server name is resolved in the threadpool, which does not survive fork()
+        kwargs.setdefault('environ', {'SERVER_NAME': listener[0]})
+    server = WSGIServer(listener, application, **kwargs)
+    server.init_socket()
+    pid = gevent.fork()
+    if not pid:
+        try:
+            server.serve_forever()
+        finally:
+            os._exit(0)
+    address = server.address
+    server.socket.close()
+    return address, pid
+
+
+def kill_server(pid):
+    """Terminate the server started by :func:`fork_server` and wait for it to exit."""
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except OSError:
+        pass
+    os.waitpid(pid, 0)
+
+
+def main(args=None):
+    import optparse
+    parser = optparse.OptionParser(usage='%prog [options] [host:port]')
+    parser.add_option('-m', '--mode', action='append', choices=MODES,
+                      help='workload to run: %s (default: all of them)' % ', '.join(MODES))
+    parser.add_option('-n', '--requests', default=10000, type='int')
+    parser.add_option('-c', '--concurrency', default=10, type='int')
+    parser.add_option('-p', '--pipeline', default=10, type='int')
+    parser.add_option('--path', default='/')
+    options, args = parser.parse_args(args)
+    if len(args) > 1:
+        parser.error('Expected at most one address')
+    pid = None
+    if args:
+        address = parse_address(args[0])[1]
+    else:
+        address, pid = fork_server()
+    try:
+        for mode in options.mode or MODES:
+            result = run(address, mode, requests=options.requests, concurrency=options.concurrency,
+                         pipeline=options.pipeline, path=options.path)
+            print (result)
+            sys.stdout.flush()
+    finally:
+        if pid is not None:
+            kill_server(pid)
+
+
+if __name__ == '__main__':
+    main()
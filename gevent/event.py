@@ -19,12 +19,13 @@ class Event(object):
     blocks until the flag is true.
     """
 
+    # both are created on demand; most events never get a link
+    _links = None
+    _todo = None
+
     def __init__(self):
-        self._links = set()
-        self._todo = set()
-        self._flag = False
         self.hub = get_hub()
-        self._notifier = self.hub.loop.callback()
+        self._flag = False
 
     def __str__(self):
         return '<%s %s>' % (self.__class__.__name__, (self._flag and 'set') or 'clear')
@@ -41,10 +42,9 @@ class Event(object):
         Greenlets that call :meth:`wait` once the flag is true will not block at all.
         """
         self._flag = True
-        self._todo.update(self._links)
-        if self._todo and not self._notifier.active:
+        if self._links:
             # schedule a job to notify the links already set
-            self._notifier.start(self._notify_links)
+            self._schedule(self._links)
 
     def clear(self):
         """Reset the internal flag to false.
@@ -94,22 +94,31 @@ class Event(object):
         """
         if not callable(callback):
             raise TypeError('Expected callable: %r' % (callback, ))
-        self._links.add(callback)
-        if self._flag and not self._notifier.active:
-            self._todo.add(callback)
-            self._notifier.start(self._notify_links)
+        if self._links is None:
+            self._links = set([callback])
+        else:
+            self._links.add(callback)
+        if self._flag:
+            self._schedule((callback, ))
 
     def unlink(self, callback):
         """Remove the callback set by :meth:`rawlink`"""
-        try:
-            self._links.remove(callback)
-        except ValueError:
-            pass
+        if self._links:
+            self._links.discard(callback)
+
+    def _schedule(self, links):
+        if self._todo is None:
+            self._todo = set(links)
+            self.hub.notify_later(self)
+        else:
+            self._todo.update(links)
 
     def _notify_links(self):
-        while self._todo:
-            link = self._todo.pop()
-            if link in self._links:  # check that link was not notified yet and was not removed by the client
+        todo = self._todo
+        self._todo = None
+        while todo:
+            link = todo.pop()
+            if self._links and link in self._links:  # check that link was not removed by the client
                 try:
                     link(self)
                 except:
@@ -149,12 +158,13 @@ class AsyncResult(object):
          ...
         ZeroDivisionError: integer division or modulo by zero
     """
+
+    value = None
+    _exception = _NONE
+    _links = None
+
     def __init__(self):
-        self._links = set()
-        self.value = None
-        self._exception = _NONE
         self.hub = get_hub()
-        self._notifier = self.hub.loop.callback()
 
     def ready(self):
         """Return true if and only if it holds a value or an exception"""
@@ -179,8 +189,8 @@ class AsyncResult(object):
         """
         self.value = value
         self._exception = None
-        if self._links and not self._notifier.active:
-            self._notifier.start(self._notify_links)
+        if self._links:
+            self.hub.notify_later(self)
 
     def set_exception(self, exception):
         """Store the exception. Wake up the waiters.
@@ -189,8 +199,8 @@ class AsyncResult(object):
         Sequential calls to :meth:`wait` and :meth:`get` will not block at all.
         """
         self._exception = exception
-        if self._links and not self._notifier.active:
-            self._notifier.start(self._notify_links)
+        if self._links:
+            self.hub.notify_later(self)
 
     def get(self, block=True, timeout=None):
         """Return the stored value or raise the exception.
@@ -271,8 +281,9 @@ class AsyncResult(object):
         return self.value
 
     def _notify_links(self):
-        while self._links:
-            link = self._links.pop()
+        links = self._links
+        while links:
+            link = links.pop()
             try:
                 link(self)
             except:
@@ -286,13 +297,17 @@ class AsyncResult(object):
         """
         if not callable(callback):
             raise TypeError('Expected callable: %r' % (callback, ))
-        self._links.add(callback)
-        if self.ready() and not self._notifier.active:
-            self._notifier.start(self._notify_links)
+        if self._links is None:
+            self._links = set([callback])
+        else:
+            self._links.add(callback)
+        if self.ready():
+            self.hub.notify_later(self)
 
     def unlink(self, callback):
         """Remove the callback set by :meth:`rawlink`"""
-        self._links.discard(callback)
+        if self._links:
+            self._links.discard(callback)
 
     # link protocol
     def __call__(self, source):
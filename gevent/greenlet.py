@@ -67,22 +67,27 @@ class FailureSpawnedLink(SpawnedLink):
             return SpawnedLink.__call__(self, source)
 
 
+_NONE = Exception("Neither exception nor value")
+
+
 class Greenlet(greenlet):
     """A light-weight cooperatively-scheduled execution unit."""
 
+    # Most greenlets are never linked to, so the list of links and the callback that
+    # notifies them are only created when needed. Until an attribute is assigned, the
+    # class-level default is used, which keeps the instance dict of a new greenlet small.
+    value = None
+    _exception = _NONE
+    _links = None
+    _notifier = None
+    _start_event = None
+
     def __init__(self, run=None, *args, **kwargs):
-        hub = get_hub()
-        greenlet.__init__(self, parent=hub)
+        greenlet.__init__(self, parent=get_hub())
         if run is not None:
             self._run = run
         self.args = args
         self.kwargs = kwargs
-        self._links = []
-        self.value = None
-        self._exception = _NONE
-        loop = hub.loop
-        self._notifier = loop.callback()
-        self._start_event = None
 
     @property
     def loop(self):
@@ -184,8 +189,7 @@ class Greenlet(greenlet):
     def start(self):
         """Schedule the greenlet to run in this loop iteration"""
         if self._start_event is None:
-            self._start_event = self.parent.loop.callback()
-            self._start_event.start(self.switch)
+            self._start_event = self.parent.loop.run_callback(self.switch)
 
     def start_later(self, seconds):
         """Schedule the greenlet to run in the future loop iteration *seconds* later"""
@@ -303,8 +307,8 @@ class Greenlet(greenlet):
     def _report_result(self, result):
         self._exception = None
         self.value = result
-        if self._links and not self._notifier.active:
-            self._notifier.start(self._notify_links)
+        if self._links:
+            self._start_notify()
 
     def _report_error(self, exc_info):
         exception = exc_info[1]
@@ -313,11 +317,18 @@ class Greenlet(greenlet):
             return
         self._exception = exception
 
-        if self._links and not self._notifier.active:
-            self._notifier.start(self._notify_links)
+        if self._links:
+            self._start_notify()
 
         self.parent.handle_error(self, *exc_info)
 
+    def _start_notify(self):
+        notifier = self._notifier
+        if notifier is None:
+            notifier = self._notifier = self.parent.loop.callback()
+        if not notifier.active:
+            notifier.start(self._notify_links)
+
     def run(self):
         try:
             if self._start_event is None:
@@ -342,9 +353,12 @@ class Greenlet(greenlet):
         """
         if not callable(callback):
             raise TypeError('Expected callable: %r' % (callback, ))
-        self._links.append(callback)
-        if self.ready() and not self._notifier.active:
-            self._notifier.start(self._notify_links)
+        if self._links is None:
+            self._links = [callback]
+        else:
+            self._links.append(callback)
+        if self.ready():
+            self._start_notify()
 
     def link(self, receiver, SpawnedLink=SpawnedLink):
         """Link greenlet's completion to a callable.
@@ -356,10 +370,11 @@ class Greenlet(greenlet):
 
     def unlink(self, receiver):
         """Remove the receiver set by :meth:`link` or :meth:`rawlink`"""
-        try:
-            self._links.remove(receiver)
-        except ValueError:
-            pass
+        if self._links:
+            try:
+                self._links.remove(receiver)
+            except ValueError:
+                pass
 
     def link_value(self, receiver, SpawnedLink=SuccessSpawnedLink):
         """Like :meth:`link` but *receiver* is only notified when the greenlet has completed successfully"""
@@ -370,8 +385,9 @@ class Greenlet(greenlet):
         self.link(receiver=receiver, SpawnedLink=SpawnedLink)
 
     def _notify_links(self):
-        while self._links:
-            link = self._links.pop()
+        links = self._links
+        while links:
+            link = links.pop()
             try:
                 link(self)
             except:
@@ -487,5 +503,3 @@ def getfuncname(func):
                 return funcname
     return repr(func)
 
-
-_NONE = Exception("Neither exception nor value")
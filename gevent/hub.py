@@ -1,5 +1,6 @@
 # Copyright (c) 2009-2012 Denis Bilenko. See LICENSE for details.
 
+from __future__ import absolute_import
 import sys
 import os
 import traceback
@@ -21,6 +22,8 @@ __all__ = ['getcurrent',
            'fork',
            'get_hub',
            'Hub',
+           'HubChannel',
+           'send_to',
            'Waiter']
 
 
@@ -304,6 +307,9 @@ class Hub(greenlet):
     resolver_class = resolver_config(resolver_class, 'GEVENT_RESOLVER')
     threadpool_class = config('gevent.threadpool.ThreadPool', 'GEVENT_THREADPOOL')
     backend = config(None, 'GEVENT_BACKEND')
+    # seconds; see gevent.core.loop.io_collect_interval and timeout_collect_interval
+    io_collect_interval = os.environ.get('GEVENT_IO_COLLECT_INTERVAL') or None
+    timeout_collect_interval = os.environ.get('GEVENT_TIMEOUT_COLLECT_INTERVAL') or None
     format_context = 'pprint.pformat'
     threadpool_size = 10
 
@@ -320,9 +326,14 @@ class Hub(greenlet):
             if loop is None:
                 loop = self.backend
             self.loop = loop_class(flags=loop, default=default)
+            if self.io_collect_interval is not None:
+                self.loop.io_collect_interval = float(self.io_collect_interval)
+            if self.timeout_collect_interval is not None:
+                self.loop.timeout_collect_interval = float(self.timeout_collect_interval)
         self._resolver = None
         self._threadpool = None
-        self.format_context = _import(self.format_context)
+        self._notify_queue = []
+        self.channel = HubChannel(self)
 
     def __repr__(self):
         if self.loop is None:
@@ -363,6 +374,8 @@ class Hub(greenlet):
         if context is not None:
             if not isinstance(context, str):
                 try:
+                    # imported on the first error rather than in __init__
+                    self.format_context = _import(self.format_context)
                     context = self.format_context(context)
                 except:
                     traceback.print_exc()
@@ -419,6 +432,22 @@ class Hub(greenlet):
         # It is still possible to kill this greenlet with throw. However, in that case
         # switching to it is no longer safe, as switch will return immediatelly
 
+    def notify_later(self, obj):
+        """Call ``obj._notify_links()`` from the hub in the current loop iteration.
+
+        All the objects scheduled during an iteration share a single loop callback.
+        """
+        queue = self._notify_queue
+        if not queue:
+            self.loop.run_callback(self._run_notify_queue)
+        queue.append(obj)
+
+    def _run_notify_queue(self):
+        queue = self._notify_queue
+        self._notify_queue = []
+        for obj in queue:
+            obj._notify_links()
+
     def join(self, timeout=None, event=None):
         """Wait for the event loop to finish. Exits only when there are
         no more spawned greenlets, started servers, active timeouts or watchers.
@@ -465,6 +494,7 @@ class Hub(greenlet):
         if self._threadpool is not None:
             self._threadpool.close()
             del self._threadpool
+        self.channel.close()
         if destroy_loop is None:
             destroy_loop = not self.loop.default
         if destroy_loop:
@@ -503,6 +533,140 @@ class Hub(greenlet):
 
     threadpool = property(_get_threadpool, _set_threadpool, _del_threadpool)
 
+    def greenlet_stacks(self):
+        """Return a list of ``(greenlet, name, saved_stack_size)`` for the live greenlets of this hub.
+
+        *saved_stack_size* is the number of bytes of C stack the greenlet currently keeps on the heap
+        while switched out. *name* identifies the function the greenlet was spawned with.
+        """
+        import gc
+        result = []
+        for obj in gc.get_objects():
+            if isinstance(obj, greenlet) and obj.parent is self and not obj.dead:
+                result.append((obj, _get_greenlet_name(obj), getattr(obj, '_stack_saved', 0)))
+        return result
+
+    def stack_usage(self):
+        """Return a list of ``(name, count, saved_stack_size)`` aggregated by the spawning function.
+
+        The list is sorted by the total saved stack size, largest first.
+        """
+        usage = {}
+        for _greenlet, name, size in self.greenlet_stacks():
+            count, total = usage.get(name, (0, 0))
+            usage[name] = (count + 1, total + size)
+        result = [(name, count, total) for (name, (count, total)) in usage.items()]
+        result.sort(key=lambda item: item[2], reverse=True)
+        return result
+
+
+def _get_greenlet_name(glet):
+    """Return the name greenlets are grouped under in reports: the function *glet* was spawned with."""
+    from gevent.greenlet import getfuncname
+    if isinstance(glet, Hub):
+        return 'Hub'
+    if glet.parent is None:
+        return 'main'
+    func = getattr(glet, '_run', None)
+    if func is None:
+        frame = glet.gr_frame
+        if frame is None:
+            return repr(type(glet))
+        while frame.f_back is not None:
+            frame = frame.f_back
+        return frame.f_code.co_name
+    method_self = getattr(func, '__self__', None)
+    if method_self is not None:
+        return '%s.%s' % (type(method_self).__name__, getattr(func, '__name__', '?'))
+    return getfuncname(func)
+
+
+class HubChannel(object):
+    """A mailbox that any thread can use to run a function in a hub.
+
+    :meth:`send` may be called from any thread. The functions are queued under a lock and run
+    in the hub's event loop, in the order they were sent, by a single ``async`` watcher, so any
+    number of messages sent between two loop iterations wake the hub once. Like the loop
+    callbacks, the functions run in the hub greenlet and must not block; use
+    ``send(gevent.spawn, function)`` to run a blocking function.
+
+    Each hub has one channel, available as :attr:`Hub.channel`. The channel does not keep the
+    loop running unless :meth:`hold` was called. Once the hub is destroyed, the channel is
+    closed and the functions sent to it are dropped.
+    """
+
+    def __init__(self, hub):
+        from gevent._threading import Lock
+        # not the hub itself, so that the channel does not keep a destroyed hub alive
+        self.loop = hub.loop
+        self._lock = Lock()
+        self._pending = []
+        self._holds = 0
+        self._closed = False
+        self._async = hub.loop.async(ref=False)
+        self._async.start(self._drain)
+
+    def __repr__(self):
+        return '<%s at 0x%x pending=%s holds=%s>' % (self.__class__.__name__, id(self), len(self._pending), self._holds)
+
+    def send(self, function, *args):
+        """Call ``function(*args)`` in the hub's thread. Never blocks.
+
+        Return False, without calling the function, if the channel is closed.
+        """
+        self._lock.acquire()
+        try:
+            # under the lock, so that close() cannot free the loop in between
+            if self._closed:
+                return False
+            self._pending.append((function, args))
+            if len(self._pending) == 1:
+                self._async.send()
+            return True
+        finally:
+            self._lock.release()
+
+    def hold(self):
+        """Keep the hub's loop running until :meth:`release` is called. Must be called in the hub's thread."""
+        self._holds += 1
+        self._async.ref = True
+
+    def release(self):
+        """Undo one :meth:`hold`. Must be called in the hub's thread."""
+        self._holds -= 1
+        if not self._holds:
+            self._async.ref = False
+
+    def close(self):
+        self._lock.acquire()
+        try:
+            self._closed = True
+            self._pending = []
+            self._async.stop()
+        finally:
+            self._lock.release()
+
+    def _drain(self):
+        self._lock.acquire()
+        try:
+            messages = self._pending
+            self._pending = []
+        finally:
+            self._lock.release()
+        for function, args in messages:
+            try:
+                function(*args)
+            except:
+                self.loop.handle_error(function, *sys.exc_info())
+
+
+def send_to(hub, function, *args):
+    """Call ``function(*args)`` in *hub*, which may belong to another thread. See :class:`HubChannel`.
+
+    Return False if *hub* was destroyed and the function will not be called.
+    """
+    return hub.channel.send(function, *args)
+
 
 class LoopExit(Exception):
     pass
@@ -71,11 +71,26 @@ cdef extern from "libev.h":
     int EVBREAK_ONE
     int EVBREAK_ALL
 
+    struct ev_watcher_list:
+        ev_watcher_list* next
+
+    ctypedef struct ANFD:
+        ev_watcher_list* head
+        unsigned char events
+
     struct ev_loop:
         int activecnt
         int backend_fd
         int sigfd
         unsigned int origflags
+        ANFD* anfds
+        int anfdmax
+        int* pendingcnt
+        int timercnt
+        int idleall
+        int preparecnt
+        int forkcnt
+        int asynccnt
 
     struct ev_io:
         int fd
@@ -124,6 +139,8 @@ cdef extern from "libev.h":
 
     int ev_priority(void*)
     void ev_set_priority(void*, int)
+    void ev_set_io_collect_interval(ev_loop*, double)
+    void ev_set_timeout_collect_interval(ev_loop*, double)
 
     int ev_is_pending(void*)
     int ev_is_active(void*)
@@ -2,11 +2,12 @@
 """Locking primitives"""
 
 import sys
-from gevent.hub import get_hub, getcurrent
+from collections import deque
+from gevent.hub import get_hub, getcurrent, Waiter
 from gevent.timeout import Timeout
 
 
-__all__ = ['Semaphore', 'DummySemaphore', 'BoundedSemaphore', 'RLock']
+__all__ = ['Semaphore', 'DummySemaphore', 'BoundedSemaphore', 'RLock', 'Condition', 'RWLock']
 
 
 class PySemaphore(object):
@@ -21,8 +22,10 @@ class PySemaphore(object):
             raise ValueError("semaphore initial value must be >= 0")
         self._links = []
         self.counter = value
-        self.hub = get_hub()
-        self._notifier = self.hub.loop.callback()
+        # the hub is looked up by the first rawlink(), so that creating a lock (for example, when
+        # the patched threading module is imported) does not create the hub
+        self.hub = None
+        self._notifier = None
 
     def __str__(self):
         params = (self.__class__.__name__, self.counter, len(self._links))
@@ -62,6 +65,9 @@ class PySemaphore(object):
         """
         if not callable(callback):
             raise TypeError('Expected callable: %r' % (callback, ))
+        if self._notifier is None:
+            self.hub = get_hub()
+            self._notifier = self.hub.loop.callback()
         self._links.append(callback)
         self._dirty = True
 
@@ -241,3 +247,246 @@ class RLock(object):
 
     def _is_owned(self):
         return self._owner is getcurrent()
+
+
+class _ReadyWaiters(object):
+    # Waiters that are to be woken up, in order, from a single callback in the hub.
+
+    __slots__ = ['hub', 'waiters']
+
+    def __init__(self, hub):
+        self.hub = hub
+        self.waiters = deque()
+
+    def append(self, waiter):
+        if not self.waiters:
+            self.hub.loop.run_callback(self._wake)
+        self.waiters.append(waiter)
+
+    def discard(self, waiter):
+        if waiter in self.waiters:
+            self.waiters.remove(waiter)
+
+    def _wake(self):
+        waiters = self.waiters
+        while waiters:
+            waiters.popleft().switch(True)
+
+
+class Condition(object):
+    """A condition variable with the same interface as :class:`threading.Condition` that works across greenlets.
+
+    If *lock* is not given, a new :class:`RLock` is created. Waiting greenlets are woken up
+    in the order they started waiting and :meth:`notify` does not depend on the number of waiters.
+    """
+
+    def __init__(self, lock=None):
+        if lock is None:
+            lock = RLock()
+        self._lock = lock
+        self.acquire = lock.acquire
+        self.release = lock.release
+        for name in ('_release_save', '_acquire_restore', '_is_owned'):
+            method = getattr(lock, name, None)
+            if method is not None:
+                setattr(self, name, method)
+        self._waiters = deque()
+        self._ready = _ReadyWaiters(get_hub())
+
+    def __repr__(self):
+        return '<%s(%s, %d)>' % (self.__class__.__name__, self._lock, len(self._waiters))
+
+    def __enter__(self):
+        return self._lock.__enter__()
+
+    def __exit__(self, *args):
+        return self._lock.__exit__(*args)
+
+    def _release_save(self):
+        self._lock.release()
+
+    def _acquire_restore(self, _state):
+        self._lock.acquire()
+
+    def _is_owned(self):
+        # the same check threading.Condition uses for locks that do not implement it
+        if self._lock.acquire(False):
+            self._lock.release()
+            return False
+        return True
+
+    def wait(self, timeout=None):
+        """Release the lock and block until notified or until the optional *timeout* occurs.
+
+        The lock is acquired again before returning. Return ``False`` if the timeout
+        occurred before the condition was notified and ``True`` otherwise.
+        """
+        if not self._is_owned():
+            raise RuntimeError("cannot wait on un-acquired lock")
+        waiter = Waiter()
+        self._waiters.append(waiter)
+        saved_state = self._release_save()
+        notified = True
+        timer = Timeout.start_new(timeout)
+        try:
+            try:
+                waiter.get()
+            except Timeout:
+                if sys.exc_info()[1] is not timer:
+                    self._cancel(waiter)
+                    raise
+                notified = not self._remove(waiter)
+                self._ready.discard(waiter)
+            except:
+                self._cancel(waiter)
+                raise
+        finally:
+            timer.cancel()
+            self._acquire_restore(saved_state)
+        return notified
+
+    def _remove(self, waiter):
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+            return True
+        # already notified
+        return False
+
+    def _cancel(self, waiter):
+        if not self._remove(waiter):
+            # pass the notification on to somebody who is still waiting
+            self._ready.discard(waiter)
+            self._notify(1)
+
+    def notify(self, n=1):
+        """Wake up at most *n* greenlets waiting on this condition."""
+        if not self._is_owned():
+            raise RuntimeError("cannot notify on un-acquired lock")
+        self._notify(n)
+
+    def _notify(self, n):
+        waiters = self._waiters
+        while n > 0 and waiters:
+            self._ready.append(waiters.popleft())
+            n -= 1
+
+    def notify_all(self):
+        """Wake up all the greenlets waiting on this condition."""
+        self.notify(len(self._waiters))
+
+    notifyAll = notify_all
+
+
+class RWLock(object):
+    """A reader-writer lock.
+
+    Any number of greenlets may hold the lock for reading at the same time, while holding it
+    for writing is exclusive. Writers are preferred: once a writer is waiting, new readers
+    block until it has got and released the lock. Neither side is reentrant.
+
+    :attr:`reader` and :attr:`writer` are lock-like objects for use in ``with`` statements::
+
+        with rwlock.reader:
+            return cache[key]
+    """
+
+    def __init__(self):
+        self._readers = 0
+        self._writer = None
+        self._read_waiters = deque()
+        self._write_waiters = deque()
+        self._ready = _ReadyWaiters(get_hub())
+        self.reader = _RWLockSide(self.acquire_read, self.release_read)
+        self.writer = _RWLockSide(self.acquire_write, self.release_write)
+
+    def __repr__(self):
+        return '<%s readers=%d writer=%r waiting=%d/%d>' % (self.__class__.__name__, self._readers, self._writer,
+                                                            len(self._read_waiters), len(self._write_waiters))
+
+    def acquire_read(self, blocking=True, timeout=None):
+        """Acquire the lock for reading. Return whether it was acquired."""
+        if self._writer is None and not self._write_waiters:
+            self._readers += 1
+            return True
+        if not blocking:
+            return False
+        return self._wait(self._read_waiters, timeout)
+
+    def release_read(self):
+        if self._readers <= 0:
+            raise RuntimeError("cannot release un-acquired lock")
+        self._readers -= 1
+        if not self._readers:
+            self._grant()
+
+    def acquire_write(self, blocking=True, timeout=None):
+        """Acquire the lock for writing. Return whether it was acquired."""
+        if self._writer is None and not self._readers and not self._write_waiters:
+            self._writer = getcurrent()
+            return True
+        if not blocking:
+            return False
+        return self._wait(self._write_waiters, timeout)
+
+    def release_write(self):
+        if self._writer is not getcurrent():
+            raise RuntimeError("cannot release un-acquired lock")
+        self._writer = None
+        self._grant()
+
+    def _grant(self):
+        # hand the lock over to the waiters directly, so that nobody can barge in before they run
+        if self._writer is not None:
+            return
+        if self._write_waiters:
+            if not self._readers:
+                waiter = self._write_waiters.popleft()
+                self._writer = waiter.greenlet
+                self._ready.append(waiter)
+            return
+        while self._read_waiters:
+            self._readers += 1
+            self._ready.append(self._read_waiters.popleft())
+
+    def _wait(self, waiters, timeout):
+        waiter = Waiter()
+        waiters.append(waiter)
+        timer = Timeout.start_new(timeout)
+        try:
+            waiter.get()
+        except:
+            ex = sys.exc_info()[1]
+            if waiter in waiters:
+                waiters.remove(waiter)
+            elif ex is timer:
+                self._ready.discard(waiter)
+                # the lock was handed over to us before the timeout fired
+                return True
+            else:
+                self._ready.discard(waiter)
+                if waiters is self._write_waiters:
+                    self._writer = None
+                else:
+                    self._readers -= 1
+            self._grant()
+            if ex is timer:
+                return False
+            raise
+        finally:
+            timer.cancel()
+        return True
+
+
+class _RWLockSide(object):
+
+    __slots__ = ['acquire', 'release']
+
+    def __init__(self, acquire, release):
+        self.acquire = acquire
+        self.release = release
+
+    def __enter__(self):
+        self.acquire()
+
+    def __exit__(self, typ, val, tb):
+        self.release()
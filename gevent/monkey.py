@@ -34,6 +34,7 @@ Monkey patches:
 * :mod:`os` module -- :func:`patch_os`
 
   - :func:`fork`
+  - :func:`waitpid`, only if ``waitpid=True`` is passed to :func:`patch_os`
 
 * :mod:`time` module -- :func:`patch_time`
 
@@ -42,7 +43,8 @@ Monkey patches:
 * :mod:`select` module -- :func:`patch_select`
 
   - :func:`select`
-  - Removes polling mechanisms that :mod:`gevent.select` does not simulate: poll, epoll, kqueue, kevent
+  - :class:`poll`
+  - Removes polling mechanisms that :mod:`gevent.select` does not simulate: epoll, kqueue, kevent
 
 * :mod:`thread` and :mod:`threading` modules -- :func:`patch_thread`
 
@@ -54,9 +56,15 @@ Monkey patches:
   - :func:`exit`
   - :func:`stack_size`
   - thread-local storage becomes greenlet-local storage
-"""
 
+``patch_all(lazy=True)`` only patches the modules that are already imported; the rest are patched
+by an import hook when they are first imported, so a process that never uses e.g. :mod:`ssl` or
+:mod:`threading` neither imports nor patches them. :data:`patched` records which patches were
+applied and how long each took.
+"""
+from __future__ import absolute_import
 import sys
+from time import time as _time
 
 __all__ = ['patch_all',
            'patch_socket',
@@ -71,6 +79,10 @@ __all__ = ['patch_all',
 # e.g. "time" -> "sleep" -> built-in function sleep
 saved = {}
 
+# maps the name of the patched module -> seconds spent patching it, filled by patch_all()
+# e.g. "socket" -> 0.0021
+patched = {}
+
 
 def get_original(name, items):
     d = saved.get(name, {})
@@ -115,8 +127,15 @@ def patch_module(name, items=None):
         patch_item(module, attr, getattr(gevent_module, attr))
 
 
-def patch_os():
-    """Replace :func:`os.fork` with :func:`gevent.fork`. Does nothing if fork is not available."""
+def patch_os(waitpid=False):
+    """Replace :func:`os.fork` with :func:`gevent.fork`. Does nothing if fork is not available.
+
+    If *waitpid* is true, replace :func:`os.fork` and :func:`os.waitpid` with their cooperative
+    :mod:`gevent.os` counterparts instead.
+    """
+    if waitpid:
+        patch_module('os')
+        return
     try:
         from gevent.hub import fork
     except ImportError:
@@ -138,23 +157,30 @@ def patch_thread(threading=True, _threading_local=True):
     If *_threading_local* is true (the default), also patch ``_threading_local.local``.
     """
     patch_module('thread')
-    from gevent.local import local
     if threading:
-        from gevent import thread as green_thread
-        threading = __import__('threading')
-        # QQQ Note, that importing threading results in get_hub() call.
-        # QQQ Would prefer not to import threading at all if it's not used;
-        # QQQ that should be possible with import hooks
-        threading.local = local
-        threading._start_new_thread = green_thread.start_new_thread
-        threading._allocate_lock = green_thread.allocate_lock
-        threading.Lock = green_thread.allocate_lock
-        threading._get_ident = green_thread.get_ident
-        from gevent.hub import sleep
-        threading._sleep = sleep
+        _patch_threading()
     if _threading_local:
-        _threading_local = __import__('_threading_local')
-        _threading_local.local = local
+        _patch_threading_local()
+
+
+def _patch_threading():
+    from gevent.local import local
+    from gevent import thread as green_thread
+    threading = __import__('threading')
+    # importing threading creates a few locks, but not the hub: a Semaphore looks it up on first use
+    threading.local = local
+    threading._start_new_thread = green_thread.start_new_thread
+    threading._allocate_lock = green_thread.allocate_lock
+    threading.Lock = green_thread.allocate_lock
+    threading._get_ident = green_thread.get_ident
+    from gevent.hub import sleep
+    threading._sleep = sleep
+
+
+def _patch_threading_local():
+    from gevent.local import local
+    _threading_local = __import__('_threading_local')
+    _threading_local.local = local
 
 
 def patch_socket(dns=True, aggressive=True):
@@ -187,8 +213,17 @@ def patch_ssl():
     patch_module('ssl')
 
 
+def _patch_ssl():
+    try:
+        patch_ssl()
+    except ImportError:
+        if sys.version_info[:2] > (2, 5):
+            raise
+        # in Python 2.5, 'ssl' is a standalone package not included in stdlib
+
+
 def patch_select(aggressive=True):
-    """Replace :func:`select.select` with :func:`gevent.select.select`.
+    """Replace :func:`select.select` and :class:`select.poll` with their :mod:`gevent.select` counterparts.
 
     If aggressive is true (the default), also remove other blocking functions the :mod:`select`.
     """
@@ -197,33 +232,76 @@ def patch_select(aggressive=True):
         select = __import__('select')
         # since these are blocking we're removing them here. This makes some other
         # modules (e.g. asyncore)  non-blocking, as they use select that we provide
-        # when none of these are available.
-        remove_item(select, 'poll')
+        # when none of these are available. (poll is replaced by gevent.select.poll)
         remove_item(select, 'epoll')
         remove_item(select, 'kqueue')
         remove_item(select, 'kevent')
 
 
-def patch_all(socket=True, dns=True, time=True, select=True, thread=True, os=True, ssl=True, httplib=False, aggressive=True):
-    """Do all of the default monkey patching (calls every other function in this module."""
+class _ImportHook(object):
+    """A :data:`sys.meta_path` finder that applies the patches deferred by ``patch_all(lazy=True)``
+    right after their module is imported."""
+
+    def __init__(self):
+        # maps module name -> list of (function, kwargs)
+        self.pending = {}
+
+    def add(self, name, function, kwargs):
+        self.pending.setdefault(name, []).append((function, kwargs))
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def find_module(self, fullname, path=None):
+        if fullname in self.pending:
+            return self
+
+    def load_module(self, fullname):
+        patches = self.pending.pop(fullname)
+        if not self.pending:
+            sys.meta_path.remove(self)
+        # the module is not pending anymore, so this import is a regular one
+        __import__(fullname)
+        for function, kwargs in patches:
+            _apply(fullname, function, kwargs)
+        return sys.modules[fullname]
+
+
+_import_hook = _ImportHook()
+
+
+def _apply(name, function, kwargs):
+    start = _time()
+    function(**kwargs)
+    patched[name] = patched.get(name, 0) + _time() - start
+
+
+def patch_all(socket=True, dns=True, time=True, select=True, thread=True, os=True, ssl=True, httplib=False, aggressive=True, lazy=False):
+    """Do all of the default monkey patching (calls every other function in this module.
+
+    If *lazy* is true, only patch the modules that are already imported; each of the others
+    is patched when it is first imported.
+    """
     # order is important
+    patches = []
     if os:
-        patch_os()
+        patches.append(('os', patch_os, {}))
     if time:
-        patch_time()
+        patches.append(('time', patch_time, {}))
     if thread:
-        patch_thread()
+        patches.append(('thread', patch_thread, {'threading': False, '_threading_local': False}))
+        patches.append(('threading', _patch_threading, {}))
+        patches.append(('_threading_local', _patch_threading_local, {}))
     if socket:
-        patch_socket(dns=dns, aggressive=aggressive)
+        patches.append(('socket', patch_socket, {'dns': dns, 'aggressive': aggressive}))
     if select:
-        patch_select(aggressive=aggressive)
+        patches.append(('select', patch_select, {'aggressive': aggressive}))
     if ssl:
-        try:
-            patch_ssl()
-        except ImportError:
-            if sys.version_info[:2] > (2, 5):
-                raise
-            # in Python 2.5, 'ssl' is a standalone package not included in stdlib
+        patches.append(('ssl', _patch_ssl, {}))
+    for name, function, kwargs in patches:
+        if lazy and name not in sys.modules:
+            _import_hook.add(name, function, kwargs)
+        else:
+            _apply(name, function, kwargs)
     if httplib:
         raise ValueError('gevent.httplib is no longer provided, httplib must be False')
 
@@ -239,7 +317,7 @@ You can exclude a module with --no-module, e.g. --no-thread. You can
 specify a module to patch with --module, e.g. --socket. In the latter
 case only the modules specified on the command line will be patched.
 
-MONKEY OPTIONS: --verbose %s""" % ', '.join('--[no-]%s' % m for m in modules)
+MONKEY OPTIONS: --verbose, --lazy, %s""" % ', '.join('--[no-]%s' % m for m in modules)
     args = {}
     argv = sys.argv[1:]
     verbose = False
@@ -265,6 +343,8 @@ MONKEY OPTIONS: --verbose %s""" % ', '.join('--[no-]%s' % m for m in modules)
         print ('cwd=%s' % os.getcwd())
 
     patch_all(**args)
+    if verbose:
+        print ('patched=%s' % pprint.pformat(patched))
     if argv:
         sys.argv = argv
         __package__ = None
@@ -0,0 +1,185 @@
+# Copyright (c) 2012 Denis Bilenko. See LICENSE for details.
+"""Cooperative counterparts of some functions of the standard :mod:`os` module.
+
+:func:`nb_read` and :func:`nb_write` work on file descriptors in non-blocking mode (see
+:func:`make_nonblocking`), for example the ends of a pipe: when the descriptor is not ready
+they block the current greenlet rather than the whole process.
+
+:func:`waitpid` waits for a child process with a :meth:`loop.child <gevent.core.loop.child>`
+watcher. The default loop reaps every child process that exits while it runs, so a child that
+exited before anybody waited for it can only be reported if it was created by :func:`fork`
+from this module, which records its exit status. :func:`gevent.monkey.patch_os` installs both
+functions into :mod:`os` if called with ``waitpid=True``.
+"""
+import sys
+import errno
+from gevent.hub import get_hub, PY3
+
+__implements__ = ['fork', 'waitpid']
+__extensions__ = ['make_nonblocking', 'nb_read', 'nb_write']
+
+__os__ = __import__('os')
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_read = __os__.read
+_write = __os__.write
+_waitpid = getattr(__os__, 'waitpid', None)
+WNOHANG = getattr(__os__, 'WNOHANG', None)
+
+ignored_errors = [errno.EAGAIN, errno.EINTR]
+if sys.platform == 'win32':
+    ignored_errors.append(errno.EWOULDBLOCK)
+
+if fcntl is None:
+    __extensions__.remove('make_nonblocking')
+    __extensions__.remove('nb_read')
+    __extensions__.remove('nb_write')
+
+try:
+    from gevent.hub import fork as _fork
+except ImportError:
+    __implements__.remove('fork')
+
+if _waitpid is None:
+    __implements__.remove('waitpid')
+
+__all__ = __implements__ + __extensions__
+
+
+if fcntl is not None:
+
+    def make_nonblocking(fd):
+        """Put the file descriptor *fd* into non-blocking mode.
+
+        Return True if the mode was changed, False if *fd* was already non-blocking.
+        """
+        flags = fcntl.fcntl(fd, fcntl.F_GETFL, 0)
+        if not bool(flags & __os__.O_NONBLOCK):
+            fcntl.fcntl(fd, fcntl.F_SETFL, flags | __os__.O_NONBLOCK)
+            return True
+        return False
+
+    def nb_read(fd, n):
+        """Read up to *n* bytes from the non-blocking file descriptor *fd*, like :func:`os.read`.
+
+        While *fd* has nothing to read, only the current greenlet is blocked.
+        """
+        hub = None
+        watcher = None
+        while True:
+            try:
+                return _read(fd, n)
+            except OSError:
+                if sys.exc_info()[1].args[0] not in ignored_errors:
+                    raise
+                if not PY3:
+                    sys.exc_clear()
+            if hub is None:
+                hub = get_hub()
+                watcher = hub.loop.io(fd, 1)
+            hub.wait(watcher)
+
+    def nb_write(fd, data):
+        """Write *data* to the non-blocking file descriptor *fd*, like :func:`os.write`.
+
+        Return the number of bytes written. While *fd* cannot accept data, only the current
+        greenlet is blocked.
+        """
+        hub = None
+        watcher = None
+        while True:
+            try:
+                return _write(fd, data)
+            except OSError:
+                if sys.exc_info()[1].args[0] not in ignored_errors:
+                    raise
+                if not PY3:
+                    sys.exc_clear()
+            if hub is None:
+                hub = get_hub()
+                watcher = hub.loop.io(fd, 2)
+            hub.wait(watcher)
+
+
+# maps pid of a child created by fork() -> the child watcher while it runs, then (pid, status)
+_watched_children = {}
+
+
+def _child_watcher(pid, ref=True):
+    """Return a new child watcher for *pid*, or None if the current loop cannot watch children."""
+    try:
+        return get_hub().loop.child(pid, ref=ref)
+    except TypeError:
+        # not the default loop, or the loop was created with "nochild"
+        return None
+
+
+def _on_child(watcher):
+    watcher.stop()
+    _watched_children[watcher.pid] = (watcher.rpid, watcher.rstatus)
+
+
+if 'fork' in __implements__:
+
+    def fork():
+        """Like :func:`gevent.fork`, but also record the exit status of the child for :func:`waitpid`.
+
+        The status is kept until :func:`waitpid` collects it.
+        """
+        pid = _fork()
+        if pid:
+            # only records the status, so it must not keep the loop alive
+            watcher = _child_watcher(pid, ref=False)
+            if watcher is not None:
+                _watched_children[pid] = watcher
+                watcher.start(_on_child, watcher)
+        else:
+            # the children of the parent are not ours
+            for watcher in _watched_children.values():
+                if not isinstance(watcher, tuple):
+                    watcher.stop()
+            _watched_children.clear()
+        return pid
+
+
+if _waitpid is not None:
+
+    def waitpid(pid, options):
+        """Wait for the child process *pid*, blocking only the current greenlet; see :func:`os.waitpid`.
+
+        *pid* may also be -1 to wait for any child. Other values of *pid* that select a process
+        group, options other than ``WNOHANG``, and loops that cannot watch children fall back
+        to the blocking :func:`os.waitpid`.
+        """
+        if pid == -1:
+            for child_pid, status in list(_watched_children.items()):
+                if isinstance(status, tuple):
+                    del _watched_children[child_pid]
+                    return status
+        elif pid in _watched_children:
+            status = _watched_children[pid]
+            if isinstance(status, tuple):
+                del _watched_children[pid]
+                return status
+        if pid < -1 or pid == 0 or options & ~WNOHANG:
+            return _waitpid(pid, options)
+        # the loop reaps children only while it runs, so a child that already exited is still there
+        result = _waitpid(pid, options | WNOHANG)
+        if result[0] or options & WNOHANG:
+            return _collected(result)
+        watcher = _child_watcher(0 if pid == -1 else pid)
+        if watcher is None:
+            return _waitpid(pid, options)
+        get_hub().wait(watcher)
+        return _collected((watcher.rpid, watcher.rstatus))
+
+
+def _collected(result):
+    watcher = _watched_children.pop(result[0], None)
+    if watcher is not None and not isinstance(watcher, tuple):
+        watcher.stop()
+    return result
@@ -183,14 +183,18 @@ class Group(object):
         """
         return Greenlet.spawn(self.map_cb, func, iterable, callback)
 
-    def imap(self, func, iterable):
-        """An equivalent of itertools.imap()"""
-        return IMap.spawn(func, iterable, spawn=self.spawn)
+    def imap(self, func, iterable, maxsize=None):
+        """An equivalent of itertools.imap()
 
-    def imap_unordered(self, func, iterable):
+        If *maxsize* is given, at most that many items are being processed or waiting
+        to be consumed at any time; reading from *iterable* pauses until the consumer catches up.
+        """
+        return IMap.spawn(func, iterable, spawn=self.spawn, maxsize=maxsize)
+
+    def imap_unordered(self, func, iterable, maxsize=None):
         """The same as imap() except that the ordering of the results from the
         returned iterator should be considered in arbitrary order."""
-        return IMapUnordered.spawn(func, iterable, spawn=self.spawn)
+        return IMapUnordered.spawn(func, iterable, spawn=self.spawn, maxsize=maxsize)
 
     def full(self):
         return False
@@ -201,15 +205,22 @@ class Group(object):
 
 class IMapUnordered(Greenlet):
 
-    def __init__(self, func, iterable, spawn=None):
+    def __init__(self, func, iterable, spawn=None, maxsize=None):
         from gevent.queue import Queue
         Greenlet.__init__(self)
         if spawn is not None:
             self.spawn = spawn
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError('maxsize must be positive: %r' % (maxsize, ))
         self.func = func
         self.iterable = iterable
         self.queue = Queue()
         self.count = 0
+        # counts the items that were spawned but whose results were not consumed yet
+        if maxsize is None:
+            self._result_semaphore = DummySemaphore()
+        else:
+            self._result_semaphore = Semaphore(maxsize)
         self.rawlink(self._on_finish)
 
     def __iter__(self):
@@ -219,6 +230,7 @@ class IMapUnordered(Greenlet):
         value = self.queue.get()
         if isinstance(value, Failure):
             raise value.exc
+        self._result_semaphore.release()
         return value
 
     if PY3:
@@ -228,7 +240,9 @@ class IMapUnordered(Greenlet):
     def _run(self):
         try:
             func = self.func
+            acquire = self._result_semaphore.acquire
             for item in self.iterable:
+                acquire()
                 self.count += 1
                 self.spawn(func, item).rawlink(self._on_result)
         finally:
@@ -240,6 +254,8 @@ class IMapUnordered(Greenlet):
         self.count -= 1
         if greenlet.successful():
             self.queue.put(greenlet.value)
+        else:
+            self._result_semaphore.release()
         if self.ready() and self.count <= 0:
             self.queue.put(Failure(StopIteration))
 
@@ -250,11 +266,13 @@ class IMapUnordered(Greenlet):
 
 class IMap(Greenlet):
 
-    def __init__(self, func, iterable, spawn=None):
+    def __init__(self, func, iterable, spawn=None, maxsize=None):
         from gevent.queue import Queue
         Greenlet.__init__(self)
         if spawn is not None:
             self.spawn = spawn
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError('maxsize must be positive: %r' % (maxsize, ))
         self.func = func
         self.iterable = iterable
         self.queue = Queue()
@@ -262,6 +280,11 @@ class IMap(Greenlet):
         self.waiting = []  # QQQ maybe deque will work faster there?
         self.index = 0
         self.maxindex = -1
+        # counts the items that were spawned but whose results were not consumed yet
+        if maxsize is None:
+            self._result_semaphore = DummySemaphore()
+        else:
+            self._result_semaphore = Semaphore(maxsize)
         self.rawlink(self._on_finish)
 
     def __iter__(self):
@@ -279,6 +302,7 @@ class IMap(Greenlet):
             self.index += 1
             if isinstance(value, Failure):
                 raise value.exc
+            self._result_semaphore.release()
             if value is not _SKIP:
                 return value
 
@@ -289,7 +313,9 @@ class IMap(Greenlet):
     def _run(self):
         try:
             func = self.func
+            acquire = self._result_semaphore.acquire
             for item in self.iterable:
+                acquire()
                 self.count += 1
                 g = self.spawn(func, item)
                 g.rawlink(self._on_result)
@@ -0,0 +1,173 @@
+# Copyright (c) 2012 gevent contributors. See LICENSE for details.
+"""Sampling profiler that knows about greenlets.
+
+While the profiler is running, the process receives SIGPROF every *interval* seconds of CPU time
+and the stack of the greenlet that is running at that moment is recorded. The stacks are grouped
+by the function the greenlet was spawned with, so that the time the hub spends running the event
+loop is not mixed up with the time spent in the handlers. The profiler also tracks greenlet
+switches to measure how much wall clock time each kind of greenlet has been running.
+
+The results are available as collapsed stacks, the input format of flamegraph.pl::
+
+    from gevent import profiler
+    p = profiler.profile(10)
+    p.write('/tmp/profile.folded')
+    print (p.format_stats())
+
+:func:`profile` sleeps cooperatively, so it can be used to profile a running process from
+a :class:`gevent.backdoor.BackdoorServer` console, where it is available as ``profile``.
+
+The profiler must be started in the main thread and only one profiler can run at a time.
+"""
+from __future__ import absolute_import
+import os
+import signal
+from time import time
+from gevent.hub import getcurrent, sleep, _get_greenlet_name
+
+
+__all__ = ['Profiler', 'start', 'stop', 'profile']
+
+settrace = __import__('greenlet').settrace
+
+_current = None
+
+
+def format_code(code):
+    return '%s (%s:%s)' % (code.co_name, os.path.basename(code.co_filename), code.co_firstlineno)
+
+
+class Profiler(object):
+    """Collect samples of the running greenlets' stacks every *interval* seconds of CPU time."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = {}
+        self.running_time = {}
+        self.switches = {}
+        self.started_at = None
+        self.stopped_at = None
+        self._old_handler = None
+        self._old_trace = None
+        self._switched_at = None
+
+    def __repr__(self):
+        return '<%s at %s interval=%s samples=%s>' % (self.__class__.__name__, hex(id(self)),
+                                                       self.interval, sum(self.samples.values()))
+
+    def start(self):
+        global _current
+        if _current is not None:
+            raise RuntimeError('Another profiler is already running: %r' % (_current, ))
+        self._old_handler = signal.signal(signal.SIGPROF, self._sample)
+        # restart the system calls interrupted by SIGPROF rather than failing them with EINTR
+        signal.siginterrupt(signal.SIGPROF, False)
+        self._old_trace = settrace(self._trace)
+        _current = self
+        self.started_at = self._switched_at = time()
+        self.stopped_at = None
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        global _current
+        if _current is not self:
+            return
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self._old_handler or signal.SIG_DFL)
+        # back to interrupting the system calls, which is what signal.signal() sets up
+        signal.siginterrupt(signal.SIGPROF, True)
+        settrace(self._old_trace)
+        self._old_handler = self._old_trace = None
+        _current = None
+        self.stopped_at = time()
+        self._add_running_time(_get_greenlet_name(getcurrent()), self.stopped_at)
+
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        stack.reverse()
+        key = (_get_greenlet_name(getcurrent()), tuple(stack))
+        self.samples[key] = self.samples.get(key, 0) + 1
+
+    def _trace(self, event, args):
+        if event in ('switch', 'throw'):
+            origin = _get_greenlet_name(args[0])
+            self._add_running_time(origin, time())
+            self.switches[origin] = self.switches.get(origin, 0) + 1
+        if self._old_trace is not None:
+            self._old_trace(event, args)
+
+    def _add_running_time(self, label, now):
+        self.running_time[label] = self.running_time.get(label, 0.0) + now - self._switched_at
+        self._switched_at = now
+
+    def collapsed(self):
+        """Return the samples as collapsed stacks, one "greenlet;frame;frame count" line per stack."""
+        counts = {}
+        for (label, stack), count in self.samples.items():
+            line = ';'.join([label] + [format_code(code) for code in stack])
+            counts[line] = counts.get(line, 0) + count
+        return ''.join('%s %s\n' % item for item in sorted(counts.items()))
+
+    def write(self, path):
+        """Write :meth:`collapsed` output into *path*."""
+        f = open(path, 'w')
+        try:
+            f.write(self.collapsed())
+        finally:
+            f.close()
+
+    def greenlet_stats(self):
+        """Return ``{label: (samples, cpu_seconds, running_seconds, switches)}`` for each kind of greenlet.
+
+        *cpu_seconds* is estimated from the number of samples. *running_seconds* is the wall clock time
+        the greenlets have been running for, that is, between being switched into and switching out.
+        """
+        samples = {}
+        for (label, _stack), count in self.samples.items():
+            samples[label] = samples.get(label, 0) + count
+        result = {}
+        for label in set(samples) | set(self.running_time):
+            count = samples.get(label, 0)
+            result[label] = (count, count * self.interval, self.running_time.get(label, 0.0), self.switches.get(label, 0))
+        return result
+
+    def format_stats(self):
+        stats = self.greenlet_stats()
+        lines = ['%-40s %8s %10s %10s %9s' % ('greenlet', 'samples', 'cpu', 'running', 'switches')]
+        for label in sorted(stats, key=lambda label: stats[label][:3], reverse=True):
+            lines.append('%-40s %8d %9.3fs %9.3fs %9d' % ((label[:40], ) + stats[label]))
+        return '\n'.join(lines)
+
+
+def start(interval=0.005):
+    """Start a :class:`Profiler` and return it."""
+    profiler = Profiler(interval)
+    profiler.start()
+    return profiler
+
+
+def stop():
+    """Stop the running profiler and return it. Return None if no profiler is running."""
+    profiler = _current
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def profile(seconds=10, interval=0.005, path=None):
+    """Profile the process for *seconds* seconds and return the :class:`Profiler`.
+
+    Only the calling greenlet is blocked while profiling. If *path* is provided, the collapsed
+    stacks are also written into it.
+    """
+    profiler = start(interval)
+    try:
+        sleep(seconds)
+    finally:
+        profiler.stop()
+    if path is not None:
+        profiler.write(path)
+    return profiler
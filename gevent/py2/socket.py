@@ -50,7 +50,9 @@ __implements__ += __dns__
 # non-standard functions that this module provides:
 __extensions__ = ['wait_read',
                   'wait_write',
-                  'wait_readwrite']
+                  'wait_readwrite',
+                  'SocketIO',
+                  'CorkedWriter']
 
 # standard functions and classes that this module re-imports
 __imports__ = ['error',
@@ -81,7 +83,7 @@ __imports__ = ['error',
 
 import sys
 import time
-from gevent.hub import get_hub, string_types, integer_types
+from gevent.hub import get_hub, spawn_raw, string_types, integer_types
 from gevent.timeout import Timeout
 
 is_windows = sys.platform == 'win32'
@@ -110,6 +112,8 @@ except ImportError:
     EBADF = 9
 
 import _socket
+from io import RawIOBase
+from weakref import ref
 _realsocket = _socket.socket
 __socket__ = __import__('socket')
 _fileobject = __socket__._fileobject
@@ -222,6 +226,9 @@ timeout_default = object()
 
 class socket(object):
 
+    # weak references to the objects sharing this one's watchers, if any
+    _watcher_users = None
+
     def __init__(self, family=AF_INET, type=SOCK_STREAM, proto=0, _sock=None):
         if _sock is None:
             self._sock = _realsocket(family, type, proto)
@@ -236,11 +243,24 @@ class socket(object):
                 self._sock = _sock
                 self.timeout = _socket.getdefaulttimeout()
         self._sock.setblocking(0)
-        fileno = self._sock.fileno()
         self.hub = get_hub()
-        io = self.hub.loop.io
-        self._read_event = io(fileno, 1)
-        self._write_event = io(fileno, 2)
+        if getattr(_sock, 'hub', None) is self.hub:
+            # another gevent socket object for the same descriptor (dup(), makefile(),
+            # SSLSocket): share its watchers rather than creating a new pair
+            self._read_event = _sock._read_event
+            self._write_event = _sock._write_event
+            users = _sock._watcher_users
+            if users is None:
+                users = _sock._watcher_users = [ref(_sock)]
+            else:
+                users[:] = [user for user in users if user() is not None]
+            users.append(ref(self))
+            self._watcher_users = users
+        else:
+            fileno = self._sock.fileno()
+            io = self.hub.loop.io
+            self._read_event = io(fileno, 1)
+            self._write_event = io(fileno, 2)
 
     def __repr__(self):
         return '<%s at %s %s>' % (type(self).__name__, hex(id(self)), self._formatinfo())
@@ -306,10 +326,21 @@ class socket(object):
         return socket(_sock=client_socket), address
 
     def close(self, _closedsocket=_closedsocket, _delegate_methods=_delegate_methods,
-              setattr=setattr, cancel_wait_ex=cancel_wait_ex):
+              setattr=setattr, cancel_wait_ex=cancel_wait_ex, isinstance=isinstance):
         # This function should not reference any globals. See Python issue #808164.
-        self.hub.cancel_wait(self._read_event, cancel_wait_ex)
-        self.hub.cancel_wait(self._write_event, cancel_wait_ex)
+        users = self._watcher_users
+        if users is not None:
+            # the waits are cancelled when the last object using the watchers is closed,
+            # as the descriptor stays open until then
+            for user in users:
+                user = user()
+                if user is not None and user is not self and not isinstance(user._sock, _closedsocket):
+                    break
+            else:
+                users = None
+        if users is None:
+            self.hub.cancel_wait(self._read_event, cancel_wait_ex)
+            self.hub.cancel_wait(self._write_event, cancel_wait_ex)
         self._sock = _closedsocket()
         dummy = self._sock._dummy
         for method in _delegate_methods:
@@ -358,8 +389,14 @@ class socket(object):
         """dup() -> socket object
 
         Return a new socket object connected to the same system resource.
-        Note, that the new socket does not inherit the timeout."""
-        return socket(_sock=self._sock)
+        Note, that the new socket does not inherit the timeout.
+
+        Both sockets use the same io watchers, so they cannot wait for the same event
+        in two greenlets at once. Closing one cancels the waits on the other only if
+        no other object uses the watchers anymore."""
+        sock = socket(_sock=self)
+        sock.timeout = _socket.getdefaulttimeout()
+        return sock
 
     def makefile(self, mode='r', bufsize=-1):
         # note that this does not inherit timeout either (intentionally, because that's
@@ -467,9 +504,19 @@ class socket(object):
             while data_sent < len(data):
                 data_sent += self.send(_get_memory(data, data_sent), flags)
         else:
+            # the first attempt does not wait, so in the common case of the data fitting into the
+            # socket's buffer the clock is not consulted at all
+            try:
+                data_sent = self.send(data, flags, timeout=0.0)
+            except error:
+                if sys.exc_info()[1].args[0] != EWOULDBLOCK:
+                    raise
+                sys.exc_clear()
+                data_sent = 0
+            if data_sent >= len(data):
+                return
             timeleft = self.timeout
             end = time.time() + timeleft
-            data_sent = 0
             while True:
                 data_sent += self.send(_get_memory(data, data_sent), flags, timeout=timeleft)
                 if data_sent >= len(data):
@@ -562,6 +609,130 @@ except AttributeError:
     _GLOBAL_DEFAULT_TIMEOUT = object()
 
 
+class SocketIO(RawIOBase):
+    """Raw I/O object reading from a socket with ``recv_into``.
+
+    Wrapped into :class:`io.BufferedReader`, it gives a file object for reading whose
+    ``readline`` is implemented in C and whose buffer is allocated once and refilled
+    in place, unlike the ``_fileobject`` returned by :meth:`socket.makefile`. The socket
+    tries the non-blocking ``recv_into`` before it starts waiting.
+
+    Closing the object does not close the socket.
+    """
+
+    def __init__(self, sock):
+        RawIOBase.__init__(self)
+        self._sock = sock
+        self._received = 0
+
+    def readinto(self, b):
+        self._checkClosed()
+        count = self._sock.recv_into(b)
+        self._received += count
+        return count
+
+    def readable(self):
+        return True
+
+    def fileno(self):
+        self._checkClosed()
+        return self._sock.fileno()
+
+    def tell(self):
+        # the number of bytes received so far; BufferedReader.tell() subtracts what it has buffered
+        return self._received
+
+    def close(self):
+        if not self.closed:
+            RawIOBase.close(self)
+            self._sock = None
+
+
+class CorkedWriter(object):
+    """Collect small writes to a socket and send them together.
+
+    The data passed to :meth:`write` is sent with a single ``sendall`` at the end of the current
+    iteration of the event loop, or right away once *threshold* bytes are buffered, or when
+    :meth:`flush` is called. Protocols that issue many small writes per request then make one
+    system call instead of one per write.
+
+    The sending done at the end of the iteration happens in a separate greenlet; if it fails,
+    the error is raised by the next call to :meth:`write`, :meth:`flush` or :meth:`close`.
+    If the writer is garbage collected with such an error still pending, the error is reported
+    to the hub with :meth:`Hub.handle_error <gevent.hub.Hub.handle_error>`.
+    """
+
+    def __init__(self, sock, threshold=65536):
+        from gevent.lock import Semaphore
+        self.sock = sock
+        self.threshold = threshold
+        self._buffer = []
+        self._size = 0
+        self._scheduled = False
+        self._error = None
+        self.closed = False
+        # held while sending, to keep the data in order
+        self._lock = Semaphore()
+
+    def __del__(self):
+        error = self._error
+        if error is not None:
+            self._error = None
+            get_hub().handle_error(self, type(error), error, None)
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError('I/O operation on closed writer')
+        if self._error is not None:
+            self._raise_error()
+        self._buffer.append(data)
+        self._size += len(data)
+        if self._size >= self.threshold:
+            self.flush()
+        elif not self._scheduled:
+            self._scheduled = True
+            spawn_raw(self._flush_later)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        """Send all the buffered data, blocking the current greenlet until it's sent."""
+        self._lock.acquire()
+        try:
+            if self._error is not None:
+                self._raise_error()
+            while self._buffer:
+                data = ''.join(self._buffer)
+                self._buffer = []
+                self._size = 0
+                self.sock.sendall(data)
+        finally:
+            self._lock.release()
+
+    def close(self):
+        """Send the buffered data and raise the error of an earlier sending, if any.
+
+        The socket is left open."""
+        if not self.closed:
+            self.closed = True
+            self.flush()
+
+    def _flush_later(self):
+        self._scheduled = False
+        try:
+            self.flush()
+        except:
+            if self._error is None:
+                self._error = sys.exc_info()[1]
+
+    def _raise_error(self):
+        error = self._error
+        self._error = None
+        raise error
+
+
 def create_connection(address, timeout=_GLOBAL_DEFAULT_TIMEOUT, source_address=None):
     """Connect to *address* and return the socket object.
 
@@ -665,15 +836,13 @@ def getfqdn(name=''):
     return name
 
 
-try:
-    from gevent.ssl import sslwrap_simple as ssl, SSLError as sslerror, SSLSocket as SSLType
-    _have_ssl = True
-except ImportError:
-    _have_ssl = False
-
-
-if sys.version_info[:2] <= (2, 5) and _have_ssl:
-    __implements__.extend(['ssl', 'sslerror', 'SSLType'])
+if sys.version_info[:2] <= (2, 5):
+    # only these versions have socket.ssl; do not pay for importing gevent.ssl otherwise
+    try:
+        from gevent.ssl import sslwrap_simple as ssl, SSLError as sslerror, SSLSocket as SSLType
+        __implements__.extend(['ssl', 'sslerror', 'SSLType'])
+    except ImportError:
+        pass
 
 
 __all__ = __implements__ + __extensions__ + __imports__
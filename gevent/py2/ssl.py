@@ -20,9 +20,9 @@ except AttributeError:
 
 import sys
 import errno
-from gevent.socket import socket, _fileobject, timeout_default
+from gevent.socket import socket, _fileobject, timeout_default, _get_memory
 from gevent.socket import error as socket_error, EBADF
-from gevent.hub import string_types
+from gevent.hub import string_types, get_hub
 
 
 __implements__ = ['SSLSocket',
@@ -58,14 +58,23 @@ del name, value
 __all__ = __implements__ + __imports__
 
 
+# Since 2.7.9 _ssl reads straight into a caller's buffer
+_read_into = hasattr(_ssl, '_SSLContext')
+
+
 class SSLSocket(socket):
 
+    # The size of the reads done by read() and of the buffers of makefile() when not specified.
+    # A TLS record holds up to 16KB, so reading less than that splits a decrypted record
+    # between several calls.
+    default_bufsize = 16384
+
     def __init__(self, sock, keyfile=None, certfile=None,
                  server_side=False, cert_reqs=CERT_NONE,
                  ssl_version=PROTOCOL_SSLv23, ca_certs=None,
                  do_handshake_on_connect=True,
                  suppress_ragged_eofs=True,
-                 ciphers=None):
+                 ciphers=None, _context=None):
         socket.__init__(self, _sock=sock)
 
         if certfile and not keyfile:
@@ -80,7 +89,9 @@ class SSLSocket(socket):
             self._sslobj = None
         else:
             # yes, create the SSL object
-            if ciphers is None:
+            if _context is not None:
+                self._sslobj = _context._wrap_socket(self._sock, server_side)
+            elif ciphers is None:
                 self._sslobj = _ssl.sslwrap(self._sock, server_side,
                                             keyfile, certfile,
                                             cert_reqs, ssl_version, ca_certs)
@@ -101,16 +112,28 @@ class SSLSocket(socket):
         self.suppress_ragged_eofs = suppress_ragged_eofs
         self._makefile_refs = 0
 
-    def read(self, len=1024):
+    def read(self, len=None, buffer=None):
         """Read up to LEN bytes and return them.
-        Return zero-length string on EOF."""
+        Return zero-length string on EOF.
+
+        If *buffer* is given, the data is read into it and the number of bytes read is returned."""
+        if len is None:
+            len = self.default_bufsize
+        if buffer is not None and not _read_into:
+            # _ssl of Python older than 2.7.9 cannot read into a buffer
+            data = self.read(len)
+            count = data.__len__()  # len is the argument here
+            buffer[:count] = data
+            return count
         while True:
             try:
-                return self._sslobj.read(len)
+                if buffer is None:
+                    return self._sslobj.read(len)
+                return self._sslobj.read(len, buffer)
             except SSLError:
                 ex = sys.exc_info()[1]
                 if ex.args[0] == SSL_ERROR_EOF and self.suppress_ragged_eofs:
-                    return ''
+                    return '' if buffer is None else 0
                 elif ex.args[0] == SSL_ERROR_WANT_READ:
                     if self.timeout == 0.0:
                         raise
@@ -120,7 +143,7 @@ class SSLSocket(socket):
                     except socket_error:
                         ex = sys.exc_info()[1]
                         if ex.args[0] == EBADF:
-                            return ''
+                            return '' if buffer is None else 0
                         raise
                 elif ex.args[0] == SSL_ERROR_WANT_WRITE:
                     if self.timeout == 0.0:
@@ -132,7 +155,7 @@ class SSLSocket(socket):
                     except socket_error:
                         ex = sys.exc_info()[1]
                         if ex.args[0] == EBADF:
-                            return ''
+                            return '' if buffer is None else 0
                         raise
                 else:
                     raise
@@ -226,6 +249,29 @@ class SSLSocket(socket):
             return socket.send(self, data, flags, timeout)
     # is it possible for sendall() to send some data without encryption if another end shut down SSL?
 
+    def sendall(self, data, flags=0):
+        if not self._sslobj or self.timeout is not None:
+            # socket.sendall() keeps track of the total timeout
+            return socket.sendall(self, data, flags)
+        if flags != 0:
+            raise ValueError(
+                "non-zero flags not allowed in calls to sendall() on %s" %
+                self.__class__)
+        if isinstance(data, unicode):
+            data = data.encode()
+        # _ssl does not enable partial writes, so write() waits through WANT_WRITE until
+        # every record is out, instead of slicing the data for each send()
+        data_sent = 0
+        length = len(data)
+        while data_sent < length:
+            if data_sent:
+                sent = self.write(_get_memory(data, data_sent))
+            else:
+                sent = self.write(data)
+            if not sent:
+                raise socket_error(EBADF, 'Bad file descriptor')
+            data_sent += sent
+
     def sendto(self, *args):
         if self._sslobj:
             raise ValueError("sendto not allowed on instances of %s" %
@@ -254,28 +300,7 @@ class SSLSocket(socket):
                 raise ValueError(
                   "non-zero flags not allowed in calls to recv_into() on %s" %
                   self.__class__)
-            while True:
-                try:
-                    tmp_buffer = self.read(nbytes)
-                    v = len(tmp_buffer)
-                    buffer[:v] = tmp_buffer
-                    return v
-                except SSLError:
-                    x = sys.exc_info()[1]
-                    if x.args[0] == SSL_ERROR_WANT_READ:
-                        sys.exc_clear()
-                        if self.timeout == 0.0:
-                            raise
-                        try:
-                            self._wait(self._read_event)
-                        except socket_error:
-                            ex = sys.exc_info()[1]
-                            if ex.args[0] == EBADF:
-                                return 0
-                            raise
-                        continue
-                    else:
-                        raise
+            return self.read(nbytes, buffer)
         else:
             return socket.recv_into(self, buffer, nbytes, flags)
 
@@ -371,6 +396,34 @@ class SSLSocket(socket):
                 else:
                     raise
 
+    def do_handshake_in_threadpool(self, threadpool=None):
+        """Perform a TLS/SSL handshake, running the OpenSSL calls in *threadpool*.
+
+        OpenSSL releases the GIL during the handshake, so the key exchange and the signing
+        happen in a worker thread while the hub keeps serving other connections. Waiting for
+        the peer is still done cooperatively in the current greenlet. The default *threadpool*
+        is the hub's.
+        """
+        if threadpool is None:
+            threadpool = get_hub().threadpool
+        while True:
+            try:
+                return threadpool.apply_e(SSLError, self._sslobj.do_handshake)
+            except SSLError:
+                ex = sys.exc_info()[1]
+                if ex.args[0] == SSL_ERROR_WANT_READ:
+                    if self.timeout == 0.0:
+                        raise
+                    sys.exc_clear()
+                    self._wait(self._read_event, timeout_exc=_SSLErrorHandshakeTimeout)
+                elif ex.args[0] == SSL_ERROR_WANT_WRITE:
+                    if self.timeout == 0.0:
+                        raise
+                    sys.exc_clear()
+                    self._wait(self._write_event, timeout_exc=_SSLErrorHandshakeTimeout)
+                else:
+                    raise
+
     def connect(self, addr):
         """Connects to remote ADDR, and then wraps the connection in
         an SSL channel."""
@@ -412,6 +465,8 @@ class SSLSocket(socket):
         works with the SSL connection.  Just use the code
         from the socket module."""
         self._makefile_refs += 1
+        if bufsize < 0:
+            bufsize = self.default_bufsize
         # close=True so as to decrement the reference count when done with
         # the file-like object.
         return _fileobject(self, mode, bufsize, close=True)
@@ -436,6 +491,30 @@ def wrap_socket(sock, keyfile=None, certfile=None,
                      ciphers=ciphers)
 
 
+def _create_server_context(keyfile=None, certfile=None, cert_reqs=CERT_NONE,
+                           ssl_version=PROTOCOL_SSLv23, ca_certs=None, ciphers=None):
+    """Create an SSL context to be shared by the server side of many connections.
+
+    OpenSSL keeps the session cache and the session ticket keys in the context, so the
+    connections wrapped with the same context (``SSLSocket(..., _context=context)``) can
+    resume each other's sessions instead of doing a full handshake. ``_ssl.sslwrap`` creates
+    a new context for every socket, which makes resumption impossible.
+
+    Requires :class:`ssl.SSLContext` (Python 2.7.9 and newer).
+    """
+    if certfile and not keyfile:
+        keyfile = certfile
+    context = __ssl__.SSLContext(ssl_version)
+    if ciphers:
+        context.set_ciphers(ciphers)
+    if certfile:
+        context.load_cert_chain(certfile, keyfile)
+    context.verify_mode = cert_reqs
+    if ca_certs:
+        context.load_verify_locations(ca_certs)
+    return context
+
+
 def get_server_certificate(addr, ssl_version=PROTOCOL_SSLv3, ca_certs=None):
     """Retrieve the certificate from the server at the specified address,
     and return it as a PEM-encoded string.
@@ -10,12 +10,14 @@ try:
 except ImportError:
     import email.message as mime
 from datetime import datetime
+from io import BufferedReader
 try:
     from urllib import unquote
 except ImportError:
     from urllib.parse import unquote
 
 from gevent import socket
+from gevent.socket import SocketIO
 import gevent
 from gevent.server import StreamServer
 from gevent.hub import GreenletExit, exc_clear
@@ -172,17 +174,23 @@ class Input(object):
 class WSGIHandler(object):
     protocol_version = 'HTTP/1.1'
     MessageClass = mime.Message
+    # the size of the read buffer of the connection
+    rbufsize = 8192
 
     def __init__(self, socket, address, server, rfile=None):
         self.socket = socket
         self.client_address = address
         self.server = server
         if rfile is None:
-            self.rfile = socket.makefile('rb', -1)
+            if hasattr(socket, 'recv_into'):
+                self.rfile = BufferedReader(SocketIO(socket), self.rbufsize)
+            else:
+                self.rfile = socket.makefile('rb', -1)
         else:
             self.rfile = rfile
 
     def handle(self):
+        parked = False
         try:
             while self.socket is not None:
                 self.time_start = time.time()
@@ -191,6 +199,11 @@ class WSGIHandler(object):
                 if result is None:
                     break
                 if result is True:
+                    if getattr(self.server, 'park_idle', False) and self._can_park():
+                        # wait for the next request without holding on to this greenlet
+                        self.server.park(self.socket, self.handle)
+                        parked = True
+                        return
                     continue
                 self.status, response_body = result
                 self.socket.sendall(response_body)
@@ -199,15 +212,34 @@ class WSGIHandler(object):
                 self.log_request()
                 break
         finally:
-            if self.socket is not None:
-                try:
-                    if hasattr(self.socket, '_sock'):
-                        self.socket._sock.close()  # do not rely on garbage collection
-                    self.socket.close()
-                except socket.error:
-                    pass
-            self.__dict__.pop('socket', None)
-            self.__dict__.pop('rfile', None)
+            if not parked:
+                if self.socket is not None:
+                    try:
+                        if hasattr(self.socket, '_sock'):
+                            self.socket._sock.close()  # do not rely on garbage collection
+                        self.socket.close()
+                    except socket.error:
+                        pass
+                self.__dict__.pop('socket', None)
+                self.__dict__.pop('rfile', None)
+
+    def _can_park(self):
+        # only park when nothing of the next request has been read into our buffers yet
+        rfile = self.rfile
+        if isinstance(rfile, BufferedReader):
+            if rfile.raw.tell() != rfile.tell():
+                return False
+        else:
+            rbuf = getattr(rfile, '_rbuf', None)
+            if rbuf is None or not hasattr(rbuf, 'tell'):
+                return False
+            rbuf.seek(0, 2)
+            if rbuf.tell():
+                return False
+        pending = getattr(self.socket, 'pending', None)
+        if pending is not None and pending():
+            return False
+        return True
 
     def _check_http_version(self):
         version = self.request_version
@@ -524,9 +556,14 @@ class WSGIHandler(object):
 
 
 class WSGIServer(StreamServer):
-    """A WSGI server based on :class:`StreamServer` that supports HTTPS."""
+    """A WSGI server based on :class:`StreamServer` that supports HTTPS.
+
+    If :attr:`park_idle` is true, keep-alive connections waiting for their next request are
+    parked with :meth:`StreamServer.park` instead of keeping a greenlet blocked on each of them.
+    """
 
     handler_class = WSGIHandler
+    park_idle = False
     base_env = {'GATEWAY_INTERFACE': 'CGI/1.1',
                 'SERVER_SOFTWARE': 'gevent/%d.%d Python/%d.%d' % (gevent.version_info[:2] + sys.version_info[:2]),
                 'SCRIPT_NAME': '',
@@ -558,6 +595,8 @@ class WSGIServer(StreamServer):
             self.environ['wsgi.url_scheme'] = 'https'
         else:
             self.environ['wsgi.url_scheme'] = 'http'
+        if self.threads:
+            self.environ['wsgi.multithread'] = True
         if environ_update is not None:
             self.environ.update(environ_update)
         if self.environ.get('wsgi.errors') is None:
@@ -33,11 +33,67 @@ else:
 
 from gevent.timeout import Timeout
 from gevent.hub import get_hub, Waiter, getcurrent, PY3
+from gevent._threading import Lock, get_ident
 if PY3:
     xrange = range
 
 
-__all__ = ['Queue', 'PriorityQueue', 'LifoQueue', 'JoinableQueue', 'Channel']
+__all__ = ['Queue', 'PriorityQueue', 'LifoQueue', 'JoinableQueue', 'ThreadSafeQueue', 'Channel']
+
+
+class _Waiters(collections.deque):
+    """FIFO of the greenlets blocked on a queue.
+
+    Waiters are woken up in the order they started waiting. A waiter that gives up
+    (because of a timeout or an exception) is not searched for; it is left in place as
+    a tombstone, skipped by :meth:`popleft` and dropped in bulk once tombstones make up
+    half of the deque. The length and the truth value only count the live waiters.
+
+    The waiters are :class:`_Waiter` instances, so that :meth:`discard` knows which of them
+    :meth:`popleft` has already removed.
+    """
+
+    __slots__ = ['abandoned']
+
+    def __init__(self):
+        collections.deque.__init__(self)
+        self.abandoned = 0
+
+    def __len__(self):
+        return collections.deque.__len__(self) - self.abandoned
+
+    def popleft(self):
+        """Remove and return the waiter that has been waiting the longest."""
+        while True:
+            waiter = collections.deque.popleft(self)
+            # a waiter that is still blocked in get() always has its greenlet set
+            if waiter.greenlet is not None:
+                waiter.popped = True
+                return waiter
+            self.abandoned -= 1
+
+    def discard(self, waiter):
+        """Forget *waiter* that stopped waiting without being woken up."""
+        if waiter.popped:
+            # woken up, or about to be, but it failed or timed out before it ran
+            return
+        if collections.deque.__len__(self) and self[-1] is waiter:
+            collections.deque.pop(self)
+            return
+        self.abandoned += 1
+        if self.abandoned * 2 > collections.deque.__len__(self):
+            alive = [x for x in collections.deque.__iter__(self) if x.greenlet is not None]
+            self.clear()
+            self.extend(alive)
+            self.abandoned = 0
+
+
+class _Waiter(Waiter):
+    __slots__ = ['popped']
+
+    def __init__(self):
+        Waiter.__init__(self)
+        self.popped = False
 
 
 class Queue(object):
@@ -59,8 +115,8 @@ class Queue(object):
                               DeprecationWarning, stacklevel=2)
         else:
             self.maxsize = maxsize
-        self.getters = set()
-        self.putters = set()
+        self.getters = _Waiters()
+        self.putters = _Waiters()
         self.hub = get_hub()
         self._event_unlock = self.hub.loop.callback()
         self._init(maxsize)
@@ -130,7 +186,7 @@ class Queue(object):
             # We're in the mainloop, so we cannot wait; we can switch() to other greenlets though.
             # Check if possible to get a free slot in the queue.
             while self.getters and self.qsize() and self.qsize() >= self.maxsize:
-                getter = self.getters.pop()
+                getter = self.getters.popleft()
                 getter.switch(getter)
             if self.qsize() < self.maxsize:
                 self._put(item)
@@ -138,16 +194,18 @@ class Queue(object):
             raise Full
         elif block:
             waiter = ItemWaiter(item, self)
-            self.putters.add(waiter)
+            self.putters.append(waiter)
             timeout = Timeout.start_new(timeout, Full)
             try:
                 if self.getters:
                     self._schedule_unlock()
                 result = waiter.get()
-                assert result is waiter, "Invalid switch into Queue.put: %r" % (result, )
+            except:
+                self.putters.discard(waiter)
+                raise
             finally:
                 timeout.cancel()
-                self.putters.discard(waiter)
+            assert result is waiter, "Invalid switch into Queue.put: %r" % (result, )
         else:
             raise Full
 
@@ -169,7 +227,8 @@ class Queue(object):
         an item if one is immediately available, else raise the :class:`Empty` exception
         (*timeout* is ignored in that case).
         """
-        if self.qsize():
+        if self.qsize() and (not block or self.hub is getcurrent() or self.qsize() > len(self.getters)):
+            # take an item right away unless that would overtake the greenlets already waiting for it
             if self.putters:
                 self._schedule_unlock()
             return self._get()
@@ -177,23 +236,25 @@ class Queue(object):
             # special case to make get_nowait() runnable in the mainloop greenlet
             # there are no items in the queue; try to fix the situation by unlocking putters
             while self.putters:
-                self.putters.pop().put_and_switch()
+                self.putters.popleft().put_and_switch()
                 if self.qsize():
                     return self._get()
             raise Empty
         elif block:
-            waiter = Waiter()
+            waiter = _Waiter()
+            self.getters.append(waiter)
             timeout = Timeout.start_new(timeout, Empty)
             try:
-                self.getters.add(waiter)
-                if self.putters:
+                if self.putters or self.qsize():
                     self._schedule_unlock()
                 result = waiter.get()
-                assert result is waiter, 'Invalid switch into Queue.get: %r' % (result, )
-                return self._get()
-            finally:
+            except:
                 self.getters.discard(waiter)
+                raise
+            finally:
                 timeout.cancel()
+            assert result is waiter, 'Invalid switch into Queue.get: %r' % (result, )
+            return self._get()
         else:
             raise Empty
 
@@ -221,23 +282,25 @@ class Queue(object):
             # special case to make peek(False) runnable in the mainloop greenlet
             # there are no items in the queue; try to fix the situation by unlocking putters
             while self.putters:
-                self.putters.pop().put_and_switch()
+                self.putters.popleft().put_and_switch()
                 if self.qsize():
                     return self._peek()
             raise Empty
         elif block:
-            waiter = Waiter()
+            waiter = _Waiter()
+            self.getters.append(waiter)
             timeout = Timeout.start_new(timeout, Empty)
             try:
-                self.getters.add(waiter)
                 if self.putters:
                     self._schedule_unlock()
                 result = waiter.get()
-                assert result is waiter, 'Invalid switch into Queue.peek: %r' % (result, )
-                return self._peek()
-            finally:
+            except:
                 self.getters.discard(waiter)
+                raise
+            finally:
                 timeout.cancel()
+            assert result is waiter, 'Invalid switch into Queue.peek: %r' % (result, )
+            return self._peek()
         else:
             raise Empty
 
@@ -250,7 +313,7 @@ class Queue(object):
             if self.putters and (self.maxsize is None or self.qsize() < self.maxsize):
                 repeat = True
                 try:
-                    putter = self.putters.pop()
+                    putter = self.putters.popleft()
                     self._put(putter.item)
                 except:
                     putter.throw(*sys.exc_info())
@@ -258,7 +321,7 @@ class Queue(object):
                     putter.switch(putter)
             if self.getters and self.qsize():
                 repeat = True
-                getter = self.getters.pop()
+                getter = self.getters.popleft()
                 getter.switch(getter)
             if not repeat:
                 return
@@ -280,11 +343,11 @@ class Queue(object):
         return result
 
 
-class ItemWaiter(Waiter):
+class ItemWaiter(_Waiter):
     __slots__ = ['item', 'queue']
 
     def __init__(self, item, queue):
-        Waiter.__init__(self)
+        _Waiter.__init__(self)
         self.item = item
         self.queue = queue
 
@@ -373,11 +436,94 @@ class JoinableQueue(Queue):
         self._cond.wait()
 
 
+class ThreadSafeQueue(Queue):
+    """A :class:`Queue` that other OS threads can put items into.
+
+    :meth:`put` may be called from any thread. Items put from a thread other than the one
+    that created the queue are buffered and handed over to the hub in a batch by a single
+    ``async`` watcher, so any number of puts between two loop iterations wake the hub once.
+    :meth:`get`, :meth:`peek` and iteration must only be used by the greenlets of the thread
+    that created the queue.
+
+    The queue is unbounded, because a foreign thread cannot be blocked cooperatively.
+
+    The ``async`` watcher stays started, and keeps the queue alive, until :meth:`close` is called.
+    """
+
+    def __init__(self):
+        Queue.__init__(self)
+        self._ident = get_ident()
+        self._lock = Lock()
+        self._pending = []
+        self._closed = False
+        # only holds the loop while there are greenlets waiting in get()
+        self._async = self.hub.loop.async(ref=False)
+        self._async.start(self._on_async)
+
+    def put(self, item, block=True, timeout=None):
+        """Put an item into the queue. Never blocks."""
+        if get_ident() == self._ident:
+            return Queue.put(self, item)
+        self._lock.acquire()
+        try:
+            if self._closed:
+                raise ValueError('put() from another thread into a closed %s' % type(self).__name__)
+            self._pending.append(item)
+            if len(self._pending) == 1:
+                self._async.send()
+        finally:
+            self._lock.release()
+
+    def close(self):
+        """Stop accepting items from other threads and release the ``async`` watcher.
+
+        The items already put can still be got. Must be called in the thread that created the queue.
+        """
+        self._lock.acquire()
+        try:
+            self._closed = True
+            items = self._pending
+            self._pending = []
+            self._async.stop()
+        finally:
+            self._lock.release()
+        for item in items:
+            self._put(item)
+        if self.getters and self.qsize():
+            self._schedule_unlock()
+
+    def get(self, block=True, timeout=None):
+        self._async.ref = True
+        try:
+            return Queue.get(self, block, timeout)
+        finally:
+            self._async.ref = bool(self.getters)
+
+    def peek(self, block=True, timeout=None):
+        self._async.ref = True
+        try:
+            return Queue.peek(self, block, timeout)
+        finally:
+            self._async.ref = bool(self.getters)
+
+    def _on_async(self):
+        self._lock.acquire()
+        try:
+            items = self._pending
+            self._pending = []
+        finally:
+            self._lock.release()
+        for item in items:
+            self._put(item)
+        if self.getters:
+            self._unlock()
+
+
 class Channel(object):
 
     def __init__(self):
-        self.getters = collections.deque()
-        self.putters = collections.deque()
+        self.getters = _Waiters()
+        self.putters = _Waiters()
         self.hub = get_hub()
         self._event_unlock = self.hub.loop.callback()
 
@@ -419,26 +565,19 @@ class Channel(object):
         if not block:
             timeout = 0
 
-        waiter = Waiter()
-        item = (item, waiter)
-        self.putters.append(item)
+        waiter = ItemWaiter(item, self)
+        self.putters.append(waiter)
         timeout = Timeout.start_new(timeout, Full)
         try:
             if self.getters:
                 self._schedule_unlock()
             result = waiter.get()
-            assert result is waiter, "Invalid switch into Channel.put: %r" % (result, )
         except:
-            self._discard(item)
+            self.putters.discard(waiter)
             raise
         finally:
             timeout.cancel()
-
-    def _discard(self, item):
-        try:
-            self.putters.remove(item)
-        except ValueError:
-            pass
+        assert result is waiter, "Invalid switch into Channel.put: %r" % (result, )
 
     def put_nowait(self, item):
         self.put(item, False)
@@ -446,22 +585,22 @@ class Channel(object):
     def get(self, block=True, timeout=None):
         if self.hub is getcurrent():
             if self.putters:
-                item, putter = self.putters.popleft()
+                putter = self.putters.popleft()
                 self.hub.loop.run_callback(putter.switch, putter)
-                return item
+                return putter.item
 
         if not block:
             timeout = 0
 
-        waiter = Waiter()
+        waiter = _Waiter()
+        self.getters.append(waiter)
         timeout = Timeout.start_new(timeout, Empty)
         try:
-            self.getters.append(waiter)
             if self.putters:
                 self._schedule_unlock()
             return waiter.get()
         except:
-            self.getters.remove(waiter)
+            self.getters.discard(waiter)
             raise
         finally:
             timeout.cancel()
@@ -472,8 +611,8 @@ class Channel(object):
     def _unlock(self):
         while self.putters and self.getters:
             getter = self.getters.popleft()
-            item, putter = self.putters.popleft()
-            getter.switch(item)
+            putter = self.putters.popleft()
+            getter.switch(putter.item)
             putter.switch(putter)
 
     def _schedule_unlock(self):
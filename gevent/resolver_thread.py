@@ -14,6 +14,7 @@ class Resolver(object):
         if hub is None:
             hub = get_hub()
         self.pool = hub.threadpool
+        self.inflight = 0
 
     def __repr__(self):
         return '<gevent.resolver_thread.Resolver at 0x%x pool=%r>' % (id(self), self.pool)
@@ -21,20 +22,27 @@ class Resolver(object):
     def close(self):
         pass
 
+    def _apply(self, function, args, kwargs=None):
+        self.inflight += 1
+        try:
+            return self.pool.apply_e(self.expected_errors, function, args, kwargs)
+        finally:
+            self.inflight -= 1
+
     # from briefly reading socketmodule.c, it seems that all of the functions
     # below are thread-safe in Python, even if they are not thread-safe in C.
 
     def gethostbyname(self, *args):
-        return self.pool.apply_e(self.expected_errors, _socket.gethostbyname, args)
+        return self._apply(_socket.gethostbyname, args)
 
     def gethostbyname_ex(self, *args):
-        return self.pool.apply_e(self.expected_errors, _socket.gethostbyname_ex, args)
+        return self._apply(_socket.gethostbyname_ex, args)
 
     def getaddrinfo(self, *args, **kwargs):
-        return self.pool.apply_e(self.expected_errors, _socket.getaddrinfo, args, kwargs)
+        return self._apply(_socket.getaddrinfo, args, kwargs)
 
     def gethostbyaddr(self, *args, **kwargs):
-        return self.pool.apply_e(self.expected_errors, _socket.gethostbyaddr, args, kwargs)
+        return self._apply(_socket.gethostbyaddr, args, kwargs)
 
     def getnameinfo(self, *args, **kwargs):
-        return self.pool.apply_e(self.expected_errors, _socket.getnameinfo, args, kwargs)
+        return self._apply(_socket.getnameinfo, args, kwargs)
@@ -1,8 +1,12 @@
 # Copyright (c) 2009-2011 Denis Bilenko. See LICENSE for details.
+from __future__ import absolute_import
 import sys
+import os
+import errno
 from gevent.timeout import Timeout
 from gevent.event import Event
 from gevent.hub import get_hub, integer_types
+from gevent.core import ERROR as EV_ERROR
 
 __implements__ = ['select']
 __all__ = ['error'] + __implements__
@@ -10,6 +14,20 @@ __all__ = ['error'] + __implements__
 __select__ = __import__('select')
 error = __select__.error
 
+POLLIN = getattr(__select__, 'POLLIN', 1)
+POLLPRI = getattr(__select__, 'POLLPRI', 2)
+POLLOUT = getattr(__select__, 'POLLOUT', 4)
+POLLERR = getattr(__select__, 'POLLERR', 8)
+POLLHUP = getattr(__select__, 'POLLHUP', 16)
+POLLNVAL = getattr(__select__, 'POLLNVAL', 32)
+
+# the real one, even after monkey patching; classifies the descriptors that poll.poll() found ready
+_original_poll = getattr(__select__, 'poll', None)
+
+if hasattr(__select__, 'poll'):
+    __implements__.append('poll')
+    __all__.append('poll')
+
 
 def get_fileno(obj):
     try:
@@ -72,3 +90,156 @@ def select(rlist, wlist, xlist, timeout=None):
         for watcher in watchers:
             watcher.stop()
         timeout.cancel()
+
+
+class PollResult(object):
+
+    __slots__ = ['events', 'event']
+
+    def __init__(self):
+        self.events = {}
+        self.event = Event()
+
+    def add_event(self, events, fd, eventmask):
+        result = 0
+        if events & EV_ERROR:
+            result |= POLLNVAL
+        if events & 1:
+            result |= POLLIN if eventmask & POLLIN else POLLPRI
+        if events & 2:
+            result |= POLLOUT
+        self.events[fd] = self.events.get(fd, 0) | result
+        self.event.set()
+
+
+class _PollState(object):
+    """The part of a :class:`poll` object that its io watchers call into.
+
+    The watchers do not reference the poll object itself, so dropping it stops them.
+    """
+
+    __slots__ = ['fds', 'result', 'stopped']
+
+    def __init__(self):
+        self.fds = {}  # {fd: (eventmask, watcher)}
+        self.result = None  # the PollResult of the current poll() call
+        self.stopped = set()  # the descriptors whose watchers poll() must start
+
+    def add_event(self, events, fd, eventmask):
+        if self.result is not None:
+            self.result.add_event(events, fd, eventmask)
+        else:
+            # nobody polls: the descriptor stays ready until it is used, so rather than being woken up
+            # by it on every loop iteration, stop watching it until the next poll()
+            self.fds[fd][1].stop()
+            self.stopped.add(fd)
+        if events & EV_ERROR:
+            # libev has stopped the watcher
+            self.stopped.add(fd)
+
+
+class poll(object):
+    """An implementation of :class:`select.poll` that blocks only the current greenlet.
+
+    Unlike :func:`select`, the io watchers are created by :meth:`register` and stay started
+    between :meth:`poll` calls, so a call only restarts the watchers of the descriptors that were
+    ready since the previous one. All the descriptors that became ready during the same loop
+    iteration are returned together. ``POLLHUP``, ``POLLERR`` and ``POLLNVAL`` are reported as
+    :func:`select.poll` reports them.
+
+    As with ``epoll``, a descriptor closed while its watcher is started might not be reported
+    at all, so unregister the descriptors before closing them.
+    """
+
+    def __init__(self):
+        self._state = _PollState()
+        self.fds = self._state.fds
+        self.loop = get_hub().loop
+
+    def register(self, fd, eventmask=POLLIN | POLLPRI | POLLOUT):
+        fd = get_fileno(fd)
+        self._stop(fd)
+        flags = 0
+        if eventmask & (POLLIN | POLLPRI):
+            flags |= 1
+        if eventmask & POLLOUT:
+            flags |= 2
+        watcher = None
+        if flags:
+            # the loop is kept running by poll() while it waits, not by the watchers
+            watcher = self.loop.io(fd, flags, ref=False)
+            watcher.priority = self.loop.MAXPRI
+            self._state.stopped.add(fd)
+        self.fds[fd] = (eventmask, watcher)
+
+    def modify(self, fd, eventmask):
+        fd = get_fileno(fd)
+        if fd not in self.fds:
+            raise IOError(errno.ENOENT, os.strerror(errno.ENOENT))
+        self.register(fd, eventmask)
+
+    def unregister(self, fd):
+        fd = get_fileno(fd)
+        if fd not in self.fds:
+            raise KeyError(fd)
+        self._stop(fd)
+
+    def _stop(self, fd):
+        item = self.fds.pop(fd, None)
+        if item is not None and item[1] is not None:
+            item[1].stop()
+        self._state.stopped.discard(fd)
+
+    def __del__(self):
+        for _eventmask, watcher in self.fds.values():
+            if watcher is not None:
+                watcher.stop()
+
+    def poll(self, timeout=None):
+        """Wait for at least one of the registered descriptors to become ready.
+
+        *timeout* is in milliseconds; ``None`` or a negative value means wait forever.
+        Returns a list of ``(fd, event)`` pairs.
+        """
+        state = self._state
+        if state.result is not None:
+            raise RuntimeError('concurrent poll() invocation')
+        if timeout is not None:
+            if timeout < 0:
+                timeout = None
+            else:
+                timeout = timeout / 1000.0
+        result = state.result = PollResult()
+        self.loop.ref()
+        timeout = Timeout.start_new(timeout)
+        try:
+            invalid = []
+            while state.stopped:
+                fd = state.stopped.pop()
+                eventmask, watcher = self.fds[fd]
+                try:
+                    watcher.start(state.add_event, fd, eventmask, pass_events=True)
+                except IOError:
+                    # e.g. the descriptor was closed; tried again by the next call, like the system poll does
+                    invalid.append(fd)
+            for fd in invalid:
+                state.stopped.add(fd)
+                result.add_event(EV_ERROR, fd, 0)
+            result.event.wait(timeout=timeout)
+            return self._classify(result.events)
+        finally:
+            state.result = None
+            self.loop.unref()
+            timeout.cancel()
+
+    def _classify(self, events):
+        # another greenlet might have unregistered some of the descriptors in the meantime
+        events = [(fd, mask) for (fd, mask) in events.items() if fd in self.fds]
+        # libev reports hangups and errors as readiness to read or write; ask the system about these few descriptors
+        if not events or _original_poll is None:
+            return events
+        system_poll = _original_poll()
+        for fd, _mask in events:
+            system_poll.register(fd, self.fds[fd][0])
+        revents = dict(system_poll.poll(0))
+        return [(fd, revents.get(fd, mask)) for (fd, mask) in events]
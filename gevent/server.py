@@ -1,13 +1,23 @@
 # Copyright (c) 2009-2012 Denis Bilenko. See LICENSE for details.
 """TCP/SSL server"""
 import sys
+import copy
 import _socket
+from functools import partial
+from itertools import cycle
 from gevent.baseserver import BaseServer
+from gevent.event import Event
+from gevent.greenlet import Greenlet
+from gevent.hub import get_hub, integer_types, exc_clear, PY3
 from gevent.socket import EWOULDBLOCK, socket
+if PY3:
+    xrange = range
 
 
 __all__ = ['StreamServer', 'DatagramServer']
 
+SO_REUSEPORT = getattr(_socket, 'SO_REUSEPORT', None)
+
 
 class StreamServer(BaseServer):
     """A generic TCP server. Accepts connections on a listening socket and spawns user-provided *handle*
@@ -25,6 +35,29 @@ class StreamServer(BaseServer):
     - do_handshake_on_connect
     - ciphers
 
+    Two more keyword arguments control how the TLS handshake is done:
+
+    - session_cache -- if true, all the connections share one SSL context, so that OpenSSL's
+      session cache and session tickets let returning clients skip the full handshake.
+      Requires :class:`ssl.SSLContext` (Python 2.7.9 and newer).
+    - handshake_in_threadpool -- if true, the handshake on connect runs its OpenSSL calls in
+      the hub's threadpool, so that a storm of new connections does not stall the established
+      ones. Has no effect if *do_handshake_on_connect* is false.
+
+    Two keyword arguments spread the connections over several OS threads, each running its own
+    hub and event loop. This only helps when the handlers spend their time in code that releases
+    the GIL (TLS, compression, C extensions):
+
+    - threads -- the number of threads that run the handlers. The connections are accepted in the
+      thread that started the server and handed over to the threads in turn, waking up their loops
+      with an ``async`` watcher. Each thread serves its connections with a copy of the server, so
+      *handle* is called in that thread and must not touch the objects of the other hubs. *spawn*
+      must be ``'default'`` or an integer, which limits the number of handlers of each thread; when
+      every thread is at the limit, the server stops accepting until a handler finishes.
+    - reuse_port -- if true, set ``SO_REUSEPORT`` on the listening socket. Together with *threads*,
+      each thread accepts the connections itself on its own listening socket bound to the same
+      address and the kernel balances the connections between them.
+
     Note that although the errors in a successfully spawned handler will not affect the server or other connections,
     the errors raised by :func:`accept` and *spawn* cause the server to stop accepting for a short amount of time. The
     exact period depends on the values of :attr:`min_delay` and :attr:`max_delay` attributes.
@@ -37,13 +70,57 @@ class StreamServer(BaseServer):
 
     reuse_addr = 1
 
-    def __init__(self, listener, handle=None, backlog=None, spawn='default', **ssl_args):
+    handshake_in_threadpool = False
+
+    reuse_port = False
+
+    # the number of threads with their own hub that run the handlers; 0 to run them in this hub
+    threads = 0
+
+    _thread_timeout = None
+    # with threads and an integer spawn: the connections each thread may handle at once
+    _thread_limit = None
+    _holding_channel = False
+
+    def __init__(self, listener, handle=None, backlog=None, spawn='default', threads=None, reuse_port=None, **ssl_args):
+        self._parked = {}
+        self._inboxes = []
+        self._running_threads = 0
+        if threads:
+            if not isinstance(threads, integer_types) or threads < 0:
+                raise ValueError('threads must be a positive integer: %r' % (threads, ))
+            if spawn != 'default' and not isinstance(spawn, integer_types):
+                raise TypeError("spawn must be 'default' or an integer when threads is used: %r" % (spawn, ))
+            self.threads = threads
+            self._thread_spawn = spawn
+            spawn = self._dispatch
         BaseServer.__init__(self, listener, handle=handle, spawn=spawn)
         try:
+            if reuse_port is not None:
+                if reuse_port and SO_REUSEPORT is None:
+                    raise ValueError('SO_REUSEPORT is not supported on this platform')
+                self.reuse_port = reuse_port
+            if self.threads and not self.reuse_port and self._thread_spawn != 'default':
+                # with reuse_port, each thread accepts by itself and its pool is the limit
+                self._thread_limit = self._thread_spawn
+            # these only tune SSL and do not enable it on their own
+            session_cache = ssl_args.pop('session_cache', False)
+            handshake_in_threadpool = ssl_args.pop('handshake_in_threadpool', False)
             if ssl_args:
                 ssl_args.setdefault('server_side', True)
-                from gevent.ssl import wrap_socket
-                self.wrap_socket = wrap_socket
+                if session_cache:
+                    if not hasattr(__import__('ssl'), 'SSLContext'):
+                        raise ValueError('session_cache requires ssl.SSLContext (Python 2.7.9 or newer)')
+                    from gevent.ssl import SSLSocket, _create_server_context
+                    context_args = ('keyfile', 'certfile', 'cert_reqs', 'ssl_version', 'ca_certs', 'ciphers')
+                    ssl_args['_context'] = _create_server_context(**dict((key, ssl_args[key]) for key in context_args if key in ssl_args))
+                    self.wrap_socket = SSLSocket
+                else:
+                    from gevent.ssl import wrap_socket
+                    self.wrap_socket = wrap_socket
+                if handshake_in_threadpool and ssl_args.get('do_handshake_on_connect', True):
+                    ssl_args['do_handshake_on_connect'] = False
+                    self.handshake_in_threadpool = True
                 self.ssl_args = ssl_args
             else:
                 self.ssl_args = None
@@ -68,18 +145,169 @@ class StreamServer(BaseServer):
 
     def init_socket(self):
         if not hasattr(self, 'socket'):
-            self.socket = self.get_listener(self.address, self.backlog, self.family)
+            self.socket = self.get_listener(self.address, self.backlog, self.family, self.reuse_port)
             self.address = self.socket.getsockname()
+        self._init_handle()
+
+    def _init_handle(self):
         if self.ssl_args:
             self._handle = self.wrap_socket_and_handle
         else:
             self._handle = self.handle
 
     @classmethod
-    def get_listener(self, address, backlog=None, family=None):
+    def get_listener(self, address, backlog=None, family=None, reuse_port=None):
         if backlog is None:
             backlog = self.backlog
-        return _tcp_listener(address, backlog=backlog, reuse_addr=self.reuse_addr, family=family)
+        if reuse_port is None:
+            reuse_port = self.reuse_port
+        return _tcp_listener(address, backlog=backlog, reuse_addr=self.reuse_addr, family=family, reuse_port=reuse_port)
+
+    def start(self):
+        if self.threads and not self._inboxes:
+            self.init_socket()
+            self._start_threads()
+        BaseServer.start(self)
+
+    def start_accepting(self):
+        # with reuse_port, the threads accept on their own listeners
+        if not (self.threads and self.reuse_port):
+            BaseServer.start_accepting(self)
+
+    def full(self):
+        # the accepting hub stops accepting once every thread handles _thread_limit connections
+        return self._thread_limit is not None and min(self._loads) >= self._thread_limit
+
+    def _dispatch(self, handle, client_socket, address):
+        # the spawn function of the accepting hub when threads is used; the socket is wrapped again in the target hub
+        index = self._next_index()
+        if self._thread_limit is not None:
+            # skip the threads that are busy; full() guarantees that one is not
+            while self._loads[index] >= self._thread_limit:
+                index = self._next_index()
+            self._loads[index] += 1
+        self._inboxes[index].put((getattr(client_socket, '_sock', client_socket), address))
+
+    def _handled(self, index):
+        # called in the accepting hub when a thread has finished with a connection
+        self._loads[index] -= 1
+        self._start_accepting_if_started()
+
+    def _start_threads(self):
+        from gevent._threading import start_new_thread
+        from gevent.queue import ThreadSafeQueue
+        ready = ThreadSafeQueue()
+        self._done = ThreadSafeQueue()
+        self._hub = get_hub()
+        self._loads = [0] * self.threads
+        for index in xrange(self.threads):
+            start_new_thread(self._serve_in_thread, (index, ready, self._done))
+            self._running_threads += 1
+        error = None
+        for _ in xrange(self.threads):
+            inbox = ready.get()
+            if isinstance(inbox, Exception):
+                error = inbox
+            else:
+                self._inboxes.append(inbox)
+        ready.close()
+        if error is not None:
+            self._stop_threads()
+            self._join_threads()
+            raise error
+        self._next_index = partial(next, cycle(xrange(self.threads)))
+        if self._thread_limit is not None:
+            # _handled() must be delivered even while the listener is stopped because the server is full
+            self._hub.channel.hold()
+            self._holding_channel = True
+
+    def _serve_in_thread(self, index, ready, done):
+        try:
+            hub = get_hub()
+            try:
+                try:
+                    from gevent.queue import ThreadSafeQueue
+                    server = self._copy_for_thread(index)
+                    inbox = ThreadSafeQueue()
+                    if self.reuse_port:
+                        server.start()
+                except Exception:
+                    ready.put(sys.exc_info()[1])
+                    return
+                ready.put(inbox)
+                try:
+                    for client_socket, address in inbox:
+                        try:
+                            server.do_handle(socket(_sock=client_socket), address)
+                        except:
+                            if self._thread_limit is not None:
+                                self._hub.channel.send(self._handled, index)
+                            hub.handle_error((address, server), *sys.exc_info())
+                    server.stop(self._thread_timeout)
+                finally:
+                    inbox.close()
+            finally:
+                hub.destroy()
+        finally:
+            done.put(index)
+
+    def _copy_for_thread(self, index):
+        """Return a copy of this server that serves the connections in the current thread's hub."""
+        from gevent.pool import Pool
+        server = copy.copy(self)
+        server.threads = 0
+        server._inboxes = []
+        server._running_threads = 0
+        server._holding_channel = False
+        server._parked = {}
+        server._stop_event = Event()
+        server._stop_event.set()
+        server._watcher = None
+        server._timer = None
+        server.delay = server.min_delay
+        server.loop = get_hub().loop
+        server.pool = None
+        spawn = self._thread_spawn
+        if spawn == 'default':
+            # a pool without a limit, so that stop() waits for the handlers before the hub is destroyed
+            spawn = Pool()
+        server.set_spawn(spawn)
+        server.__dict__.pop('socket', None)
+        if self.reuse_port:
+            if index == 0:
+                # the listener bound by this server is in the SO_REUSEPORT group too and must be served
+                listener = socket(_sock=getattr(self.socket, '_sock', self.socket).dup())
+                listener.setblocking(0)
+            else:
+                listener = self.get_listener(self.address, self.backlog, self.family, True)
+            server.socket = listener
+        server._init_handle()
+        if self._thread_limit is not None:
+            server._handle = partial(self._handle_in_thread, server._handle, index)
+        return server
+
+    def _handle_in_thread(self, handle, index, *args):
+        try:
+            return handle(*args)
+        finally:
+            self._hub.channel.send(self._handled, index)
+
+    def _stop_threads(self):
+        inboxes = self._inboxes
+        self._inboxes = []
+        if self._holding_channel:
+            self._holding_channel = False
+            self._hub.channel.release()
+        for inbox in inboxes:
+            inbox.put(StopIteration)
+
+    def _join_threads(self):
+        if not self._running_threads:
+            return
+        while self._running_threads:
+            self._done.get()
+            self._running_threads -= 1
+        self._done.close()
 
     def do_read(self):
         try:
@@ -93,15 +321,85 @@ class StreamServer(BaseServer):
     def wrap_socket_and_handle(self, client_socket, address):
         # used in case of ssl sockets
         ssl_socket = self.wrap_socket(client_socket, **self.ssl_args)
+        if self.handshake_in_threadpool:
+            ssl_socket.do_handshake_in_threadpool()
         return self.handle(ssl_socket, address)
 
+    def park(self, client_socket, handle, *args):
+        """Stop serving an idle connection until the client sends more data.
+
+        The connection is watched by a plain io watcher instead of a blocked greenlet, so it
+        costs no greenlet stack while idle. When *client_socket* becomes readable, ``handle(*args)``
+        is spawned the same way the server spawns its handlers. The caller must return right away
+        and must not close *client_socket*; the server closes parked connections in :meth:`close`.
+        """
+        watcher = self.loop.io(client_socket.fileno(), 1)
+        self._parked[watcher] = client_socket
+        watcher.start(self._unpark, watcher, handle, args)
+
+    def _unpark(self, watcher, handle, args):
+        watcher.stop()
+        self._parked.pop(watcher, None)
+        try:
+            spawn = self._spawn
+            if spawn is None:
+                handle(*args)
+            elif self.full():
+                # pool.spawn() blocks while the pool is full and we must not block the hub
+                Greenlet.spawn(spawn, handle, *args)
+            else:
+                spawn(handle, *args)
+        except:
+            self.loop.handle_error((handle, self), *sys.exc_info())
+
+    def close(self):
+        try:
+            BaseServer.close(self)
+        finally:
+            parked = self._parked
+            self._parked = {}
+            for watcher, client_socket in parked.items():
+                watcher.stop()
+                try:
+                    if hasattr(client_socket, '_sock'):
+                        client_socket._sock.close()
+                    client_socket.close()
+                except Exception:
+                    pass
+            self._stop_threads()
+
+    def stop(self, timeout=None):
+        """Stop the server like :meth:`BaseServer.stop`. If *threads* is used, also wait for the threads to exit."""
+        if timeout is None:
+            timeout = self.stop_timeout
+        self._thread_timeout = timeout
+        BaseServer.stop(self, timeout)
+        self._join_threads()
+
 
 class DatagramServer(BaseServer):
-    """A UDP server"""
+    """A UDP server
+
+    By default *handle* is spawned for each datagram with 2 arguments: the data and the client address.
+
+    If *batch_size* is set, the server reads up to that many datagrams each time the socket becomes
+    readable and spawns *handle* once per batch, with a single argument: a list of ``(data, address)``
+    pairs. This saves a greenlet per datagram for high-rate services.
+    """
 
     reuse_addr = 1
 
+    # the largest datagram that is read from the socket
+    recv_size = 8192
+
+    batch_size = None
+
     def __init__(self, *args, **kwargs):
+        batch_size = kwargs.pop('batch_size', None)
+        if batch_size is not None:
+            if batch_size < 1:
+                raise ValueError('batch_size must be positive int: %r' % (batch_size, ))
+            self.batch_size = batch_size
         BaseServer.__init__(self, *args, **kwargs)
         from gevent.lock import Semaphore
         self._writelock = Semaphore()
@@ -121,27 +419,68 @@ class DatagramServer(BaseServer):
         return _udp_socket(address, reuse_addr=self.reuse_addr, family=family)
 
     def do_read(self):
+        if self.batch_size:
+            return self._read_batch()
         try:
-            data, address = self._socket.recvfrom(8192)
+            data, address = self._socket.recvfrom(self.recv_size)
         except _socket.error:
-            if sys.exc_info()[0] == EWOULDBLOCK:
+            if sys.exc_info()[1].args[0] == EWOULDBLOCK:
                 return
             raise
         return data, address
 
+    def _read_batch(self):
+        batch = []
+        recvfrom = self._socket.recvfrom
+        recv_size = self.recv_size
+        try:
+            for _ in xrange(self.batch_size):
+                batch.append(recvfrom(recv_size))
+        except _socket.error:
+            if sys.exc_info()[1].args[0] != EWOULDBLOCK:
+                if not batch:
+                    raise
+                # some errors, like ECONNREFUSED caused by an earlier sendto(), are only raised once
+                self.loop.handle_error(self, *sys.exc_info())
+            exc_clear()
+            if not batch:
+                return
+        return (batch, )
+
     def sendto(self, *args):
+        if not self._writelock.locked():
+            # nobody is waiting for the socket to become writable, so try sending right away
+            try:
+                self._socket.sendto(*args)
+                return
+            except _socket.error:
+                if sys.exc_info()[1].args[0] != EWOULDBLOCK:
+                    raise
+                exc_clear()
         self._writelock.acquire()
         try:
             self.socket.sendto(*args)
         finally:
             self._writelock.release()
 
+    def sendto_many(self, datagrams):
+        """Send each ``(data, address)`` pair of *datagrams*, taking the write lock once."""
+        self._writelock.acquire()
+        try:
+            sendto = self.socket.sendto
+            for data, address in datagrams:
+                sendto(data, address)
+        finally:
+            self._writelock.release()
+
 
-def _tcp_listener(address, backlog=50, reuse_addr=None, family=_socket.AF_INET):
+def _tcp_listener(address, backlog=50, reuse_addr=None, family=_socket.AF_INET, reuse_port=False):
     """A shortcut to create a TCP socket, bind it and put it into listening state."""
     sock = socket(family=family)
     if reuse_addr is not None:
         sock.setsockopt(_socket.SOL_SOCKET, _socket.SO_REUSEADDR, reuse_addr)
+    if reuse_port:
+        sock.setsockopt(_socket.SOL_SOCKET, SO_REUSEPORT, 1)
     try:
         sock.bind(address)
     except _socket.error:
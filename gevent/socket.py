@@ -0,0 +1,16 @@
+# Copyright (c) 2009-2012 Denis Bilenko. See LICENSE for details.
+"""Cooperative :mod:`socket` module.
+
+The implementation lives in gevent.py2.socket or gevent.py3.socket; this module replaces itself
+in :data:`sys.modules` with the one matching the running Python, so that it is only imported
+by the programs that use it rather than by import gevent.
+"""
+import sys
+from gevent.hub import PY3
+
+if PY3:
+    from gevent.py3 import socket as _socket
+else:
+    from gevent.py2 import socket as _socket
+
+sys.modules[__name__] = _socket
@@ -0,0 +1,16 @@
+# Copyright (c) 2009-2012 Denis Bilenko. See LICENSE for details.
+"""Cooperative :mod:`ssl` module.
+
+The implementation lives in gevent.py2.ssl or gevent.py3.ssl; this module replaces itself
+in :data:`sys.modules` with the one matching the running Python, so that it is only imported
+by the programs that use it rather than by import gevent.
+"""
+import sys
+from gevent.hub import PY3
+
+if PY3:
+    from gevent.py3 import ssl as _ssl
+else:
+    from gevent.py2 import ssl as _ssl
+
+sys.modules[__name__] = _ssl
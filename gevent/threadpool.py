@@ -1,5 +1,5 @@
 # Copyright (c) 2012 Denis Bilenko. See LICENSE for details.
-from __future__ import with_statement
+from __future__ import with_statement, absolute_import
 import sys
 import os
 from gevent.hub import get_hub, sleep, integer_types
@@ -140,6 +140,9 @@ class ThreadPool(object):
             raise
 
     def spawn(self, func, *args, **kwargs):
+        if self.pid != os.getpid():
+            # forked, but the fork watcher has not run yet: the tasks queued now would never be picked up
+            self._on_fork()
         while True:
             semaphore = self._semaphore
             semaphore.acquire()
@@ -253,14 +256,18 @@ class ThreadPool(object):
         """
         return Greenlet.spawn(self.map_cb, func, iterable, callback)
 
-    def imap(self, func, iterable):
-        """An equivalent of itertools.imap()"""
-        return IMap.spawn(func, iterable, spawn=self.spawn)
+    def imap(self, func, iterable, maxsize=None):
+        """An equivalent of itertools.imap()
 
-    def imap_unordered(self, func, iterable):
+        If *maxsize* is given, at most that many items are being processed or waiting
+        to be consumed at any time; reading from *iterable* pauses until the consumer catches up.
+        """
+        return IMap.spawn(func, iterable, spawn=self.spawn, maxsize=maxsize)
+
+    def imap_unordered(self, func, iterable, maxsize=None):
         """The same as imap() except that the ordering of the results from the
         returned iterator should be considered in arbitrary order."""
-        return IMapUnordered.spawn(func, iterable, spawn=self.spawn)
+        return IMapUnordered.spawn(func, iterable, spawn=self.spawn, maxsize=maxsize)
 
 
 class ThreadResult(object):
@@ -273,11 +280,11 @@ class ThreadResult(object):
         self.value = None
         self.context = None
         self.exc_info = None
-        self.async = hub.loop.async()
-        self.async.start(self._on_async)
+        # the result is delivered through the hub's channel; keep the loop running until then
+        hub.channel.hold()
 
-    def _on_async(self):
-        self.async.stop()
+    def _on_delivery(self):
+        self.hub.channel.release()
         try:
             if self.exc_info is not None:
                 try:
@@ -285,7 +292,6 @@ class ThreadResult(object):
                 finally:
                     self.exc_info = None
             self.context = None
-            self.async = None
             self.hub = None
             if self.receiver is not None:
                 self.receiver(self)
@@ -295,12 +301,12 @@ class ThreadResult(object):
 
     def set(self, value):
         self.value = value
-        self.async.send()
+        self.hub.channel.send(self._on_delivery)
 
     def handle_error(self, context, exc_info):
         self.context = context
         self.exc_info = exc_info
-        self.async.send()
+        self.hub.channel.send(self._on_delivery)
 
     # link protocol:
     def successful(self):
@@ -22,6 +22,8 @@
 
 The code is taken from twisted.python.win32 module.
 """
+# gevent/socket.py would shadow the socket module below
+from __future__ import absolute_import
 
 import os
 
@@ -0,0 +1,36 @@
+"""Benchmarking a busy pywsgi server with different values of loop.io_collect_interval.
+
+A larger interval lets the server handle more events per loop iteration: the throughput
+goes up and so does the latency. The throughput only goes up if the server, rather than
+the load generator, is the bottleneck, so run it on a machine with several CPUs.
+"""
+import gevent
+from gevent.bench import http
+
+
+N = 5000
+CONCURRENCY = 50
+INTERVALS = [0, 0.0001, 0.0005, 0.001, 0.002]
+
+
+def bench(interval):
+    loop = gevent.get_hub().loop
+    # the forked server inherits the setting
+    loop.io_collect_interval = interval
+    try:
+        address, pid = http.fork_server()
+    finally:
+        loop.io_collect_interval = 0
+    try:
+        return http.run(address, 'keepalive', requests=N, concurrency=CONCURRENCY)
+    finally:
+        http.kill_server(pid)
+
+
+def main():
+    for interval in INTERVALS:
+        print('io_collect_interval=%-6s %s' % (interval, bench(interval)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Benchmarking many small writes: sendall() for each one vs gevent.socket.CorkedWriter."""
+from time import time
+import gevent
+from gevent import socket
+
+
+N = 100000
+MESSAGE = '*3\r\n$3\r\nSET\r\n$3\r\nkey\r\n$5\r\nvalue\r\n'
+
+
+def reader(sock, length):
+    while length > 0:
+        length -= len(sock.recv(65536))
+
+
+def bench(make_write):
+    a, b = socket.socketpair()
+    g = gevent.spawn(reader, b, N * len(MESSAGE))
+    write = make_write(a)
+    start = time()
+    for i in xrange(N):
+        write(MESSAGE)
+        if i % 100 == 99:
+            # let the loop run, like a client waiting for replies would
+            gevent.sleep(0)
+    g.join()
+    spent = time() - start
+    a.close()
+    b.close()
+    return spent
+
+
+def main():
+    for name, make_write in [('sendall', lambda sock: sock.sendall),
+                             ('CorkedWriter', lambda sock: socket.CorkedWriter(sock).write)]:
+        spent = bench(make_write)
+        print('%s: %.2f us per write' % (name, spent / N * 1000000.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Benchmarking memory and throughput of Event and AsyncResult.
+
+Reports the resident memory taken per instance and how fast instances can be
+created, set and waited on.
+"""
+import os
+import gc
+from time import time
+import gevent
+from gevent.event import Event, AsyncResult
+
+
+N = 100000
+
+
+def rss():
+    try:
+        f = open('/proc/self/statm')
+    except IOError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    try:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    finally:
+        f.close()
+
+
+def bench_memory(cls):
+    gc.collect()
+    before = rss()
+    objects = [cls() for _ in range(N)]
+    after = rss()
+    print ('%s: %d bytes of RSS per instance' % (cls.__name__, (after - before) / len(objects)))
+
+
+def bench_set_get(cls):
+    # one waiter per object, all woken up in the same loop iteration
+    objects = [cls() for _ in range(N // 10)]
+    waiters = [gevent.spawn(obj.wait) for obj in objects]
+    gevent.sleep(0)
+    start = time()
+    for obj in objects:
+        obj.set()
+    gevent.joinall(waiters)
+    delta = time() - start
+    print ('%s: %.1f microseconds per set() and wakeup' % (cls.__name__, delta * 1000000.0 / len(objects)))
+
+
+def main():
+    for cls in (Event, AsyncResult):
+        bench_memory(cls)
+    for cls in (Event, AsyncResult):
+        bench_set_get(cls)
+
+
+if __name__ == '__main__':
+    main()
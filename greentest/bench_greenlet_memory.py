@@ -0,0 +1,59 @@
+"""Benchmarking memory used per Greenlet.
+
+Reports the size of a freshly spawned Greenlet object together with its instance
+dict, and the growth of the process' resident memory when many greenlets are
+blocked waiting on an event.
+"""
+import sys
+import os
+import gc
+from time import time
+import gevent
+from gevent.event import Event
+
+
+N = 20000
+
+
+def rss():
+    try:
+        f = open('/proc/self/statm')
+    except IOError:
+        import resource
+        # ru_maxrss only grows, but it is good enough for a single measurement
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    try:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    finally:
+        f.close()
+
+
+def object_size(g):
+    return sys.getsizeof(g) + sys.getsizeof(g.__dict__)
+
+
+def main():
+    event = Event()
+    g = gevent.spawn(event.wait)
+    print ('spawned greenlet: %d bytes (instance dict has %d keys)' % (object_size(g), len(g.__dict__)))
+    gevent.sleep(0)
+    print ('blocked greenlet: %d bytes (instance dict has %d keys)' % (object_size(g), len(g.__dict__)))
+    event.set()
+    g.join()
+
+    event = Event()
+    gc.collect()
+    before = rss()
+    start = time()
+    greenlets = [gevent.spawn(event.wait) for _ in range(N)]
+    gevent.sleep(0)
+    delta = time() - start
+    after = rss()
+    print ('%d blocked greenlets: %.1f microseconds and %d bytes of RSS per greenlet' % (
+        N, delta * 1000000.0 / N, (after - before) / N))
+    event.set()
+    gevent.joinall(greenlets)
+
+
+if __name__ == '__main__':
+    main()
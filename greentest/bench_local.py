@@ -0,0 +1,36 @@
+"""Benchmarking attribute access on greenlet-local objects.
+
+Compares gevent.local.local with the pure Python _threading_local.local from the
+standard library (which is what gevent.local was derived from).
+"""
+from time import time
+import _threading_local
+import gevent._local
+from gevent.local import local
+
+
+N = 200000
+
+
+def bench(cls):
+    obj = cls()
+    obj.value = 1
+    start = time()
+    for _ in range(N):
+        obj.value
+    get = time() - start
+    start = time()
+    for _ in range(N):
+        obj.value = 2
+    set = time() - start
+    return get * 1000000000.0 / N, set * 1000000000.0 / N
+
+
+def main():
+    print ('gevent._local is %s' % ('compiled' if not gevent._local.__file__.endswith(('.py', '.pyc')) else 'pure Python'))
+    for name, cls in [('gevent.local.local', local), ('_threading_local.local', _threading_local.local)]:
+        print ('%-24s get: %.0f ns  set: %.0f ns' % ((name, ) + bench(cls)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Benchmarking readline() on socket file objects, the way pywsgi reads request headers.
+
+Compares socket.makefile() with io.BufferedReader over gevent.socket.SocketIO.
+"""
+from time import time
+from io import BufferedReader
+import gevent
+from gevent import socket
+
+
+REQUEST = ('GET /index.html HTTP/1.1\r\n' +
+           ''.join('X-Header-%d: some value %d\r\n' % (i, i) for i in range(10)) +
+           '\r\n')
+N = 20000
+
+
+def writer(sock):
+    data = REQUEST * 100
+    for _ in range(N // 100):
+        sock.sendall(data)
+
+
+def bench(make_file):
+    a, b = socket.socketpair()
+    g = gevent.spawn(writer, a)
+    rfile = make_file(b)
+    start = time()
+    for _ in range(N):
+        while rfile.readline() != '\r\n':
+            pass
+    spent = time() - start
+    g.get()
+    a.close()
+    b.close()
+    return spent
+
+
+def main():
+    for name, make_file in [('makefile', lambda sock: sock.makefile('rb', -1)),
+                            ('SocketIO', lambda sock: BufferedReader(socket.SocketIO(sock)))]:
+        spent = bench(make_file)
+        print('%s: %.2f us per request' % (name, spent / N * 1000000.0))
+
+
+if __name__ == '__main__':
+    main()
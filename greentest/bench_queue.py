@@ -0,0 +1,60 @@
+"""Benchmarking fairness of Queue.get() under contention.
+
+Many consumers block on the same queue while a producer feeds it in bursts.
+Reports how evenly the items were spread across consumers and the percentiles
+of the time each get() spent blocked.
+"""
+from time import time
+import gevent
+from gevent.queue import Queue
+
+
+CONSUMERS = 200
+ROUNDS = 100
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    q = Queue()
+    counts = [0] * CONSUMERS
+    latencies = []
+
+    def consumer(index):
+        while True:
+            start = time()
+            item = q.get()
+            latencies.append(time() - start)
+            if item is StopIteration:
+                break
+            counts[index] += 1
+
+    consumers = []
+    for index in range(CONSUMERS):
+        consumers.append(gevent.spawn(consumer, index))
+        gevent.sleep(0)
+
+    start = time()
+    for _ in range(ROUNDS):
+        # half as many items as consumers, so they have to compete
+        for item in range(CONSUMERS // 2):
+            q.put(item)
+        gevent.sleep(0)
+    delta = time() - start
+
+    for _ in consumers:
+        q.put(StopIteration)
+    gevent.joinall(consumers)
+
+    latencies.sort()
+    print ('%d items, %.1f microseconds per item' % (sum(counts), delta * 1000000.0 / sum(counts)))
+    print ('items per consumer: min=%d max=%d' % (min(counts), max(counts)))
+    print ('get() latency: p50=%.1fms p99=%.1fms max=%.1fms' % (percentile(latencies, 0.5) * 1000.0,
+                                                               percentile(latencies, 0.99) * 1000.0,
+                                                               latencies[-1] * 1000.0))
+
+
+if __name__ == '__main__':
+    main()
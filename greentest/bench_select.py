@@ -0,0 +1,40 @@
+"""Benchmarking select() against poll() over many descriptors.
+
+Only one of the pipes is readable, so the cost is dominated by handling the idle ones.
+"""
+from time import time
+import os
+from gevent import select
+
+
+FDS = 500
+N = 1000
+
+
+def main():
+    pipes = [os.pipe() for _ in range(FDS)]
+    rlist = [r for (r, w) in pipes]
+    os.write(pipes[-1][1], 'x')
+
+    start = time()
+    for _ in range(N):
+        select.select(rlist, [], [])
+    delta = time() - start
+    print ('select: %.1f microseconds per call with %d fds' % (delta * 1000000.0 / N, FDS))
+
+    poll = select.poll()
+    for fd in rlist:
+        poll.register(fd, select.POLLIN)
+    start = time()
+    for _ in range(N):
+        poll.poll()
+    delta = time() - start
+    print ('poll:   %.1f microseconds per call with %d fds' % (delta * 1000000.0 / N, FDS))
+
+    for r, w in pipes:
+        os.close(r)
+        os.close(w)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,49 @@
 #! /usr/bin/env python
+"""Benchmarking sendall() throughput, in plaintext or over TLS (with --ssl)."""
+import os
+import sys
 import time
 from gevent import socket
 from gevent.server import StreamServer
 
 
+CERTFILE = os.path.join(os.path.dirname(__file__), 'keycert.pem')
+
+
 def recvall(socket, addr):
-    while socket.recv(4096):
+    buffer = bytearray(65536)
+    while socket.recv_into(buffer):
         pass
 
 
+def get_ssl_args():
+    import ssl
+    ssl_args = {'certfile': CERTFILE}
+    if ssl.OPENSSL_VERSION_INFO >= (1, 1):
+        # keycert.pem has a 1024-bit key, which OpenSSL 1.1+ refuses by default
+        ssl_args['ciphers'] = 'DEFAULT:@SECLEVEL=0'
+    if hasattr(ssl, 'SSLContext'):
+        ssl_args['session_cache'] = True
+    return ssl_args
+
+
+def connect(server, ssl_args):
+    conn = socket.create_connection((server.server_host, server.server_port))
+    if not ssl_args:
+        return conn
+    import ssl
+    from gevent.ssl import SSLSocket
+    if 'session_cache' in ssl_args:
+        context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
+        if 'ciphers' in ssl_args:
+            context.set_ciphers(ssl_args['ciphers'])
+        return SSLSocket(conn, _context=context)
+    return SSLSocket(conn, ciphers=ssl_args.get('ciphers'))
+
+
 def main():
-    server = StreamServer(("127.0.0.1", 0), recvall)
+    ssl_args = get_ssl_args() if '--ssl' in sys.argv[1:] else {}
+    server = StreamServer(("127.0.0.1", 0), recvall, **ssl_args)
     server.start()
 
     length = 50 * 0x100000
@@ -19,7 +52,7 @@ def main():
     spent_total = 0
     N = 10
 
-    conn = socket.create_connection((server.server_host, server.server_port))
+    conn = connect(server, ssl_args)
     for i in range(N):
         start = time.time()
         conn.sendall(data)
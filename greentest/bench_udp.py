@@ -0,0 +1,53 @@
+"""Benchmarking the datagrams per second handled by DatagramServer, one by one and in batches."""
+from time import time
+import gevent
+from gevent import socket
+from gevent.event import Event
+from gevent.server import DatagramServer
+
+
+N = 100000
+BURST = 100
+
+
+def bench(**kwargs):
+    received = [0]
+    done = Event()
+
+    def handle_one(data, address):
+        received[0] += 1
+        if received[0] >= N:
+            done.set()
+
+    def handle_batch(batch):
+        received[0] += len(batch)
+        if received[0] >= N:
+            done.set()
+
+    handle = handle_batch if kwargs.get('batch_size') else handle_one
+    server = DatagramServer('127.0.0.1:0', handle, **kwargs)
+    server.start()
+    server.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    client = socket.socket(type=socket.SOCK_DGRAM)
+    client.connect(server.address)
+    start = time()
+    sent = 0
+    while sent < N and not done.is_set():
+        for _ in xrange(BURST):
+            client.send('x' * 64)
+        sent += BURST
+        gevent.sleep(0)
+    done.wait(1)
+    spent = time() - start
+    server.stop()
+    return received[0], spent
+
+
+def main():
+    for kwargs in [{}, {'batch_size': 64}]:
+        received, spent = bench(**kwargs)
+        print('%s: %d of %d datagrams, %.0f per second' % (kwargs or 'one by one', received, N, received / spent))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python
+"""Benchmark suite.
+
+Each benchmark is calibrated to run for at least --min-time seconds, warmed up and then
+repeated --runs times. The median, the mean and the standard deviation of the time per
+operation are reported.
+
+The results are stored in the same sqlite3 database that testrunner.py uses (--db, by default
+'testresults.sqlite3' in the current directory), in the following table:
+
+benchmark:
+
+  runid   | name   | python | changeset   | started_at | loops | runs | median | mean | stddev | min | timings |
+  --------+--------+--------+-------------+------------+-------+------+--------+------+--------+-----+---------+
+  abc123  | spawn  | 2.7.3  | 123_fe43ca+ | ...        | 10000 |    5 | 3.1e-6 | ...  | ...    | ... | [...]   |
+
+--json FILE also writes the results of the run into FILE.
+
+Compare two runs with --compare OLD NEW, where each of OLD and NEW is either a runid from
+the database or a JSON file. A benchmark is flagged as a regression if it became slower by
+more than --threshold (5% by default) and by more than the sum of the standard deviations.
+The exit code is 1 if there are regressions.
+"""
+import sys
+import os
+import time
+import json
+import platform
+import gevent
+from gevent import socket
+from gevent.hub import get_hub
+from testrunner import sqlite3, store_record, get_changeset, log
+
+
+DEFAULT_RUNS = 5
+DEFAULT_WARMUP = 1
+DEFAULT_MIN_TIME = 0.1
+DEFAULT_THRESHOLD = 0.05
+
+benchmarks = {}
+
+
+def benchmark(function):
+    """Register *function* as a benchmark.
+
+    The function is called with the number of operations to perform and returns the seconds spent.
+    """
+    name = function.__name__
+    if name.startswith('bench_'):
+        name = name[6:]
+    benchmarks[name] = function
+    return function
+
+
+def noop(*args):
+    pass
+
+
+@benchmark
+def bench_spawn(loops):
+    start = time.time()
+    for _ in xrange(loops):
+        gevent.spawn(noop)
+    gevent.sleep(0)
+    return time.time() - start
+
+
+@benchmark
+def bench_switch(loops):
+    sleep = gevent.sleep
+    start = time.time()
+    for _ in xrange(loops):
+        sleep(0)
+    return time.time() - start
+
+
+@benchmark
+def bench_queue(loops):
+    from gevent.queue import Queue
+    queue = Queue(1)
+
+    def consume():
+        get = queue.get
+        for _ in xrange(loops):
+            get()
+
+    consumer = gevent.spawn(consume)
+    put = queue.put
+    start = time.time()
+    for _ in xrange(loops):
+        put(None)
+    consumer.join()
+    return time.time() - start
+
+
+@benchmark
+def bench_event(loops):
+    from gevent.event import Event
+    ping = Event()
+    pong = Event()
+
+    def reply():
+        for _ in xrange(loops):
+            ping.wait()
+            ping.clear()
+            pong.set()
+
+    replier = gevent.spawn(reply)
+    gevent.sleep(0)
+    start = time.time()
+    for _ in xrange(loops):
+        ping.set()
+        pong.wait()
+        pong.clear()
+    replier.join()
+    return time.time() - start
+
+
+@benchmark
+def bench_socket_echo(loops):
+    from gevent.server import StreamServer
+
+    def echo(sock, address):
+        recv = sock.recv
+        sendall = sock.sendall
+        while True:
+            data = recv(1024)
+            if not data:
+                break
+            sendall(data)
+
+    server = StreamServer(('127.0.0.1', 0), echo)
+    server.start()
+    try:
+        client = socket.create_connection(('127.0.0.1', server.server_port))
+        message = 'x' * 64
+        start = time.time()
+        for _ in xrange(loops):
+            client.sendall(message)
+            received = 0
+            while received < len(message):
+                received += len(client.recv(1024))
+        spent = time.time() - start
+        client.close()
+        return spent
+    finally:
+        server.stop()
+
+
+@benchmark
+def bench_pywsgi_hello(loops):
+    from io import BufferedReader
+    from gevent.pywsgi import WSGIServer
+
+    def application(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/plain'), ('Content-Length', '12')])
+        return ['Hello world\n']
+
+    server = WSGIServer(('127.0.0.1', 0), application, log=None)
+    server.start()
+    try:
+        client = socket.create_connection(('127.0.0.1', server.server_port))
+        rfile = BufferedReader(socket.SocketIO(client))
+        request = 'GET / HTTP/1.1\r\nHost: localhost\r\n\r\n'
+        start = time.time()
+        for _ in xrange(loops):
+            client.sendall(request)
+            while rfile.readline() != '\r\n':
+                pass
+            rfile.read(12)
+        spent = time.time() - start
+        rfile.close()
+        client.close()
+        return spent
+    finally:
+        server.stop()
+
+
+@benchmark
+def bench_dns(loops):
+    getaddrinfo = socket.getaddrinfo
+    start = time.time()
+    for _ in xrange(loops):
+        getaddrinfo('localhost', 80)
+    return time.time() - start
+
+
+@benchmark
+def bench_threadpool(loops):
+    apply = get_hub().threadpool.apply
+    start = time.time()
+    for _ in xrange(loops):
+        apply(noop)
+    return time.time() - start
+
+
+def time_in_subprocess(code, loops):
+    """Run *code* in *loops* new interpreters and return the seconds spent running it, excluding the interpreter startup."""
+    import subprocess
+    script = 'import time\nstart = time.time()\n%s\nimport sys\nsys.stdout.write(repr(time.time() - start))\n' % code
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.path.dirname(os.path.dirname(gevent.__file__)), env.get('PYTHONPATH')]))
+    total = 0.0
+    for _ in xrange(loops):
+        total += float(subprocess.check_output([sys.executable, '-c', script], env=env))
+    return total
+
+
+@benchmark
+def bench_import(loops):
+    return time_in_subprocess('import gevent', loops)
+
+
+@benchmark
+def bench_patch_all(loops):
+    return time_in_subprocess('from gevent import monkey\nmonkey.patch_all()', loops)
+
+
+@benchmark
+def bench_patch_all_lazy(loops):
+    return time_in_subprocess('from gevent import monkey\nmonkey.patch_all(lazy=True)', loops)
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+def mean(values):
+    return sum(values) / float(len(values))
+
+
+def stddev(values):
+    if len(values) < 2:
+        return 0.0
+    average = mean(values)
+    return (sum((x - average) ** 2 for x in values) / (len(values) - 1)) ** 0.5
+
+
+def calibrate(function, min_time):
+    loops = 1
+    while True:
+        spent = function(loops)
+        if spent >= min_time:
+            return loops
+        if spent <= 0:
+            loops *= 10
+        else:
+            loops = max(loops * 2, int(loops * min_time * 1.2 / spent))
+
+
+def run_benchmark(name, options):
+    function = benchmarks[name]
+    loops = calibrate(function, options.min_time)
+    for _ in xrange(options.warmup):
+        function(loops)
+    timings = [function(loops) / loops for _ in xrange(options.runs)]
+    return {'loops': loops,
+            'runs': len(timings),
+            'median': median(timings),
+            'mean': mean(timings),
+            'stddev': stddev(timings),
+            'min': min(timings),
+            'timings': timings}
+
+
+def format_time(seconds):
+    if seconds >= 0.001:
+        return '%.2f ms' % (seconds * 1000.0)
+    return '%.2f us' % (seconds * 1000000.0)
+
+
+def run(options, names):
+    info = {'runid': options.runid,
+            'python': '%s.%s.%s' % sys.version_info[:3],
+            'changeset': get_changeset(),
+            'started_at': time.time(),
+            'results': {}}
+    for name in names:
+        result = run_benchmark(name, options)
+        info['results'][name] = result
+        print ('%-16s %12s +- %-10s (%d loops, %d runs)' % (name, format_time(result['median']),
+                                                          format_time(result['stddev']), result['loops'], result['runs']))
+        sys.stdout.flush()
+        if options.db:
+            record = dict((key, value) for (key, value) in result.items() if key != 'timings')
+            record.update(runid=options.runid, name=name, python=info['python'], changeset=info['changeset'],
+                          started_at=info['started_at'], timings=json.dumps(result['timings']))
+            store_record(options.db, 'benchmark', record)
+    if options.json:
+        with open(options.json, 'w') as f:
+            json.dump(info, f, indent=1, sort_keys=True)
+    return info
+
+
+def load_results(options, source):
+    """Return {name: (median, stddev)} for the run *source*: a JSON file or a runid in the database."""
+    if source.endswith('.json') or os.path.isfile(source):
+        with open(source) as f:
+            results = json.load(f)['results']
+        return dict((name, (result['median'], result['stddev'])) for (name, result) in results.items())
+    if not options.db:
+        sys.exit('Cannot load run %r: no database' % (source, ))
+    db = sqlite3.connect(options.db)
+    rows = db.execute('select name, median, stddev from benchmark where runid=?', (source, )).fetchall()
+    if not rows:
+        sys.exit('No benchmark results for runid %r in %s' % (source, options.db))
+    return dict((name, (median, stddev)) for (name, median, stddev) in rows)
+
+
+def compare(options, old_source, new_source):
+    """Print the changes between two runs and return the names of the regressed benchmarks."""
+    old = load_results(options, old_source)
+    new = load_results(options, new_source)
+    regressions = []
+    for name in sorted(set(old) & set(new)):
+        old_median, old_stddev = old[name]
+        new_median, new_stddev = new[name]
+        change = (new_median - old_median) / old_median if old_median else 0.0
+        flag = ''
+        if change > options.threshold and new_median - old_median > old_stddev + new_stddev:
+            flag = 'REGRESSION'
+            regressions.append(name)
+        elif -change > options.threshold and old_median - new_median > old_stddev + new_stddev:
+            flag = 'faster'
+        print ('%-16s %12s -> %-12s %+7.1f%% %s' % (name, format_time(old_median), format_time(new_median), change * 100, flag))
+    for name in sorted(set(old) ^ set(new)):
+        print ('%-16s only in %s' % (name, old_source if name in old else new_source))
+    return regressions
+
+
+def main():
+    import optparse
+    parser = optparse.OptionParser(usage='%prog [options] [benchmark ...]\n       %prog [options] --compare OLD NEW')
+    parser.add_option('--db', default='testresults.sqlite3')
+    parser.add_option('--no-db', dest='db', action='store_false')
+    parser.add_option('--runid')
+    parser.add_option('--json', metavar='FILE', help='also write the results into FILE')
+    parser.add_option('--runs', default=DEFAULT_RUNS, type='int')
+    parser.add_option('--warmup', default=DEFAULT_WARMUP, type='int')
+    parser.add_option('--min-time', default=DEFAULT_MIN_TIME, type='float', metavar='SECONDS')
+    parser.add_option('--compare', default=False, action='store_true')
+    parser.add_option('--threshold', default=DEFAULT_THRESHOLD, type='float')
+    parser.add_option('--list', default=False, action='store_true')
+
+    options, args = parser.parse_args()
+
+    if options.list:
+        for name in sorted(benchmarks):
+            print (name)
+        return
+
+    if options.db:
+        if sqlite3:
+            options.db = os.path.abspath(options.db)
+            db = sqlite3.connect(options.db)
+            db.execute('create table if not exists benchmark (id integer primary key autoincrement, runid text)')
+            db.commit()
+        else:
+            log('Cannot access the database %r: no sqlite3 module found.', options.db)
+            options.db = False
+
+    if options.compare:
+        if len(args) != 2:
+            parser.error('--compare needs exactly two runs: OLD and NEW')
+        if compare(options, *args):
+            sys.exit(1)
+        return
+
+    for name in args:
+        if name not in benchmarks:
+            parser.error('Unknown benchmark: %r (see --list)' % (name, ))
+    if not options.runid:
+        import uuid
+        options.runid = str(uuid.uuid4())
+    log('runid: %s (%s)', options.runid, platform.python_implementation())
+    run(options, args or sorted(benchmarks))
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,7 @@ from greentest import walk_modules
 
 
 MAPPING = {'gevent.local': '_threading_local',
+           'gevent.os': 'os',
            'gevent.socket': 'socket',
            'gevent.select': 'select',
            'gevent.ssl': 'ssl',
@@ -22,7 +23,13 @@ ANY = ANY()
 NOT_IMPLEMENTED = {
     'socket': ['CAPI', 'gethostbyaddr', 'gethostbyname_ex', 'getnameinfo'],
     'thread': ['allocate', 'exit_thread', 'interrupt_main', 'start_new'],
-    'select': ANY}
+    # backported to the stdlib ssl in 2.7.9
+    'ssl': ['CHANNEL_BINDING_TYPES', 'CertificateError', 'DefaultVerifyPaths', 'Purpose', 'SSLContext',
+            'SSLEOFError', 'SSLSyscallError', 'SSLWantReadError', 'SSLWantWriteError', 'SSLZeroReturnError',
+            'closing', 'create_connection', 'create_default_context', 'get_default_verify_paths',
+            'match_hostname', 'namedtuple'],
+    'select': ANY,
+    'os': ANY}
 
 COULD_BE_MISSING = {
     'socket': ['create_connection', 'RAND_add', 'RAND_egd', 'RAND_status']}
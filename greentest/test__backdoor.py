@@ -1,5 +1,7 @@
+import json
 import greentest
 import gevent
+from gevent.pool import Pool
 from gevent import socket
 from gevent import backdoor
 
@@ -80,6 +82,59 @@ class Test(greentest.TestCase):
         finally:
             server.stop()
 
+    def test_profile(self):
+        server = backdoor.BackdoorServer(('127.0.0.1', 0))
+        server.start()
+        try:
+            conn = socket.create_connection(('127.0.0.1', server.server_port))
+            read_until(conn, '>>> ')
+            conn.sendall('profile(0.01, interval=0.001)\r\n')
+            response = read_until(conn, '>>> ')
+            self.assertTrue(response.startswith('<Profiler at '), response)
+        finally:
+            server.stop()
+
+    def test_status(self):
+        pool = Pool(3)
+        server = backdoor.BackdoorServer(('127.0.0.1', 0), locals={'pool': pool})
+        server.start()
+        try:
+            pool.spawn(gevent.sleep, 10)
+            conn = socket.create_connection(('127.0.0.1', server.server_port))
+            read_until(conn, '>>> ')
+            conn.sendall('status(json=True, fds=True)\r\n')
+            status = json.loads(read_until(conn, '>>> ')[:-4])
+            self.assertEqual(status['pools']['pool'], {'type': 'Pool', 'greenlets': 1, 'size': 3, 'free': 2, 'waiters': 0})
+            if 'watchers' in status['loop']:
+                self.assert_(status['loop']['watchers']['io'] >= 2, status)
+                self.assert_(status['loop']['waiting_read'] >= 2, status)
+                self.assertEqual(status['loop']['fds'][str(server.socket.fileno())], 'read')
+            conn.sendall('status()\r\n')
+            response = read_until(conn, '>>> ')
+            self.assert_(response.startswith('<') and 'Hub at ' in response.split('\n')[0], response)
+            self.assert_('\npool: free=2 greenlets=1 size=3 type=Pool waiters=0\n' in response, response)
+        finally:
+            pool.kill()
+            server.stop()
+
+    def test_status_sockets(self):
+        a, b = socket.socketpair()
+        try:
+            reader = gevent.spawn(a.recv, 10)
+            gevent.sleep(0)
+            status = backdoor.get_status(sockets=True)
+            [info] = [x for x in status['sockets'] if x['fd'] == a.fileno()]
+            self.assertEqual(info['waiting'].keys(), ['read'])
+            self.assert_('recv' in info['waiting']['read'], info)
+            [info] = [x for x in status['sockets'] if x['fd'] == b.fileno()]
+            self.assertEqual(info['waiting'], {})
+            self.assert_('%s read=' % a in backdoor.format_status(status), backdoor.format_status(status))
+            b.sendall('x')
+            self.assertEqual(reader.get(), 'x')
+        finally:
+            a.close()
+            b.close()
+
 
 if __name__ == '__main__':
     greentest.main()
@@ -0,0 +1,67 @@
+import greentest
+from gevent.pywsgi import WSGIServer
+from gevent.bench import http
+
+
+def chunked(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return ['Hello', ' world\n']
+
+
+def not_found(environ, start_response):
+    start_response('404 Not Found', [('Content-Length', '0')])
+    return []
+
+
+class TestRun(greentest.TestCase):
+    server = None
+
+    def start(self, application):
+        self.server = WSGIServer(('127.0.0.1', 0), application, log=None)
+        self.server.start()
+        return self.server.address
+
+    def cleanup(self):
+        if self.server is not None:
+            self.server.stop()
+
+    def test_modes(self):
+        address = self.start(http.hello_world)
+        for mode in http.MODES:
+            result = http.run(address, mode, requests=23, concurrency=3, pipeline=4)
+            self.assertEqual(result.errors, 0, result)
+            self.assertEqual(result.requests, 23, result)
+            self.assert_(result.percentile(50) <= result.percentile(99) <= result.percentile(99.9), result)
+            self.assert_(result.requests_per_second > 0, result)
+            self.assert_(str(result).startswith(mode), result)
+
+    def test_chunked(self):
+        result = http.run(self.start(chunked), 'pipeline', requests=10, concurrency=2, pipeline=5)
+        self.assertEqual((result.requests, result.errors), (10, 0))
+
+    def test_errors(self):
+        result = http.run(self.start(not_found), 'keepalive', requests=5, concurrency=1)
+        self.assertEqual((result.requests, result.errors), (0, 5))
+        self.assertEqual(result.percentile(50), None)
+
+
+class TestArguments(greentest.TestCase):
+    switch_expected = False
+
+    def test_bad_mode(self):
+        self.assertRaises(ValueError, http.run, ('127.0.0.1', 1), 'bad')
+
+
+class TestForkServer(greentest.TestCase):
+
+    def test(self):
+        address, pid = http.fork_server()
+        try:
+            result = http.run(address, 'keepalive', requests=10, concurrency=2)
+            self.assertEqual((result.requests, result.errors), (10, 0))
+        finally:
+            http.kill_server(pid)
+
+
+if __name__ == '__main__':
+    greentest.main()
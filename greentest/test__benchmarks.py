@@ -31,10 +31,12 @@ if __name__ == '__main__':
 
     errors = []
 
-    for path in modules:
+    commands = [(path, '%s %s all' % (sys.executable, path)) for path in modules]
+    commands.append(('benchmarks.py', '%s benchmarks.py --no-db --runs 1 --warmup 0 --min-time 0.01' % sys.executable))
+
+    for path, command in commands:
         sys.stderr.write(path + '\n')
         sys.stdout.flush()
-        command = '%s %s all' % (sys.executable, path)
         res = system(command)
         if res:
             error = '%r failed with code %s' % (command, res)
@@ -47,6 +47,34 @@ class Test(TestCase):
     def test_signal(self):
         self.assertRaises(ValueError, core.loop().signal, 1000)
 
+    def test_watcher_counts(self):
+        loop = core.loop(default=False)
+        if not hasattr(loop, 'watcher_counts'):
+            return
+        counts = loop.watcher_counts()
+        timer = loop.timer(10)
+        timer.start(lambda: None)
+        io = loop.io(sys.stdout.fileno(), core.WRITE)
+        io.start(lambda: None)
+        loop.run_callback(lambda: None)
+        self.assertEqual(loop.watcher_counts()['timer'], counts['timer'] + 1)
+        self.assertEqual(loop.watcher_counts()['io'], counts['io'] + 1)
+        self.assertEqual(loop.io_events()[sys.stdout.fileno()], core.WRITE)
+        self.assertEqual(loop.pendingcnt, 1)
+        timer.stop()
+        io.stop()
+        self.assertEqual(loop.watcher_counts(), counts)
+        self.assert_(sys.stdout.fileno() not in loop.io_events())
+
+    def test_collect_interval(self):
+        loop = core.loop(default=False)
+        self.assertEqual((loop.io_collect_interval, loop.timeout_collect_interval), (0, 0))
+        loop.io_collect_interval = 0.001
+        loop.timeout_collect_interval = 0.01
+        self.assertEqual((loop.io_collect_interval, loop.timeout_collect_interval), (0.001, 0.01))
+        self.assertRaises(ValueError, setattr, loop, 'io_collect_interval', -1)
+        self.assertRaises(ValueError, setattr, loop, 'timeout_collect_interval', -1)
+
 
 if __name__ == '__main__':
     main()
@@ -108,6 +108,70 @@ class TestEvent_SetThenClear1000(TestEvent_SetThenClear):
     N = 1000
 
 
+class TestNotifyLater(greentest.TestCase):
+
+    def test_events_share_one_callback(self):
+        log = []
+        callback = lambda event: log.append(event)
+        events = [Event() for _ in range(10)]
+        for event in events:
+            event.rawlink(callback)
+        for event in events:
+            event.set()
+        self.assertEqual(gevent.get_hub()._notify_queue, events)
+        gevent.sleep(0)
+        self.assertEqual(gevent.get_hub()._notify_queue, [])
+        self.assertEqual(sorted(log), sorted(events))
+
+    def test_event_rawlink_while_scheduled(self):
+        log = []
+        e = Event()
+        e.rawlink(lambda x: log.append(1))
+        e.set()
+        e.rawlink(lambda x: log.append(2))
+        gevent.sleep(0)
+        self.assertEqual(sorted(log), [1, 2])
+
+    def test_event_unlink_before_notify(self):
+        log = []
+        callback = lambda event: log.append(event)
+        e = Event()
+        e.rawlink(callback)
+        e.set()
+        e.unlink(callback)
+        e.unlink(callback)
+        gevent.sleep(0)
+        self.assertEqual(log, [])
+
+    def test_async_result_rawlink_after_set(self):
+        log = []
+        result = AsyncResult()
+        result.set(5)
+        result.rawlink(lambda x: log.append(1))
+        result.rawlink(lambda x: log.append(2))
+        gevent.sleep(0)
+        self.assertEqual(sorted(log), [1, 2])
+
+    def test_same_callback_linked_once(self):
+        log = []
+        callback = lambda obj: log.append(obj)
+        for cls in [Event, AsyncResult]:
+            obj = cls()
+            obj.rawlink(callback)
+            obj.rawlink(callback)
+            obj.set()
+            gevent.sleep(0)
+            self.assertEqual(log, [obj])
+            del log[:]
+            obj = cls()
+            obj.rawlink(callback)
+            obj.rawlink(callback)
+            obj.unlink(callback)
+            obj.set()
+            gevent.sleep(0)
+            self.assertEqual(log, [])
+
+
 X = object()
 
 if __name__ == '__main__':
@@ -616,6 +616,31 @@ class TestStart(greentest.TestCase):
         assert g.dead
 
 
+class TestLazyLinks(greentest.TestCase):
+
+    def test_unlinked_greenlet(self):
+        g = gevent.spawn(lambda: 5)
+        g.unlink(lambda x: None)
+        g.join()
+        assert not g._links, g._links
+        self.assertEqual(g.value, 5)
+
+    def test_rawlink_after_finished(self):
+        g = gevent.spawn(lambda: 5)
+        g.join()
+        result = AsyncResult()
+        g.rawlink(result)
+        self.assertEqual(result.get(), 5)
+
+    def test_rawlink_after_finished_twice(self):
+        g = gevent.spawn(lambda: 5)
+        g.join()
+        results = [AsyncResult(), AsyncResult()]
+        for result in results:
+            g.rawlink(result)
+        self.assertEqual([result.get() for result in results], [5, 5])
+
+
 def assert_ready(g):
     assert g.dead, g
     assert g.ready(), g
@@ -23,9 +23,13 @@ import greentest
 import time
 import re
 import sys
+import thread
 import gevent
+import gevent.event
 from gevent import socket
-from gevent.hub import Waiter, get_hub
+from gevent.hub import Waiter, get_hub, getcurrent, send_to
+from gevent.queue import ThreadSafeQueue
+from gevent._threading import start_new_thread
 
 DELAY = 0.1
 
@@ -117,5 +121,95 @@ class TestWaiter(greentest.TestCase):
         g.kill()
 
 
+class TestStackUsage(greentest.TestCase):
+
+    def test(self):
+        def blocked_in_sleep():
+            gevent.sleep(10)
+
+        greenlets = [gevent.spawn(blocked_in_sleep) for _ in range(5)]
+        gevent.sleep(0)
+        try:
+            stacks = [item for item in get_hub().greenlet_stacks() if item[1] == 'blocked_in_sleep']
+            self.assertEqual(sorted(g for (g, _name, _size) in stacks), sorted(greenlets))
+            usage = dict((name, (count, size)) for (name, count, size) in get_hub().stack_usage())
+            count, size = usage['blocked_in_sleep']
+            self.assertEqual(count, 5)
+            assert size > 0, usage
+        finally:
+            gevent.killall(greenlets)
+        names = [name for (_g, name, _size) in get_hub().greenlet_stacks()]
+        assert 'blocked_in_sleep' not in names, names
+
+
+class TestHubChannel(greentest.TestCase):
+
+    __timeout__ = 5
+
+    def test_send_from_thread(self):
+        hub = get_hub()
+        log = []
+        done = gevent.event.Event()
+
+        def run():
+            for index in range(100):
+                send_to(hub, log.append, (index, thread.get_ident()))
+            hub.channel.send(done.set)
+
+        hub.channel.hold()
+        try:
+            start_new_thread(run, ())
+            done.wait()
+        finally:
+            hub.channel.release()
+        self.assertEqual([index for index, _ident in log], range(100))
+        assert thread.get_ident() not in set(ident for _index, ident in log), log
+
+    def test_send_to_other_hub(self):
+        hubs = ThreadSafeQueue()
+        results = ThreadSafeQueue()
+
+        def run():
+            event = gevent.event.AsyncResult()
+            hub = get_hub()
+            hub.channel.hold()
+            hubs.put((hub, event))
+            try:
+                results.put((event.get(), getcurrent() is hub.parent))
+            finally:
+                hub.channel.release()
+                hub.destroy()
+
+        start_new_thread(run, ())
+        hub, event = hubs.get()
+        assert hub is not get_hub()
+        send_to(hub, event.set, 'hello')
+        self.assertEqual(results.get(), ('hello', True))
+
+    def test_send_to_destroyed_hub(self):
+        hubs = ThreadSafeQueue()
+
+        def run():
+            hub = get_hub()
+            hub.destroy(destroy_loop=True)
+            hubs.put(hub)
+
+        start_new_thread(run, ())
+        hub = hubs.get()
+        self.assertEqual(send_to(hub, getcurrent().switch), False)
+
+    def test_error(self):
+        hub = get_hub()
+        hub.channel.hold()
+        try:
+            self.expect_one_error()
+            hub.channel.send(lambda: 1 / 0)
+            hub.channel.send(getcurrent().switch, 'after')
+            self.assertEqual(hub.switch(), 'after')
+            self.assert_error(ZeroDivisionError)
+        finally:
+            hub.channel.release()
+
+
 if __name__ == '__main__':
     greentest.main()
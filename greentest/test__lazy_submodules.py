@@ -0,0 +1,10 @@
+import sys
+import gevent
+assert 'gevent.socket' not in sys.modules, 'import gevent must not import gevent.socket'
+
+# works with just "import gevent", like before gevent.socket was imported lazily
+assert gevent.socket.create_connection
+assert gevent.socket is sys.modules['gevent.socket'], gevent.socket
+
+from gevent import ssl
+assert ssl.wrap_socket is sys.modules['gevent.ssl'].wrap_socket
@@ -53,5 +53,34 @@ class GeventLocalTestCase(unittest.TestCase):
 
         self.assertNotEqual(a.path, b.path, 'The values in the two objects must be different')
 
+    def test_greenlet_death_drops_its_dict(self):
+        import gc
+        import gevent
+        a = local()
+        a.value = 'main'
+
+        def f():
+            a.value = 'greenlet'
+        g = gevent.spawn(f)
+        g.join()
+        # let the hub finish notifying the links of g
+        gevent.sleep(0)
+        impl = object.__getattribute__(a, '_local__impl')
+        self.assertEqual(len(impl.dicts), 2)
+        del g
+        gc.collect()
+        self.assertEqual(len(impl.dicts), 1)
+        self.assertEqual(a.value, 'main')
+
+    def test_local_deletion_drops_greenlet_attribute(self):
+        from gevent.hub import getcurrent
+        a = local()
+        a.value = 1
+        key = object.__getattribute__(a, '_local__impl').key
+        assert key in getcurrent().__dict__
+        del a
+        assert key not in getcurrent().__dict__
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,137 @@
+import greentest
+import gevent
+from gevent.lock import RWLock, Condition, Semaphore
+
+
+class TestRWLock(greentest.TestCase):
+
+    def test_readers_share(self):
+        lock = RWLock()
+        log = []
+
+        def reader(n):
+            with lock.reader:
+                log.append(('start', n))
+                gevent.sleep(0.01)
+                log.append(('end', n))
+
+        gevent.joinall([gevent.spawn(reader, n) for n in range(3)])
+        self.assertEqual([x[0] for x in log], ['start'] * 3 + ['end'] * 3)
+
+    def test_writer_is_exclusive(self):
+        lock = RWLock()
+        log = []
+
+        def writer(n):
+            with lock.writer:
+                log.append(('start', n))
+                gevent.sleep(0.01)
+                log.append(('end', n))
+
+        gevent.joinall([gevent.spawn(writer, n) for n in range(3)])
+        self.assertEqual([x[0] for x in log], ['start', 'end'] * 3)
+
+    def test_writer_preference(self):
+        lock = RWLock()
+        log = []
+        lock.acquire_read()
+
+        def writer():
+            with lock.writer:
+                log.append('writer')
+
+        def reader():
+            with lock.reader:
+                log.append('reader')
+
+        w = gevent.spawn(writer)
+        gevent.sleep(0)
+        # a writer is waiting, so new readers must queue behind it
+        assert not lock.acquire_read(blocking=False)
+        r = gevent.spawn(reader)
+        gevent.sleep(0)
+        self.assertEqual(log, [])
+        lock.release_read()
+        gevent.joinall([w, r])
+        self.assertEqual(log, ['writer', 'reader'])
+
+    def test_timeout(self):
+        lock = RWLock()
+        lock.acquire_write()
+        self.assertEqual(lock.acquire_read(timeout=0.01), False)
+        self.assertEqual(lock.acquire_write(timeout=0.01), False)
+        lock.release_write()
+        assert lock.acquire_write(blocking=False)
+        lock.release_write()
+        assert lock.acquire_read(blocking=False)
+        lock.release_read()
+
+    def test_killed_waiter_passes_lock_on(self):
+        lock = RWLock()
+        lock.acquire_write()
+        w = gevent.spawn(lock.acquire_write)
+        r = gevent.spawn(lock.acquire_read)
+        gevent.sleep(0)
+        lock.release_write()
+        # w has been handed the lock but has not run yet
+        w.kill()
+        r.join(timeout=1)
+        assert r.successful() and r.value is True, r
+        lock.release_read()
+
+    def test_release_unacquired(self):
+        self.switch_expected = False
+        lock = RWLock()
+        self.assertRaises(RuntimeError, lock.release_read)
+        self.assertRaises(RuntimeError, lock.release_write)
+
+
+class TestCondition(greentest.TestCase):
+
+    def test_notify_fifo(self):
+        cond = Condition()
+        log = []
+
+        def waiter(n):
+            with cond:
+                cond.wait()
+                log.append(n)
+
+        greenlets = []
+        for n in range(5):
+            greenlets.append(gevent.spawn(waiter, n))
+            gevent.sleep(0)
+        with cond:
+            cond.notify(2)
+        gevent.sleep(0)
+        self.assertEqual(log, [0, 1])
+        with cond:
+            cond.notify_all()
+        gevent.joinall(greenlets)
+        self.assertEqual(log, [0, 1, 2, 3, 4])
+
+    def test_wait_timeout(self):
+        cond = Condition(Semaphore())
+        with cond:
+            self.assertEqual(cond.wait(0.01), False)
+            self.assertEqual(list(cond._waiters), [])
+
+    def test_killed_waiter_passes_notification_on(self):
+        cond = Condition()
+
+        def waiter():
+            with cond:
+                return cond.wait()
+
+        first = gevent.spawn(waiter)
+        second = gevent.spawn(waiter)
+        gevent.sleep(0)
+        with cond:
+            cond.notify()
+        first.kill()
+        second.join(timeout=1)
+        assert second.successful() and second.value is True, second
+
+
+if __name__ == '__main__':
+    greentest.main()
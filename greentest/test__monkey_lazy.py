@@ -0,0 +1,27 @@
+import sys
+from gevent import monkey
+imported = set(sys.modules)
+monkey.patch_all(lazy=True)
+
+for name in ['os', 'time', 'thread', 'threading', '_threading_local', 'socket', 'select', 'ssl']:
+    if name in imported:
+        assert name in monkey.patched, (name, monkey.patched)
+    else:
+        assert name not in monkey.patched, (name, monkey.patched)
+
+assert 'select' not in sys.modules, 'patch_all(lazy=True) must not import select'
+import select
+from gevent import select as gevent_select
+assert select.select is gevent_select.select
+assert not hasattr(select, 'epoll')
+assert monkey.patched['select'] >= 0, monkey.patched
+
+import threading
+assert 'built-in' not in repr(threading._start_new_thread), repr(threading._start_new_thread)
+assert 'built-in' not in repr(threading._sleep), repr(threading._sleep)
+from gevent.local import local
+assert threading.local is local
+
+import socket
+from gevent import socket as gevent_socket
+assert socket.socket is gevent_socket.socket
@@ -0,0 +1,113 @@
+import greentest
+import unittest
+import sys
+import os
+import time
+import subprocess
+import gevent
+from gevent import os as gevent_os
+
+
+class TestNonBlocking(greentest.TestCase):
+
+    __timeout__ = 5
+
+    def setUp(self):
+        super(TestNonBlocking, self).setUp()
+        self.r, self.w = os.pipe()
+        assert gevent_os.make_nonblocking(self.r)
+        assert gevent_os.make_nonblocking(self.w)
+        assert not gevent_os.make_nonblocking(self.r)
+
+    def tearDown(self):
+        os.close(self.r)
+        os.close(self.w)
+        super(TestNonBlocking, self).tearDown()
+
+    def test_read_write(self):
+        data = 'x' * 1000000
+        reader = gevent.spawn(self.read_all, len(data))
+        written = 0
+        while written < len(data):
+            written += gevent_os.nb_write(self.w, data[written:])
+        self.assertEqual(reader.get(), data)
+
+    def read_all(self, size):
+        result = []
+        received = 0
+        while received < size:
+            chunk = gevent_os.nb_read(self.r, size - received)
+            received += len(chunk)
+            result.append(chunk)
+        return ''.join(result)
+
+    def test_read_does_not_block_others(self):
+        log = []
+        reader = gevent.spawn(lambda: log.append(gevent_os.nb_read(self.r, 10)))
+        gevent.sleep(0.01)
+        assert not log, log
+        os.write(self.w, 'hello')
+        reader.join()
+        self.assertEqual(log, ['hello'])
+
+
+class TestWaitpid(greentest.TestCase):
+
+    __timeout__ = 5
+
+    def fork(self, exit_code, delay=0):
+        pid = gevent_os.fork()
+        if not pid:
+            time.sleep(delay)
+            os._exit(exit_code)
+        return pid
+
+    def test_does_not_block_others(self):
+        pid = self.fork(3, 0.2)
+        ticker = gevent.spawn(lambda: [gevent.sleep(0.01) for _ in xrange(10)])
+        self.assertEqual(gevent_os.waitpid(pid, 0), (pid, 3 << 8))
+        assert ticker.dead, ticker
+
+    def test_exited_before_waitpid(self):
+        pid = self.fork(4)
+        # let the loop reap the child
+        gevent.sleep(0.3)
+        self.assertEqual(gevent_os.waitpid(pid, os.WNOHANG), (pid, 4 << 8))
+        self.assertRaises(OSError, gevent_os.waitpid, pid, 0)
+
+    def test_wnohang(self):
+        pid = self.fork(5, 0.2)
+        self.assertEqual(gevent_os.waitpid(pid, os.WNOHANG), (0, 0))
+        self.assertEqual(gevent_os.waitpid(-1, 0), (pid, 5 << 8))
+
+    def test_concurrent(self):
+        pids = [self.fork(index, 0.1) for index in range(3)]
+        waiters = [gevent.spawn(gevent_os.waitpid, pid, 0) for pid in pids]
+        gevent.joinall(waiters)
+        self.assertEqual([waiter.get() for waiter in waiters], [(pid, index << 8) for index, pid in enumerate(pids)])
+
+
+class TestWaitpidIdleLoop(unittest.TestCase):
+    # not a greentest.TestCase: its timeout timer would keep the loop running
+
+    def test_fork(self):
+        pid = gevent_os.fork()
+        if not pid:
+            time.sleep(0.1)
+            os._exit(6)
+        self.assertEqual(gevent_os.waitpid(pid, 0), (pid, 6 << 8))
+
+    def test_popen(self):
+        popen = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(0.1)'])
+        self.assertEqual(gevent_os.waitpid(popen.pid, 0), (popen.pid, 0))
+
+
+if not hasattr(os, 'fork'):
+    del TestWaitpid, TestWaitpidIdleLoop
+
+if sys.platform == 'win32':
+    del TestNonBlocking
+
+
+if __name__ == '__main__':
+    greentest.main()
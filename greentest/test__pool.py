@@ -291,6 +291,34 @@ class TestPool(greentest.TestCase):
         it = self.pool.imap_unordered(sqr_random_sleep, range(10))
         self.assertEqual(sorted(it), list(map(sqr, range(10))))
 
+    def test_imap_maxsize(self):
+        consumed = []
+
+        def source():
+            for i in range(20):
+                # never more than maxsize items between the iterable and the consumer
+                assert i - len(consumed) <= 3, (i, consumed)
+                yield i
+
+        it = self.pool.imap(sqr, source(), maxsize=3)
+        for value in it:
+            consumed.append(value)
+            gevent.sleep(0.001)
+        self.assertEqual(consumed, list(map(sqr, range(20))))
+
+    def test_imap_unordered_maxsize(self):
+        consumed = []
+
+        def source():
+            for i in range(20):
+                assert i - len(consumed) <= 3, (i, consumed)
+                yield i
+
+        it = self.pool.imap_unordered(sqr_random_sleep, source(), maxsize=3)
+        for value in it:
+            consumed.append(value)
+        self.assertEqual(sorted(consumed), list(map(sqr, range(20))))
+
     def test_terminate(self):
         result = self.pool.map_async(gevent.sleep, [0.1] * ((self.size or 10) * 2))
         gevent.sleep(0.1)
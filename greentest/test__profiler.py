@@ -0,0 +1,56 @@
+import time
+import greentest
+import gevent
+from gevent import profiler
+from gevent.hub import _get_greenlet_name
+
+
+def burn(seconds):
+    end = time.time() + seconds
+    while time.time() < end:
+        sum(xrange(1000))
+        gevent.sleep(0)
+
+
+class Test(greentest.TestCase):
+
+    def cleanup(self):
+        profiler.stop()
+
+    def test_burn(self):
+        p = profiler.start(0.001)
+        gevent.spawn(burn, 0.2).join()
+        self.assertEqual(profiler.stop(), p)
+        self.assertEqual(profiler.stop(), None)
+        stats = p.greenlet_stats()
+        samples, cpu, running, switches = stats['burn']
+        self.assert_(samples > 0, stats)
+        self.assert_(0.1 < running < 0.5, stats)
+        self.assert_(switches > 10, stats)
+        self.assert_('Hub' in stats, stats)
+        lines = [line for line in p.collapsed().splitlines() if line.startswith('burn;')]
+        self.assert_(lines, p.collapsed())
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            self.assert_('burn (test__profiler.py:' in stack.split(';')[2], line)
+            self.assert_(int(count) > 0, line)
+        self.assert_('burn' in p.format_stats())
+
+    def test_only_one(self):
+        profiler.start()
+        self.assertRaises(RuntimeError, profiler.start)
+        gevent.sleep(0)
+
+
+class TestLabels(greentest.TestCase):
+    switch_expected = False
+
+    def test(self):
+        self.assertEqual(_get_greenlet_name(gevent.Greenlet(burn)), 'burn')
+        self.assertEqual(_get_greenlet_name(gevent.Greenlet(self.test)), 'TestLabels.test')
+        self.assertEqual(_get_greenlet_name(gevent.get_hub()), 'Hub')
+        self.assertEqual(_get_greenlet_name(gevent.getcurrent()), 'main')
+
+
+if __name__ == '__main__':
+    greentest.main()
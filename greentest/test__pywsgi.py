@@ -374,6 +374,34 @@ class TestYield(CommonTests):
             yield "not found"
 
 
+class TestParkIdle(TestYield):
+
+    def init_server(self, application):
+        TestYield.init_server(self, application)
+        self.server.park_idle = True
+
+    def test_idle_connection_has_no_greenlet(self):
+        fd = self.makefile()
+        fd.write('GET / HTTP/1.1\r\nHost: localhost\r\n\r\n')
+        read_http(fd, body='hello world')
+        gevent.sleep(0.01)
+        self.assertEqual(len(self.server._parked), 1)
+        names = [name for (_g, name, _size) in gevent.get_hub().greenlet_stacks()]
+        assert not [name for name in names if name.endswith('.handle')], names
+        fd.write('GET /notexist HTTP/1.1\r\nHost: localhost\r\n\r\n')
+        read_http(fd, code=404, reason='Not Found', body='not found')
+        fd.close()
+
+    def test_close_closes_parked(self):
+        fd = self.makefile()
+        fd.write('GET / HTTP/1.1\r\nHost: localhost\r\n\r\n')
+        read_http(fd, body='hello world')
+        gevent.sleep(0.01)
+        self.server.close()
+        self.assertEqual(self.server._parked, {})
+        self.assertEqual(fd.read(), '')
+
+
 class TestGetArg(TestCase):
 
     @staticmethod
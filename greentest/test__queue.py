@@ -1,3 +1,4 @@
+import sys
 from greentest import TestCase, main, GenericGetTestCase
 import gevent
 from gevent.hub import get_hub
@@ -5,6 +6,8 @@ from gevent import util
 from gevent import queue
 from gevent.queue import Empty, Full
 from gevent.event import AsyncResult
+from gevent import _threading
+from gevent._threading import start_new_thread
 
 
 class TestQueue(TestCase):
@@ -189,6 +192,104 @@ class TestQueue(TestCase):
         self.assertEquals(e2.get(), 'timed out')
         self.assertEquals(q.get(), 'sent')
 
+    def test_getters_fifo(self):
+        q = queue.Queue()
+        results = []
+        greenlets = []
+        for x in range(10):
+            greenlets.append(gevent.spawn(lambda x: results.append((x, q.get())), x))
+            gevent.sleep(0)
+        for item in range(10):
+            q.put(item)
+        gevent.joinall(greenlets)
+        self.assertEqual(results, [(x, x) for x in range(10)])
+
+    def test_woken_getter_does_not_overtake(self):
+        q = queue.Queue()
+        results = []
+
+        def consumer(name):
+            results.append((name, q.get()))
+            results.append((name, q.get()))
+
+        a = gevent.spawn(consumer, 'a')
+        gevent.sleep(0)
+        b = gevent.spawn(consumer, 'b')
+        gevent.sleep(0)
+        q.put(0)
+        q.put(1)
+        gevent.sleep(0)
+        q.put(2)
+        q.put(3)
+        gevent.joinall([a, b])
+        self.assertEqual(results, [('a', 0), ('b', 1), ('a', 2), ('b', 3)])
+
+    def test_putters_fifo(self):
+        q = queue.Queue(1)
+        q.put('first')
+        greenlets = []
+        for x in range(10):
+            greenlets.append(gevent.spawn(q.put, x))
+            gevent.sleep(0)
+        self.assertEqual([q.get() for _ in range(11)], ['first'] + list(range(10)))
+        gevent.joinall(greenlets)
+
+    def test_getters_that_timeout_are_skipped(self):
+        q = queue.Queue()
+
+        def get(timeout):
+            try:
+                return q.get(timeout=timeout)
+            except Empty:
+                return 'timed out'
+
+        first = gevent.spawn(get, None)
+        gevent.sleep(0)
+        dying = [gevent.spawn(get, 0.01) for _ in range(5)]
+        gevent.sleep(0)
+        last = gevent.spawn(get, None)
+        gevent.joinall(dying)
+        self.assertEqual([g.value for g in dying], ['timed out'] * 5)
+        self.assertEqual(len(q.getters), 2)
+        q.put(1)
+        q.put(2)
+        gevent.joinall([first, last])
+        self.assertEqual((first.value, last.value), (1, 2))
+        self.assertEqual(len(q.getters), 0)
+
+    def test_putter_failing_in_unlock_is_not_a_tombstone(self):
+
+        class BadQueue(queue.Queue):
+
+            def _put(self, item):
+                if item == 'bad':
+                    raise ValueError(item)
+                queue.Queue._put(self, item)
+
+        q = BadQueue(1)
+        q.put('a')
+        putters = []
+        for x in ['bad', 'c', 'd', 'e']:
+            putters.append(gevent.spawn(util.wrap_errors(ValueError, q.put), x))
+            gevent.sleep(0)
+        self.assertEqual(len(q.putters), 4)
+        self.assertEqual([q.get(timeout=1) for _ in range(4)], ['a', 'c', 'd', 'e'])
+        self.assertEqual(len(q.putters), 0)
+        gevent.joinall(putters)
+        self.assertTrue(isinstance(putters[0].value, ValueError), putters[0].value)
+
+    def test_abandoned_getters_do_not_accumulate(self):
+        q = queue.Queue()
+        blocked = gevent.spawn(q.get)
+        gevent.sleep(0)
+        for _ in range(100):
+            greenlets = [gevent.spawn(util.wrap_errors(Empty, q.get), timeout=0.001) for _ in range(2)]
+            gevent.joinall(greenlets)
+        self.assertEqual(len(q.getters), 1)
+        assert len(list(iter(q.getters))) < 10, q.getters
+        q.put('x')
+        self.assertEqual(blocked.get(), 'x')
+
 
 class TestChannel(TestCase):
 
@@ -234,6 +335,21 @@ class TestChannel(TestCase):
         self.assertEqual(['waiting', 'sending hello', 'hello', 'sending world', 'world', 'sent world'], events)
         g.get()
 
+    def test_getters_fifo_with_timeouts(self):
+        channel = queue.Channel()
+        first = gevent.spawn(channel.get)
+        gevent.sleep(0)
+        dying = gevent.spawn(util.wrap_errors(Empty, channel.get), timeout=0.01)
+        gevent.sleep(0)
+        last = gevent.spawn(channel.get)
+        dying.join()
+        assert isinstance(dying.value, Empty), dying.value
+        self.assertEqual(channel.balance, -2)
+        channel.put(1)
+        channel.put(2)
+        self.assertEqual((first.get(), last.get()), (1, 2))
+        self.assertEqual(channel.balance, 0)
+
     def test_task_done(self):
         channel = queue.JoinableQueue(0)
         X = object()
@@ -245,6 +361,105 @@ class TestChannel(TestCase):
         assert channel.unfinished_tasks == 0, channel.unfinished_tasks
 
 
+    def test_putter_timing_out_after_hub_get(self):
+        channel = queue.Channel()
+        putter = gevent.spawn(util.wrap_errors(Full, channel.put), 'x')
+        gevent.sleep(0)
+        waiting = []
+        for x in 'yzw':
+            waiting.append(gevent.spawn(channel.put, x))
+            gevent.sleep(0)
+        items = []
+
+        def get_then_timeout():
+            # the hub takes the first putter's item, then the putter times out before it is switched to
+            items.append(channel.get())
+            putter.throw(Full)
+
+        gevent.get_hub().loop.run_callback(get_then_timeout)
+        gevent.sleep(0.01)
+        self.assertEqual(items, ['x'])
+        self.assertEqual(len(channel.putters), 3)
+        self.assertEqual([channel.get(timeout=1) for _ in range(3)], ['y', 'z', 'w'])
+        gevent.joinall(waiting)
+
+
+class TestThreadSafeQueue(TestCase):
+
+    def test_put_from_thread(self):
+        q = queue.ThreadSafeQueue()
+
+        def producer():
+            for item in range(1000):
+                q.put(item)
+            q.put(StopIteration)
+
+        start_new_thread(producer, ())
+        self.assertEqual(list(q), list(range(1000)))
+
+    def test_put_from_hub_thread(self):
+        self.switch_expected = False
+        q = queue.ThreadSafeQueue()
+        q.put(1)
+        self.assertEqual(q.qsize(), 1)
+        self.assertEqual(q.get(), 1)
+
+    def test_puts_are_batched(self):
+        q = queue.ThreadSafeQueue()
+        wakeups = []
+        on_async = q._on_async
+        q._async.callback = lambda: (wakeups.append(len(q._pending)), on_async())
+        done = _threading.Event()
+
+        def producer():
+            for item in range(100):
+                q.put(item)
+            done.set()
+
+        # the hub cannot run while this greenlet blocks the thread
+        start_new_thread(producer, ())
+        done.wait()
+        self.assertEqual([q.get() for _ in range(100)], list(range(100)))
+        self.assertEqual(wakeups, [100])
+
+    def test_does_not_keep_loop_alive(self):
+        self.switch_expected = False
+        q = queue.ThreadSafeQueue()
+        assert not q._async.ref
+        q.put(1)
+        q.get()
+        assert not q._async.ref
+
+    def test_close(self):
+        self.switch_expected = False
+        q = queue.ThreadSafeQueue()
+        errors = []
+        done = _threading.Event()
+
+        def producer():
+            q.put(1)
+            done.set()
+            closed.wait()
+            try:
+                q.put(2)
+            except ValueError:
+                errors.append(sys.exc_info()[1])
+            done.set()
+
+        closed = _threading.Event()
+        start_new_thread(producer, ())
+        done.wait()
+        done.clear()
+        q.close()
+        assert not q._async.active
+        closed.set()
+        done.wait()
+        self.assertEqual(len(errors), 1)
+        # the items put before close() are kept
+        self.assertEqual(q.get(), 1)
+        self.assertEqual(q.qsize(), 0)
+
+
 class TestNoWait(TestCase):
 
     def test_put_nowait_simple(self):
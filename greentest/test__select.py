@@ -1,5 +1,6 @@
 import sys
 import os
+import gevent
 from gevent import select, socket
 import greentest
 
@@ -22,6 +23,109 @@ if sys.platform != 'win32':
                 os.close(r)
                 os.close(w)
 
+    class TestPollRead(greentest.GenericWaitTestCase):
+
+        def wait(self, timeout):
+            r, w = os.pipe()
+            try:
+                poll = select.poll()
+                poll.register(r, select.POLLIN)
+                result = poll.poll(timeout * 1000.0)
+                assert result == [], result
+            finally:
+                os.close(r)
+                os.close(w)
+
+    class TestPoll(greentest.TestCase):
+
+        def setUp(self):
+            greentest.TestCase.setUp(self)
+            self.r, self.w = os.pipe()
+
+        def tearDown(self):
+            os.close(self.r)
+            os.close(self.w)
+            greentest.TestCase.tearDown(self)
+
+        def test_ready_in_one_batch(self):
+            poll = select.poll()
+            poll.register(self.r, select.POLLIN)
+            poll.register(self.w, select.POLLOUT)
+            self.assertEqual(poll.poll(), [(self.w, select.POLLOUT)])
+            os.write(self.w, 'x')
+            self.assertEqual(sorted(poll.poll()), sorted([(self.r, select.POLLIN), (self.w, select.POLLOUT)]))
+
+        def test_watchers_are_reused(self):
+            poll = select.poll()
+            poll.register(self.r, select.POLLIN)
+            poll.register(self.w, select.POLLOUT)
+            watcher = poll.fds[self.r][1]
+            poll.poll()
+            # not ready, so it stays started until the next call
+            assert watcher.active, watcher
+            poll.poll()
+            assert poll.fds[self.r][1] is watcher
+            poll.unregister(self.r)
+            assert not watcher.active, watcher
+
+        def test_hangup(self):
+            poll = select.poll()
+            poll.register(self.r, select.POLLIN)
+            os.close(self.w)
+            self.w = os.open(os.devnull, os.O_RDONLY)
+            [(fd, mask)] = poll.poll()
+            self.assertEqual(fd, self.r)
+            assert mask & select.POLLHUP, mask
+
+        def test_invalid_fd(self):
+            poll = select.poll()
+            fd = os.dup(self.r)
+            poll.register(fd, select.POLLIN)
+            os.close(fd)
+            self.assertEqual(poll.poll(), [(fd, select.POLLNVAL)])
+
+        def test_closed_after_poll(self):
+            poll = select.poll()
+            fd = os.dup(self.w)
+            poll.register(fd, select.POLLOUT)
+            self.assertEqual(poll.poll(), [(fd, select.POLLOUT)])
+            os.close(fd)
+            self.assertEqual(poll.poll(), [(fd, select.POLLNVAL)])
+            self.assertEqual(poll.poll(), [(fd, select.POLLNVAL)])
+
+        def test_watcher_start_fails(self):
+            self.switch_expected = False
+
+            class FailingWatcher(object):
+                # what the io watchers of the Windows build do with a closed socket
+
+                def start(self, *args, **kwargs):
+                    raise IOError(9, 'not a socket')
+
+                def stop(self):
+                    pass
+
+            poll = select.poll()
+            poll.register(self.r, select.POLLIN)
+            poll.fds[self.r] = (select.POLLIN, FailingWatcher())
+            self.assertEqual(poll.poll(), [(self.r, select.POLLNVAL)])
+            self.assertEqual(poll.poll(), [(self.r, select.POLLNVAL)])
+
+        def test_modify_unregister(self):
+            poll = select.poll()
+            poll.register(self.w)
+            poll.modify(self.w, select.POLLIN)
+            self.assertEqual(poll.poll(1), [])
+            poll.unregister(self.w)
+            self.assertRaises(KeyError, poll.unregister, self.w)
+            self.assertRaises(IOError, poll.modify, self.w, select.POLLOUT)
+
+        def test_blocks_only_current_greenlet(self):
+            poll = select.poll()
+            poll.register(self.r, select.POLLIN)
+            gevent.spawn_later(0.01, os.write, self.w, 'x')
+            self.assertEqual(poll.poll(), [(self.r, select.POLLIN)])
+
 
 class TestSelectTypes(greentest.TestCase):
 
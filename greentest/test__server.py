@@ -1,8 +1,9 @@
 import greentest
 from gevent import socket
 import gevent
-from gevent.server import StreamServer
+from gevent.server import StreamServer, DatagramServer
 import errno
+import thread
 import sys
 import os
 
@@ -366,6 +367,301 @@ if hasattr(socket, 'ssl'):
             self.assertRaises(TypeError, self.ServerSubClass, listener)
 
 
+class TestSessionCacheWithoutSSLContext(greentest.TestCase):
+
+    switch_expected = False
+
+    def test(self):
+        import ssl
+        saved = ssl.__dict__.pop('SSLContext', None)
+        try:
+            self.assertRaises(ValueError, StreamServer, ('127.0.0.1', 0), lambda *args: None,
+                              certfile='keycert.pem', session_cache=True)
+        finally:
+            if saved is not None:
+                ssl.SSLContext = saved
+
+
+if hasattr(__import__('ssl'), 'SSLContext'):
+
+    class TestSSLHandshake(greentest.TestCase):
+
+        __timeout__ = 10
+        certfile = os.path.join(os.path.dirname(__file__), 'keycert.pem')
+        # keycert.pem has a 1024-bit key, which OpenSSL 1.1+ refuses by default
+        ciphers = 'DEFAULT:@SECLEVEL=0' if __import__('ssl').OPENSSL_VERSION_INFO >= (1, 1) else None
+
+        def handle(self, client_socket, address):
+            client_socket.sendall('hello')
+            client_socket.close()
+
+        def connect(self, server, context):
+            from gevent.ssl import SSLSocket
+            client = SSLSocket(socket.create_connection(server.address), _context=context)
+            try:
+                return client.recv(1024)
+            finally:
+                client.close()
+
+        def test_session_cache_and_threadpool(self):
+            import ssl
+            server = StreamServer(('127.0.0.1', 0), self.handle, certfile=self.certfile, ciphers=self.ciphers,
+                                  session_cache=True, handshake_in_threadpool=True)
+            server.start()
+            try:
+                self.assertTrue(server.handshake_in_threadpool)
+                self.assertFalse(server.ssl_args['do_handshake_on_connect'])
+                context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
+                if self.ciphers:
+                    context.set_ciphers(self.ciphers)
+                for _ in range(3):
+                    self.assertEqual(self.connect(server, context), 'hello')
+                # one context serves every connection, so its session cache is shared
+                self.assertEqual(server.ssl_args['_context'].session_stats()['accept_good'], 3)
+            finally:
+                server.close()
+
+        def test_sendall_and_recv_into(self):
+            import ssl
+            from gevent.ssl import SSLSocket
+            data = 'x' * 1000000
+            received = []
+
+            def handle(client_socket, address):
+                buffer = bytearray(SSLSocket.default_bufsize)
+                total = 0
+                while True:
+                    count = client_socket.recv_into(buffer)
+                    if not count:
+                        break
+                    total += count
+                received.append((total, str(buffer[:1])))
+                client_socket.unwrap().close()
+
+            server = StreamServer(('127.0.0.1', 0), handle, certfile=self.certfile, ciphers=self.ciphers,
+                                  session_cache=True)
+            server.start()
+            try:
+                context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
+                if self.ciphers:
+                    context.set_ciphers(self.ciphers)
+                client = SSLSocket(socket.create_connection(server.address), _context=context)
+                client.sendall(data)
+                client.unwrap().close()
+                with gevent.Timeout(5):
+                    while not received:
+                        gevent.sleep(0.01)
+                self.assertEqual(received, [(len(data), 'x')])
+            finally:
+                server.close()
+
+        def test_read_into_buffer_without_read_into(self):
+            import ssl
+            import gevent.ssl
+            from gevent.ssl import SSLSocket
+            received = []
+
+            def handle(client_socket, address):
+                buffer = bytearray(10)
+                received.append((client_socket.read(10, buffer), str(buffer[:5])))
+                client_socket.close()
+
+            server = StreamServer(('127.0.0.1', 0), handle, certfile=self.certfile, ciphers=self.ciphers,
+                                  session_cache=True)
+            server.start()
+            # as with Python older than 2.7.9, whose _ssl only returns new strings
+            saved, gevent.ssl._read_into = gevent.ssl._read_into, False
+            try:
+                context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
+                if self.ciphers:
+                    context.set_ciphers(self.ciphers)
+                client = SSLSocket(socket.create_connection(server.address), _context=context)
+                client.sendall('hello')
+                with gevent.Timeout(5):
+                    while not received:
+                        gevent.sleep(0.01)
+                client.close()
+                self.assertEqual(received, [(5, 'hello')])
+            finally:
+                gevent.ssl._read_into = saved
+                server.close()
+
+        def test_handshake_in_threadpool_respects_do_handshake_on_connect(self):
+            self.switch_expected = False
+            server = StreamServer(('127.0.0.1', 0), self.handle, certfile=self.certfile,
+                                  do_handshake_on_connect=False, handshake_in_threadpool=True)
+            try:
+                self.assertFalse(server.handshake_in_threadpool)
+            finally:
+                server.close()
+
+        def test_ssl_options_alone_do_not_enable_ssl(self):
+            self.switch_expected = False
+            for options in [{'session_cache': False}, {'handshake_in_threadpool': False}, {'session_cache': True}]:
+                server = StreamServer(('127.0.0.1', 0), self.handle, **options)
+                try:
+                    self.assertFalse(server.ssl_enabled, options)
+                finally:
+                    server.close()
+
+
+class _FakeDatagramSocket(object):
+
+    def __init__(self, results):
+        self.results = results
+
+    def recvfrom(self, size):
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class TestDatagramServer(greentest.TestCase):
+
+    __timeout__ = 5
+
+    def start(self, handle, **kwargs):
+        server = DatagramServer('127.0.0.1:0', handle, **kwargs)
+        server.start()
+        client = socket.socket(type=socket.SOCK_DGRAM)
+        client.connect(server.address)
+        return server, client
+
+    def test_one_by_one(self):
+        log = []
+        server, client = self.start(lambda data, address: log.append(data))
+        try:
+            for data in ['a', 'b', 'c']:
+                client.send(data)
+            with gevent.Timeout(1):
+                while len(log) < 3:
+                    gevent.sleep(0.01)
+            self.assertEqual(sorted(log), ['a', 'b', 'c'])
+        finally:
+            server.close()
+            client.close()
+
+    def test_batch(self):
+        batches = []
+        server, client = self.start(batches.append, batch_size=2)
+        try:
+            for data in ['a', 'b', 'c']:
+                client.send(data)
+            with gevent.Timeout(1):
+                while sum(len(batch) for batch in batches) < 3:
+                    gevent.sleep(0.01)
+            assert all(1 <= len(batch) <= 2 for batch in batches), batches
+            address = client.getsockname()
+            self.assertEqual(sorted(item for batch in batches for item in batch),
+                             [('a', address), ('b', address), ('c', address)])
+        finally:
+            server.close()
+            client.close()
+
+    def test_batch_reports_error(self):
+        self.switch_expected = False
+        server = DatagramServer('127.0.0.1:0', lambda batch: None, batch_size=3)
+        address = ('127.0.0.1', 12345)
+        error = socket.error(errno.ECONNREFUSED, 'Connection refused')
+        server._socket = _FakeDatagramSocket([('a', address), error])
+        self.expect_one_error()
+        self.assertEqual(server._read_batch(), ([('a', address)], ))
+        self.assert_error(socket.error, error)
+
+    def test_sendto_many(self):
+        server, client = self.start(lambda *args: None)
+        try:
+            server.sendto('x', client.getsockname())
+            server.sendto_many([('y', client.getsockname()), ('z', client.getsockname())])
+            self.assertEqual([client.recv(10) for _ in range(3)], ['x', 'y', 'z'])
+        finally:
+            server.close()
+            client.close()
+
+    def test_invalid_batch_size(self):
+        self.switch_expected = False
+        self.assertRaises(ValueError, DatagramServer, '127.0.0.1:0', lambda batch: None, batch_size=0)
+
+
+class TestThreads(greentest.TestCase):
+
+    __timeout__ = 10
+
+    def handle(self, client_socket, address):
+        self.idents.add(thread.get_ident())
+        # the socket belongs to the hub of the thread that runs the handler
+        assert client_socket.hub is gevent.get_hub(), (client_socket.hub, gevent.get_hub())
+        client_socket.sendall(client_socket.recv(100))
+        client_socket.close()
+
+    def check(self, **kwargs):
+        self.idents = set()
+        server = StreamServer(('127.0.0.1', 0), self.handle, threads=3, **kwargs)
+        server.start()
+        try:
+            for _ in range(20):
+                client = socket.create_connection(server.address)
+                client.sendall('hello')
+                self.assertEqual(client.recv(100), 'hello')
+                client.close()
+        finally:
+            server.stop()
+        assert thread.get_ident() not in self.idents, self.idents
+        return server
+
+    def test_dispatch(self):
+        self.check()
+        # connections are handed over to the threads in turn
+        self.assertEqual(len(self.idents), 3)
+
+    def test_dispatch_pool(self):
+        self.check(spawn=2)
+
+    def test_dispatch_limit(self):
+        from gevent.queue import ThreadSafeQueue
+        from gevent._threading import Queue
+        started = ThreadSafeQueue()
+        # blocks the handler's whole thread, which has nothing else to do
+        finish = Queue()
+
+        def handle(client_socket, address):
+            started.put(address)
+            finish.get()
+            client_socket.sendall('done')
+            client_socket.close()
+
+        server = StreamServer(('127.0.0.1', 0), handle, threads=2, spawn=1)
+        server.start()
+        try:
+            clients = [socket.create_connection(server.address) for _ in range(3)]
+            started.get()
+            started.get()
+            gevent.sleep(0.1)
+            # both threads handle one connection: the third one waits in the listen backlog
+            assert server.full()
+            self.assertEqual(started.qsize(), 0)
+            finish.put(None)
+            started.get()
+            finish.put(None)
+            finish.put(None)
+            for client in clients:
+                self.assertEqual(client.recv(100), 'done')
+                client.close()
+        finally:
+            server.stop()
+
+    if hasattr(socket, 'SO_REUSEPORT'):
+
+        def test_reuse_port(self):
+            self.check(reuse_port=True)
+
+    def test_invalid_arguments(self):
+        self.switch_expected = False
+        self.assertRaises(ValueError, StreamServer, ('127.0.0.1', 0), self.handle, threads=-1)
+        self.assertRaises(TypeError, StreamServer, ('127.0.0.1', 0), self.handle, threads=2, spawn=gevent.spawn)
+
+
 # test non-socket.error exception in accept call: fatal
 # test error in spawn(): non-fatal
 # test error in spawned handler: non-fatal
@@ -1,6 +1,7 @@
 import os
 import sys
 import array
+import struct
 import gevent
 from gevent import socket
 import greentest
@@ -200,5 +201,150 @@ class TestClosedSocket(greentest.TestCase):
                 raise
 
 
+class TestSharedWatchers(greentest.TestCase):
+
+    switch_expected = False
+
+    def test_dup_shares_watchers(self):
+        sock = socket.socket()
+        sock.settimeout(5)
+        try:
+            dup = sock.dup()
+            self.assertTrue(dup._read_event is sock._read_event)
+            self.assertTrue(dup._write_event is sock._write_event)
+            self.assertEqual(dup.gettimeout(), None)
+            fobj = sock.makefile()
+            self.assertTrue(fobj._sock._read_event is sock._read_event)
+        finally:
+            sock.close()
+
+    def test_close_dup_keeps_waits(self):
+        self.switch_expected = True
+        a, b = socket.socketpair()
+        try:
+            reader = gevent.spawn(a.recv, 10)
+            gevent.sleep(0)
+            dup = a.dup()
+            dup.close()
+            gevent.sleep(0.01)
+            self.assertFalse(reader.ready())
+            b.sendall('x')
+            self.assertEqual(reader.get(timeout=1), 'x')
+            # the last user of the watchers cancels the waits
+            reader = gevent.spawn(a.recv, 10)
+            gevent.sleep(0)
+            a.close()
+            self.assertEqual(reader.get(timeout=1), '')
+        finally:
+            a.close()
+            b.close()
+
+    def test_new_socket_has_own_watchers(self):
+        sock = socket.socket()
+        other = socket.socket(_sock=sock._sock)
+        try:
+            self.assertFalse(other._read_event is sock._read_event)
+        finally:
+            other.close()
+            sock.close()
+
+
+class TestSocketIO(greentest.TestCase):
+
+    def test_readline(self):
+        from io import BufferedReader
+        a, b = socket.socketpair()
+        try:
+            def write():
+                a.sendall('hello ')
+                gevent.sleep(0.01)
+                a.sendall('world\nsecond line\n')
+                a.close()
+            writer = gevent.spawn(write)
+            raw = socket.SocketIO(b)
+            rfile = BufferedReader(raw, 8)
+            self.assertEqual(rfile.readline(), 'hello world\n')
+            self.assertEqual(rfile.tell(), len('hello world\n'))
+            assert rfile.raw.tell() > rfile.tell(), (rfile.raw.tell(), rfile.tell())
+            self.assertEqual(rfile.read(), 'second line\n')
+            self.assertEqual(rfile.readline(), '')
+            writer.get()
+            rfile.close()
+            assert raw.closed
+            b.sendall('')  # closing the file object leaves the socket open
+        finally:
+            a.close()
+            b.close()
+
+
+class TestCorkedWriter(greentest.TestCase):
+
+    def setUp(self):
+        greentest.TestCase.setUp(self)
+        self.a, self.b = socket.socketpair()
+        self.b.setblocking(0)
+
+    def tearDown(self):
+        self.a.close()
+        self.b.close()
+        greentest.TestCase.tearDown(self)
+
+    def test_coalesce(self):
+        writer = socket.CorkedWriter(self.a)
+        for x in range(10):
+            writer.write(str(x))
+        self.assertRaises(socket.error, self.b.recv, 100)
+        gevent.sleep(0)
+        self.assertEqual(self.b.recv(100), '0123456789')
+
+    def test_threshold_and_flush(self):
+        writer = socket.CorkedWriter(self.a, threshold=4)
+        writer.write('ab')
+        writer.write('cd')
+        self.assertEqual(self.b.recv(100), 'abcd')
+        writer.write('e')
+        writer.flush()
+        self.assertEqual(self.b.recv(100), 'e')
+        gevent.sleep(0)
+        self.assertRaises(socket.error, self.b.recv, 100)
+
+    def test_error_is_raised_later(self):
+        writer = socket.CorkedWriter(self.a)
+        writer.write('hello')
+        self.a.close()
+        gevent.sleep(0)
+        self.assertRaises(socket.error, writer.write, 'world')
+        writer.write('again')
+        self.assertRaises(socket.error, writer.close)
+
+    def test_close_raises_error_after_last_write(self):
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(1)
+        client = socket.create_connection(listener.getsockname())
+        peer = listener.accept()[0]
+        listener.close()
+        try:
+            writer = socket.CorkedWriter(client)
+            writer.write('hello')
+            # the peer resets the connection before the buffered data is sent
+            peer.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            peer.close()
+            gevent.sleep(0.1)
+            self.assertRaises(socket.error, writer.close)
+            self.assertRaises(ValueError, writer.write, 'world')
+        finally:
+            client.close()
+
+    def test_error_reported_when_dropped(self):
+        self.expect_one_error()
+        writer = socket.CorkedWriter(self.a)
+        writer.write('hello')
+        self.b.close()
+        del writer
+        gevent.sleep(0)
+        self.assert_error(socket.error)
+
+
 if __name__ == '__main__':
     greentest.main()
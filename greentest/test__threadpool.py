@@ -1,3 +1,4 @@
+import os
 from time import time, sleep
 import random
 import greentest
@@ -144,6 +145,21 @@ class TestPool(TestCase):
         it = self.pool.imap_unordered(sqr_random_sleep, range(10))
         self.assertEqual(sorted(it), list(map(sqr, range(10))))
 
+    def test_imap_maxsize(self):
+        consumed = []
+
+        def source():
+            for i in range(20):
+                # never more than maxsize items between the iterable and the consumer
+                assert i - len(consumed) <= 3, (i, consumed)
+                yield i
+
+        it = self.pool.imap(sqr, source(), maxsize=3)
+        for value in it:
+            consumed.append(value)
+            gevent.sleep(0.001)
+        self.assertEqual(consumed, list(map(sqr, range(20))))
+
     def test_terminate(self):
         result = self.pool.map_async(sleep, [0.1] * ((self.size or 10) * 2))
         gevent.sleep(0.1)
@@ -226,6 +242,25 @@ class TestSpawn(TestCase):
         self.assertEqual(len(pool), 0)
 
 
+if hasattr(gevent, 'fork'):
+
+    class TestFork(TestCase):
+
+        __timeout__ = 10
+
+        def test_apply_in_child(self):
+            from gevent.os import waitpid
+            self.pool = pool = ThreadPool(1)
+            self.assertEqual(pool.apply(lambda: 1), 1)
+            pid = gevent.fork()
+            if not pid:
+                # the worker thread did not survive fork() and the loop has not run the fork watchers yet
+                with gevent.Timeout(5, False):
+                    os._exit(pool.apply(lambda: 0))
+                os._exit(1)
+            self.assertEqual(waitpid(pid, 0)[1], 0)
+
+
 def error_iter():
     yield 1
     yield 2
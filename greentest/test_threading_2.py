@@ -3,7 +3,7 @@ from __future__ import with_statement
 
 setup_ = '''from gevent import monkey; monkey.patch_all()
 from gevent.event import Event
-from gevent.lock import RLock, Semaphore, BoundedSemaphore
+from gevent.lock import RLock, Semaphore, BoundedSemaphore, Condition
 from gevent.thread import allocate_lock as Lock
 import threading
 threading.Event = Event
@@ -11,6 +11,7 @@ threading.Lock = Lock
 threading.RLock = RLock
 threading.Semaphore = Semaphore
 threading.BoundedSemaphore = BoundedSemaphore
+threading.Condition = Condition
 if not hasattr(threading, 'current_thread'):
     threading.current_thread = threading.currentThread
 if not hasattr(threading.Thread, 'name'):
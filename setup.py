@@ -59,13 +59,19 @@ ARES = Extension(name='gevent.ares',
                  depends=expand('gevent/dnshelper.c', 'gevent/cares_*.*'))
 ARES.optional = True
 
+# gevent/_local.py is used as is if this one fails to build
+LOCAL = Extension(name="gevent._local",
+                  sources=["gevent/gevent._local.c"])
+LOCAL.optional = True
+
 
 ext_modules = [CORE,
                ARES,
                Extension(name="gevent._semaphore",
                          sources=["gevent/gevent._semaphore.c"]),
                Extension(name="gevent._util",
-                         sources=["gevent/gevent._util.c"])]
+                         sources=["gevent/gevent._util.c"]),
+               LOCAL]
 
 
 def make_universal_header(filename, *defines):
@@ -210,7 +216,7 @@ class my_build_ext(build_ext):
             result = build_ext.build_extension(self, ext)
         except ext_errors:
             if getattr(ext, 'optional', False):
-                raise BuildFailed
+                raise BuildFailed(ext)
             else:
                 raise
         # hack: create a symlink from build/../core.so to gevent/core.so
@@ -263,7 +269,7 @@ def read(name, *args):
     except OSError:
         return ''
 
-packages = ['gevent']
+packages = ['gevent', 'gevent.bench']
 if sys.version_info[0] >= 3:
     packages.append('gevent.py3')
 else:
@@ -297,12 +303,13 @@ def run_setup(ext_modules):
 
 
 if __name__ == '__main__':
-    try:
-        run_setup(ext_modules)
-    except BuildFailed:
-        if ARES not in ext_modules:
-            raise
-        ext_modules.remove(ARES)
-        run_setup(ext_modules)
+    while True:
+        try:
+            run_setup(ext_modules)
+            break
+        except BuildFailed:
+            ext_modules.remove(sys.exc_info()[1].args[0])
     if ARES not in ext_modules:
         sys.stderr.write('\nWARNING: The gevent.ares extension has been disabled.\n')
+    if LOCAL not in ext_modules:
+        sys.stderr.write('\nWARNING: The gevent._local extension has been disabled.\n')
@@ -27,7 +27,8 @@ useful_files = ['gevent/core.pyx',
                 'gevent/gevent.ares.c',
                 'gevent/gevent._semaphore.c',
                 'gevent/gevent._semaphore.h',
-                'gevent/gevent._util.c']
+                'gevent/gevent._util.c',
+                'gevent/gevent._local.c']
 
 
 def system(cmd, noisy=True):